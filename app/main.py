@@ -1,11 +1,22 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .routes import data_routes, upload_routes
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Close the pooled SQLite connections of every worker thread on shutdown
+    data_routes.data_service.close()
+
+
 app = FastAPI(
     title="Data Processing API",
     description="REST API for data processing and data analysis",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS Configuration
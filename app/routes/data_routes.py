@@ -1,25 +1,35 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Query, Response
+from fastapi import APIRouter, UploadFile, File, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from ..services.data_service import DataService
 from typing import List, Optional
 import pandas as pd
-import io
 from ..utils.data_processing import (
+    build_quantile_sketches,
     handle_missing_values,
     handle_outliers,
+    iqr_bounds,
     remove_duplicates,
     normalize_data,
 )
 from ..utils.csv_validator import validate_csv_data, generate_data_profile
 from ..utils.csv_processor import CSVProcessor
 from ..utils.xml_processor import xml_to_csv
+from ..utils.compression import (
+    OUTPUT_COMPRESSIONS,
+    compress_stream,
+    data_file_type,
+    negotiate_compression,
+)
 import os
 
+# Routes are plain functions: DataService and pandas calls block, so FastAPI
+# runs them in its threadpool instead of on the event loop
 router = APIRouter()
 data_service = DataService("data/database.sqlite")
 
 
 @router.post("/transform-xml-to-csv/{file_id}")
-async def transform_to_csv(file_id: int):
+def transform_to_csv(file_id: int):
     try:
         # Récupérer le fichier XML
         file_info = data_service.get_file(file_id)
@@ -46,15 +56,15 @@ async def transform_to_csv(file_id: int):
 
 
 @router.post("/upload/")
-async def upload_file(file: UploadFile = File(...)):
+def upload_file(file: UploadFile = File(...)):
     try:
-        # Check file type
-        if not file.filename.endswith(".csv"):
+        # Check file type (optionally gzip, bz2 or zstd compressed)
+        file_type, compression = data_file_type(file.filename)
+        if file_type != "csv":
             raise HTTPException(status_code=400, detail="File must be in CSV format")
 
-        # Read file content
-        content = await file.read()
-        df = pd.read_csv(io.BytesIO(content))
+        # Read the spooled upload directly (the route runs in the threadpool)
+        df = pd.read_csv(file.file, compression=compression)
 
         # Validate data
         is_valid, errors = validate_csv_data(df)
@@ -80,7 +90,7 @@ async def upload_file(file: UploadFile = File(...)):
 
 
 @router.post("/process/")
-async def process_data(
+def process_data(
     auto_clean: bool = Query(True, description="Enable automatic data cleaning"),
     handle_missing: str = Query(
         "mean",
@@ -113,9 +123,14 @@ async def process_data(
         else:
             # Manual processing
             df = handle_missing_values(df, strategy=handle_missing, columns=columns)
-            df = handle_outliers(df, method=handle_outliers_method, columns=columns)
+            bounds = None
+            if handle_outliers_method == "iqr":
+                bounds = iqr_bounds(build_quantile_sketches(df, columns))
+            df = handle_outliers(
+                df, method=handle_outliers_method, columns=columns, bounds=bounds
+            )
             df = remove_duplicates(df)
-            df = normalize_data(df, method=normalize_method, columns=columns)
+            df, _ = normalize_data(df, method=normalize_method, columns=columns)
             summary = {"message": "Manual processing completed"}
             quality_scores = None
 
@@ -136,27 +151,53 @@ async def process_data(
 
 
 @router.get("/export/")
-async def export_data():
+def export_data(
+    compression: Optional[str] = Query(
+        None,
+        description="gzip or zstd for a compressed file, none to disable; "
+        "negotiated from Accept-Encoding when omitted",
+    ),
+    accept_encoding: Optional[str] = Header(None),
+):
     try:
-        df = data_service.get_dataframe()
-        if df is None:
+        chunks = data_service.iter_dataframe()
+        if chunks is None:
             raise HTTPException(status_code=404, detail="No data found")
 
-        # Convert to CSV
-        output = io.StringIO()
-        df.to_csv(output, index=False)
-        response = Response(content=output.getvalue(), media_type="text/csv")
-        response.headers["Content-Disposition"] = (
-            "attachment; filename=data_processed.csv"
-        )
-        return response
-
+        # CSV produced chunk by chunk and, if requested, compressed on the fly
+        content = _iter_csv(chunks)
+        media_type = "text/csv"
+        filename = "data_processed.csv"
+        headers = {"Vary": "Accept-Encoding"}
+        if compression is None:
+            codec = negotiate_compression(accept_encoding)
+            if codec is not None:
+                headers["Content-Encoding"] = codec
+        else:
+            codec = compression if compression in OUTPUT_COMPRESSIONS else None
+            if codec is not None:
+                suffix, media_type = OUTPUT_COMPRESSIONS[codec]
+                filename += suffix
+        if codec is not None:
+            content = compress_stream(content, codec)
+        headers["Content-Disposition"] = f"attachment; filename={filename}"
+        return StreamingResponse(content, media_type=media_type, headers=headers)
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _iter_csv(chunks):
+    header = True
+    for chunk in chunks:
+        yield chunk.to_csv(index=False, header=header)
+        header = False
+
+
 @router.get("/statistics/")
-async def get_statistics():
+def get_statistics():
     try:
         stats = data_service.get_statistics()
         if stats is None:
@@ -6,7 +6,7 @@ from ..utils.json_processor import load_json_data
 router = APIRouter()
 
 @router.post("/upload/json/")
-async def upload_json(file: UploadFile):
+def upload_json(file: UploadFile):
     """Endpoint pour uploader et traiter un fichier JSON."""
     if not file.filename.endswith('.json'):
         raise HTTPException(status_code=400, detail="Le fichier doit être au format JSON")
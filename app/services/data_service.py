@@ -1,6 +1,7 @@
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional
 import pandas as pd
 import sqlite3
+import threading
 from ..utils.data_processing import (
     validate_dataframe,
     calculate_advanced_stats,
@@ -15,9 +16,60 @@ from ..utils.json_processor import (
 
 
 class DataService:
-    def __init__(self, database_url: str):
-        """Initialise le service de données avec l'URL de la base de données."""
+    # Applied to every connection: WAL lets readers proceed while a writer commits
+    PRAGMAS = {
+        "journal_mode": "WAL",
+        # Safe with WAL: a power loss can roll back the last commits, not corrupt the file
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        # Negative: size in KiB (64 MiB page cache)
+        "cache_size": -64 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    }
+
+    def __init__(self, database_url: str, cached_statements: int = 128):
+        """Initialise le service de données avec l'URL de la base de données.
+
+        Each thread keeps one persistent connection, opened on first use;
+        ``cached_statements`` prepared statements are kept per connection.
+        """
         self.database_url = database_url
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # A pooled connection is only used by its own thread; the check is off so
+        # that close() works from any thread and streamed chunks can be read from
+        # the server's worker threads
+        conn = sqlite3.connect(
+            self.database_url,
+            cached_statements=self.cached_statements,
+            check_same_thread=False,
+        )
+        for name, value in self.PRAGMAS.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        """The calling thread's pooled connection."""
+        conn = getattr(self._local, "connection", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.connection = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self):
+        """Closes the pooled connections of all threads."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
 
     def process_json_file(self, json_file_path: str, transformations: List[Dict[str, Any]] = None) -> Optional[pd.DataFrame]:
         """Traite un fichier JSON et retourne un DataFrame."""
@@ -30,16 +82,13 @@ class DataService:
         """Sauvegarde un DataFrame au format JSON."""
         return save_json_data(df, json_file_path)
 
-    def __init__(self, database_url: str):
-        self.database_url = database_url
-
     def save_dataframe(self, df: pd.DataFrame, table_name: str = "data_table") -> bool:
         """Saves a DataFrame to the SQLite database."""
         if not validate_dataframe(df):
             return False
 
         try:
-            with sqlite3.connect(self.database_url) as conn:
+            with self.connection() as conn:
                 df.to_sql(table_name, conn, if_exists="replace", index=False)
             return True
         except Exception:
@@ -48,11 +97,31 @@ class DataService:
     def get_dataframe(self, table_name: str = "data_table") -> Optional[pd.DataFrame]:
         """Retrieves data from the database as a DataFrame."""
         try:
-            with sqlite3.connect(self.database_url) as conn:
-                return pd.read_sql_query(f"SELECT * FROM {table_name}", conn)
+            return pd.read_sql_query(f"SELECT * FROM {table_name}", self.connection())
         except Exception:
             return None
 
+    def iter_dataframe(
+        self, table_name: str = "data_table", chunksize: int = 50000
+    ) -> Optional[Iterator[pd.DataFrame]]:
+        """Retrieves data from the database chunk by chunk; None if the table cannot be read."""
+        # Own connection: the chunks may be consumed from other threads (streamed
+        # responses), and the open cursor must not tie up a pooled connection
+        conn = self._connect()
+        try:
+            chunks = pd.read_sql_query(f"SELECT * FROM {table_name}", conn, chunksize=chunksize)
+        except Exception:
+            conn.close()
+            return None
+        return self._close_after(chunks, conn)
+
+    @staticmethod
+    def _close_after(chunks: Iterator[pd.DataFrame], conn) -> Iterator[pd.DataFrame]:
+        try:
+            yield from chunks
+        finally:
+            conn.close()
+
     def get_statistics(
         self, table_name: str = "data_table"
     ) -> Optional[Dict[str, Any]]:
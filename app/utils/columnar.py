@@ -0,0 +1,176 @@
+from typing import IO, Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+# Compression of the columnar files (Parquet pages, Arrow IPC buffers)
+COLUMNAR_COMPRESSION = "zstd"
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as e:
+        raise ImportError("The pyarrow package is required to read and write Parquet/Arrow files") from e
+    return pyarrow
+
+
+def _as_text(series: pd.Series) -> List[Optional[str]]:
+    return [value if isinstance(value, str) else None if _is_missing(value) else str(value)
+            for value in series]
+
+
+def _is_missing(value) -> bool:
+    return value is None or (isinstance(value, float) and np.isnan(value)) or value is pd.NaT
+
+
+class ArrowTableBuilder:
+    """Converts DataFrame chunks to Arrow tables that all share the schema of the first chunk.
+
+    A column whose values Arrow cannot type (mixed numbers and strings,
+    nested objects) is stored as text, as is a column that is entirely
+    missing in the first chunk. Later chunks are converted to the types of
+    the first one; a lossy conversion raises instead of truncating values.
+    """
+
+    def __init__(self):
+        self.schema = None
+
+    def to_table(self, chunk: pd.DataFrame):
+        pa = _pyarrow()
+        if self.schema is None:
+            arrays = [self._first_array(chunk[column]) for column in chunk.columns]
+            table = pa.Table.from_arrays(arrays, names=[str(column) for column in chunk.columns])
+            self.schema = table.schema
+            return table
+        columns = {str(column): column for column in chunk.columns}
+        arrays = [self._conform(chunk[columns[field.name]], field.type) if field.name in columns
+                  else pa.nulls(len(chunk), field.type)
+                  for field in self.schema]
+        return pa.Table.from_arrays(arrays, schema=self.schema)
+
+    @staticmethod
+    def _first_array(series: pd.Series):
+        pa = _pyarrow()
+        try:
+            array = pa.array(series, from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            return pa.array(_as_text(series), type=pa.string())
+        if pa.types.is_null(array.type):
+            return array.cast(pa.string())
+        return array
+
+    @staticmethod
+    def _conform(series: pd.Series, arrow_type):
+        pa = _pyarrow()
+        if pa.types.is_string(arrow_type) and series.dtype != object:
+            return pa.array(_as_text(series), type=arrow_type)
+        try:
+            return pa.array(series, type=arrow_type, from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            if pa.types.is_string(arrow_type):
+                return pa.array(_as_text(series), type=arrow_type)
+            return pa.array(series, from_pandas=True).cast(arrow_type)
+
+
+class ParquetChunkWriter:
+    """Writes DataFrame chunks to a Parquet file, one row group per chunk, in constant memory."""
+
+    def __init__(self, target: Union[str, IO[bytes]], compression: str = COLUMNAR_COMPRESSION):
+        self.target = target
+        self.compression = compression
+        self._tables = ArrowTableBuilder()
+        self._writer = None
+
+    def write(self, chunk: pd.DataFrame):
+        table = self._tables.to_table(chunk)
+        if self._writer is None:
+            self._writer = _pyarrow().parquet.ParquetWriter(self.target, table.schema,
+                                                            compression=self.compression)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is None:
+            # No chunk: a valid file without rows or columns
+            pa = _pyarrow()
+            pa.parquet.write_table(pa.table({}), self.target, compression=self.compression)
+        else:
+            self._writer.close()
+
+
+class FeatherChunkWriter:
+    """Writes DataFrame chunks to a Feather (Arrow IPC file) stream, one record batch per chunk."""
+
+    def __init__(self, target: IO[bytes], compression: str = COLUMNAR_COMPRESSION):
+        self.target = target
+        self.compression = compression
+        self._tables = ArrowTableBuilder()
+        self._writer = None
+
+    def _open(self, schema):
+        pa = _pyarrow()
+        options = pa.ipc.IpcWriteOptions(compression=self.compression)
+        self._writer = pa.ipc.new_file(self.target, schema, options=options)
+
+    def write(self, chunk: pd.DataFrame):
+        table = self._tables.to_table(chunk)
+        if self._writer is None:
+            self._open(table.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is None:
+            self._open(_pyarrow().schema([]))
+        self._writer.close()
+
+
+def parquet_row_count(path: str) -> int:
+    """Number of rows, from the file footer."""
+    return _pyarrow().parquet.ParquetFile(path).metadata.num_rows
+
+
+def _projected_columns(parquet_file, columns: Optional[List[str]]) -> Optional[List[str]]:
+    if columns is None:
+        return None
+    names = set(parquet_file.schema_arrow.names)
+    return [column for column in columns if column in names]
+
+
+def iter_parquet_frames(path: str, batch_size: int,
+                        columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """Reads a Parquet file in DataFrames of at most ``batch_size`` rows.
+
+    Only the ``columns`` requested are decoded; those absent from the file
+    are added as missing values.
+    """
+    parquet_file = _pyarrow().parquet.ParquetFile(path)
+    for batch in parquet_file.iter_batches(batch_size=batch_size,
+                                           columns=_projected_columns(parquet_file, columns)):
+        df = batch.to_pandas()
+        yield df if columns is None else df.reindex(columns=columns)
+
+
+def read_parquet_rows(path: str, start: int, count: int,
+                      columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Rows ``start`` to ``start + count``: only the row groups holding them are read."""
+    parquet_file = _pyarrow().parquet.ParquetFile(path)
+    groups = []
+    first_row = None
+    position = 0
+    for group in range(parquet_file.num_row_groups):
+        rows = parquet_file.metadata.row_group(group).num_rows
+        if position + rows > start and position < start + count:
+            groups.append(group)
+            if first_row is None:
+                first_row = position
+        position += rows
+    projected = _projected_columns(parquet_file, columns)
+    if not groups:
+        df = parquet_file.schema_arrow.empty_table().to_pandas()
+        df = df if projected is None else df[projected]
+    else:
+        df = parquet_file.read_row_groups(groups, columns=projected).to_pandas()
+        df = df.iloc[start - first_row:start - first_row + count]
+    df = df.reset_index(drop=True)
+    return df if columns is None else df.reindex(columns=columns)
@@ -0,0 +1,196 @@
+import bz2
+import gzip
+import io
+import os
+import zlib
+from typing import IO, Iterable, Iterator, Optional, Tuple, Union
+
+# File suffixes of the supported compressions (names as used by pandas)
+COMPRESSION_EXTENSIONS = {
+    ".gz": "gzip",
+    ".gzip": "gzip",
+    ".bz2": "bz2",
+    ".zst": "zstd",
+    ".zstd": "zstd",
+}
+
+# Compressions produced for downloads: file suffix and HTTP Content-Encoding / media type
+OUTPUT_COMPRESSIONS = {
+    "gzip": (".gz", "application/gzip"),
+    "zstd": (".zst", "application/zstd"),
+}
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("The zstandard package is required to read .zst files") from e
+    return zstandard
+
+
+def split_compression(filename: str) -> Tuple[str, Optional[str]]:
+    """Splits ``data.csv.gz`` into ``("data.csv", "gzip")``; no compression gives ``None``."""
+    base, extension = os.path.splitext(filename)
+    compression = COMPRESSION_EXTENSIONS.get(extension.lower())
+    if compression is None:
+        return filename, None
+    return base, compression
+
+
+def data_file_type(filename: str) -> Tuple[str, Optional[str]]:
+    """Data format (``csv``, ``json``, ...) and compression of a file name."""
+    base, compression = split_compression(filename)
+    return os.path.splitext(base)[1].lower().lstrip("."), compression
+
+
+def data_file_extension(filename: str) -> str:
+    """Extension including the compression suffix, e.g. ``.csv.gz``."""
+    base, compression = split_compression(filename)
+    return (os.path.splitext(base)[1] + filename[len(base):]).lower()
+
+
+def decompress_stream(raw: IO[bytes], compression: Optional[str]) -> IO[bytes]:
+    """Binary stream reading ``raw`` decompressed on the fly (``raw`` itself if not compressed).
+
+    Closing the returned stream leaves ``raw`` open, so that its position can
+    be used to report progress in compressed bytes.
+    """
+    if compression is None:
+        return raw
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=raw, mode="rb")
+    if compression == "bz2":
+        return bz2.BZ2File(raw, mode="rb")
+    if compression == "zstd":
+        reader = _zstandard().ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=False)
+        return io.BufferedReader(reader)
+    raise ValueError(f"Unsupported compression: {compression}")
+
+
+def open_compressed(path: str, mode: str = "rb", encoding: Optional[str] = None,
+                    compression: Optional[str] = "infer") -> IO:
+    """Opens a possibly compressed file for reading, in binary (``rb``) or text (``rt``) mode.
+
+    With ``compression="infer"`` the compression is deduced from the file suffix.
+    """
+    if compression == "infer":
+        compression = split_compression(path)[1]
+    text = "t" in mode
+    if compression is None:
+        return open(path, "r" if text else "rb", encoding=encoding if text else None)
+    if compression == "gzip":
+        return gzip.open(path, "rt" if text else "rb", encoding=encoding)
+    if compression == "bz2":
+        return bz2.open(path, "rt" if text else "rb", encoding=encoding)
+    if compression == "zstd":
+        reader = _zstandard().ZstdDecompressor().stream_reader(
+            open(path, "rb"), read_across_frames=True, closefd=True
+        )
+        stream = io.BufferedReader(reader)
+        return io.TextIOWrapper(stream, encoding=encoding) if text else stream
+    raise ValueError(f"Unsupported compression: {compression}")
+
+
+class StreamDecompressor:
+    """Incremental decompressor for data received in arbitrary pieces.
+
+    Concatenated gzip members, bz2 streams and zstd frames are all read, as
+    the file readers do.
+    """
+
+    def __init__(self, compression: str):
+        self.compression = compression
+        self._decompressor = self._new()
+
+    def _new(self):
+        if self.compression == "gzip":
+            return zlib.decompressobj(zlib.MAX_WBITS | 16)
+        if self.compression == "bz2":
+            return bz2.BZ2Decompressor()
+        if self.compression == "zstd":
+            return _zstandard().ZstdDecompressor().decompressobj()
+        raise ValueError(f"Unsupported compression: {self.compression}")
+
+    def decompress(self, data: bytes) -> bytes:
+        output = []
+        while data:
+            output.append(self._decompressor.decompress(data))
+            if not self._decompressor.eof:
+                break
+            # End of a member/frame: the rest starts a new one
+            data = self._decompressor.unused_data
+            self._decompressor = self._new()
+        return b"".join(output)
+
+
+class StreamCompressor:
+    """Incremental compressor: output is produced piece by piece, never buffered whole.
+
+    ``compress`` returns what the compressor can already emit for the data
+    fed so far (possibly nothing); ``flush`` ends the gzip member or zstd
+    frame.
+    """
+
+    def __init__(self, compression: str, level: Optional[int] = None):
+        self.compression = compression
+        if compression == "gzip":
+            self._compressor = zlib.compressobj(6 if level is None else level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+        elif compression == "zstd":
+            zstandard = _zstandard()
+            self._compressor = zstandard.ZstdCompressor(level=3 if level is None else level).compressobj()
+        else:
+            raise ValueError(f"Unsupported compression: {compression}")
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+
+def compress_stream(parts: Iterable[Union[str, bytes]], compression: str,
+                    level: Optional[int] = None) -> Iterator[bytes]:
+    """Compresses an iterable of text (UTF-8) or byte pieces on the fly."""
+    compressor = StreamCompressor(compression, level)
+    for part in parts:
+        data = compressor.compress(part.encode("utf-8") if isinstance(part, str) else part)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def available_output_compressions() -> Tuple[str, ...]:
+    """Output compressions usable here, preferred first (zstd needs the zstandard package)."""
+    try:
+        _zstandard()
+    except ImportError:
+        return ("gzip",)
+    return ("zstd", "gzip")
+
+
+def negotiate_compression(accept_encoding: Optional[str]) -> Optional[str]:
+    """Content-Encoding to use for an ``Accept-Encoding`` header, or None for identity.
+
+    The highest quality value wins; on a tie the preferred compression of
+    ``available_output_compressions`` is used.
+    """
+    if not accept_encoding:
+        return None
+    qualities = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[name.strip().lower()] = quality
+    candidates = []
+    for rank, compression in enumerate(available_output_compressions()):
+        quality = qualities.get(compression, qualities.get("*", 0.0))
+        if quality > 0:
+            candidates.append((-quality, rank, compression))
+    return min(candidates)[2] if candidates else None
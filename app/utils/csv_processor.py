@@ -3,8 +3,11 @@ from typing import Dict, List, Any, Optional
 import numpy as np
 from .csv_validator import detect_data_types, validate_csv_data
 from .data_processing import (
+    build_frequency_counters,
+    build_quantile_sketches,
     handle_missing_values,
     handle_outliers,
+    iqr_bounds,
     remove_duplicates,
     normalize_data,
 )
@@ -31,9 +34,12 @@ class CSVProcessor:
                 self.df, strategy="mean", columns=numeric_cols
             )
             # Handle outliers
-            self.df = handle_outliers(self.df, method="iqr", columns=numeric_cols)
+            bounds = iqr_bounds(build_quantile_sketches(self.df, numeric_cols))
+            self.df = handle_outliers(
+                self.df, method="iqr", columns=numeric_cols, bounds=bounds
+            )
             # Normalize numeric data
-            self.df = normalize_data(self.df, method="minmax", columns=numeric_cols)
+            self.df, _ = normalize_data(self.df, method="minmax", columns=numeric_cols)
 
             self.processing_history.append(
                 {"operation": "auto_clean_numeric", "columns": numeric_cols}
@@ -45,8 +51,12 @@ class CSVProcessor:
         ]
         if categorical_cols:
             # Handle missing categorical values
+            frequencies = build_frequency_counters(self.df, categorical_cols)
             self.df = handle_missing_values(
-                self.df, strategy="mode", columns=categorical_cols
+                self.df,
+                strategy="mode",
+                columns=categorical_cols,
+                frequencies=frequencies,
             )
 
             self.processing_history.append(
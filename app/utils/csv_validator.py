@@ -1,6 +1,14 @@
 import pandas as pd
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Tuple, Any, Optional
 import numpy as np
+from .data_processing import build_moments, build_quantile_sketches
+from .frequency import FrequencyCounter
+from .moments import MomentsAccumulator
+from .sketches import KLLSketch
+
+# Columns with at most this many values get exact quartiles; quantile
+# sketches are only used beyond it
+EXACT_QUANTILE_MAX_ROWS = 1_000_000
 
 
 def detect_data_types(df: pd.DataFrame) -> Dict[str, str]:
@@ -75,8 +83,21 @@ def validate_csv_data(df: pd.DataFrame) -> Tuple[bool, List[str]]:
     return len(errors) == 0, errors
 
 
-def generate_data_profile(df: pd.DataFrame) -> Dict[str, Any]:
-    """Generates a detailed data profile."""
+def generate_data_profile(
+    df: pd.DataFrame,
+    sketches: Optional[Dict[str, KLLSketch]] = None,
+    moments: Optional[Dict[str, MomentsAccumulator]] = None,
+    frequencies: Optional[Dict[str, FrequencyCounter]] = None,
+) -> Dict[str, Any]:
+    """Generates a detailed data profile.
+
+    Numeric statistics come from moments accumulators, which can be passed in
+    when they were already built while streaming the data; the missing ones
+    are built from ``df``. Quartiles are exact for columns of up to
+    ``EXACT_QUANTILE_MAX_ROWS`` values held in ``df``, and come from quantile
+    sketches beyond it. Frequent values are counted exactly on ``df`` unless
+    frequency counters are passed in.
+    """
     profile = {
         "row_count": len(df),
         "column_count": len(df.columns),
@@ -90,14 +111,43 @@ def generate_data_profile(df: pd.DataFrame) -> Dict[str, Any]:
     # Statistics for numeric columns
     numeric_cols = df.select_dtypes(include=[np.number]).columns
     if not numeric_cols.empty:
-        profile["numeric_statistics"] = df[numeric_cols].describe().to_dict()
+        moments = {} if moments is None else moments
+        missing_moments = [col for col in numeric_cols if col not in moments]
+        if missing_moments:
+            build_moments(df, missing_moments, moments)
+        sketches = {} if sketches is None else sketches
+        for col in numeric_cols:
+            count = df[col].count()
+            sketch = sketches.get(col)
+            # A passed-in sketch may cover more rows than df: exact only if df holds them all
+            if count <= EXACT_QUANTILE_MAX_ROWS and (sketch is None or sketch.count == count):
+                q1, median, q3 = df[col].quantile([0.25, 0.5, 0.75]).tolist()
+            else:
+                if sketch is None:
+                    sketch = build_quantile_sketches(df, [col], sketches)[col]
+                q1, median, q3 = sketch.quantiles([0.25, 0.5, 0.75])
+            column_moments = moments[col]
+            profile["numeric_statistics"][col] = {
+                "count": float(column_moments.count),
+                "mean": column_moments.mean,
+                "std": column_moments.std(),
+                "min": column_moments.min,
+                "25%": q1,
+                "50%": median,
+                "75%": q3,
+                "max": column_moments.max,
+            }
 
     # Statistics for categorical columns
     categorical_cols = df.select_dtypes(include=["object", "category"]).columns
     for col in categorical_cols:
+        if frequencies is not None and col in frequencies:
+            frequent_values = dict(frequencies[col].most_common(5))
+        else:
+            frequent_values = df[col].value_counts().head(5).to_dict()
         profile["categorical_statistics"][col] = {
             "unique_values": df[col].nunique(),
-            "frequent_values": df[col].value_counts().head(5).to_dict(),
+            "frequent_values": frequent_values,
         }
 
     return profile
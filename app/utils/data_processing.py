@@ -1,6 +1,10 @@
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Any, Optional, Tuple
+from .dedup import RowHashSet, row_hashes
+from .frequency import DEFAULT_CAPACITY, FrequencyCounter
+from .moments import MomentsAccumulator
+from .sketches import DEFAULT_ERROR, KLLSketch
 
 
 def validate_dataframe(df: pd.DataFrame) -> bool:
@@ -43,6 +47,25 @@ def calculate_advanced_stats(df: pd.DataFrame) -> Dict[str, Any]:
     return stats
 
 
+def apply_column_types(
+    df: pd.DataFrame,
+    dtypes: Dict[str, str],
+    date_formats: Optional[Dict[str, Optional[str]]] = None,
+) -> pd.DataFrame:
+    """Casts columns to known types (e.g. a stored schema) instead of trying conversions.
+
+    Columns in ``date_formats`` are parsed as datetimes with their format
+    (``None`` lets pandas guess it); values that do not parse become NaT.
+    """
+    date_formats = date_formats or {}
+    for col in df.columns:
+        if col in date_formats:
+            df[col] = pd.to_datetime(df[col], format=date_formats[col], errors="coerce")
+        elif col in dtypes:
+            df[col] = df[col].astype(dtypes[col])
+    return df
+
+
 def filter_dataframe(
     df: pd.DataFrame, column: str, value: Any, operator: str = "equals"
 ) -> pd.DataFrame:
@@ -59,13 +82,95 @@ def filter_dataframe(
         raise ValueError(f"Operator {operator} not supported")
 
 
+def build_quantile_sketches(
+    df: pd.DataFrame,
+    columns: Optional[List[str]] = None,
+    sketches: Optional[Dict[str, KLLSketch]] = None,
+    error: float = DEFAULT_ERROR,
+) -> Dict[str, KLLSketch]:
+    """Feeds numeric columns into quantile sketches.
+
+    Call it once per chunk with the same ``sketches`` dict (or merge the dicts
+    built by several workers) to get quantiles over the whole dataset.
+    """
+    sketches = {} if sketches is None else sketches
+    if columns is None:
+        columns = get_numeric_columns(df)
+    for col in columns:
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            continue
+        if col not in sketches:
+            sketches[col] = KLLSketch(error)
+        sketches[col].update(df[col].to_numpy(dtype=float, na_value=np.nan))
+    return sketches
+
+
+def build_moments(
+    df: pd.DataFrame,
+    columns: Optional[List[str]] = None,
+    moments: Optional[Dict[str, MomentsAccumulator]] = None,
+) -> Dict[str, MomentsAccumulator]:
+    """Feeds numeric columns into moments accumulators (count, mean, std, min, max).
+
+    Like ``build_quantile_sketches``, it can be called chunk by chunk and the
+    accumulators of several workers merged.
+    """
+    moments = {} if moments is None else moments
+    if columns is None:
+        columns = get_numeric_columns(df)
+    for col in columns:
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            continue
+        if col not in moments:
+            moments[col] = MomentsAccumulator()
+        moments[col].update(df[col].to_numpy(dtype=float, na_value=np.nan))
+    return moments
+
+
+def build_frequency_counters(
+    df: pd.DataFrame,
+    columns: Optional[List[str]] = None,
+    counters: Optional[Dict[str, FrequencyCounter]] = None,
+    capacity: int = DEFAULT_CAPACITY,
+) -> Dict[str, FrequencyCounter]:
+    """Feeds columns into frequency counters (modes and most frequent values).
+
+    Like ``build_quantile_sketches``, it can be called chunk by chunk and the
+    counters of several workers merged.
+    """
+    counters = {} if counters is None else counters
+    if columns is None:
+        columns = df.columns.tolist()
+    for col in columns:
+        if col not in counters:
+            counters[col] = FrequencyCounter(capacity)
+        counters[col].update(df[col])
+    return counters
+
+
+def iqr_bounds(sketches: Dict[str, KLLSketch]) -> Dict[str, Tuple[float, float]]:
+    """Returns the IQR outlier bounds (Q1 - 1.5 IQR, Q3 + 1.5 IQR) of each sketched column."""
+    bounds = {}
+    for col, sketch in sketches.items():
+        q1, q3 = sketch.quantiles([0.25, 0.75])
+        iqr = q3 - q1
+        bounds[col] = (q1 - 1.5 * iqr, q3 + 1.5 * iqr)
+    return bounds
+
+
 def handle_missing_values(
     df: pd.DataFrame,
     strategy: str = "auto",
     columns: Optional[List[str]] = None,
-    target_column: Optional[str] = None
+    target_column: Optional[str] = None,
+    moments: Optional[Dict[str, MomentsAccumulator]] = None,
+    frequencies: Optional[Dict[str, FrequencyCounter]] = None
 ) -> pd.DataFrame:
-    """Handles missing values while preserving data types and excluding target column."""
+    """Handles missing values while preserving data types and excluding target column.
+
+    Means are read from ``moments`` (see ``build_moments``) and modes from
+    ``frequencies`` (see ``build_frequency_counters``) when given.
+    """
     df_copy = df.copy()
     if columns is None:
         columns = [col for col in df.columns if col != target_column]
@@ -83,21 +188,21 @@ def handle_missing_values(
                         if df_copy[col].skew() > 1 or df_copy[col].skew() < -1:
                             df_copy[col] = df_copy[col].fillna(df_copy[col].median())
                         else:
-                            df_copy[col] = df_copy[col].fillna(df_copy[col].mean())
+                            df_copy[col] = df_copy[col].fillna(_column_mean(df_copy, col, moments))
                 elif col in column_types['boolean']:
-                    df_copy[col] = df_copy[col].fillna(df_copy[col].mode()[0])
+                    df_copy[col] = df_copy[col].fillna(_column_mode(df_copy, col, frequencies))
                 elif col in column_types['datetime']:
                     df_copy[col] = df_copy[col].interpolate(method='time')
                 else:
                     if df_copy[col].nunique() / len(df_copy) < 0.05:
-                        df_copy[col] = df_copy[col].fillna(df_copy[col].mode()[0])
+                        df_copy[col] = df_copy[col].fillna(_column_mode(df_copy, col, frequencies))
                     else:
                         df_copy[col] = df_copy[col].fillna('Non spécifié')
             elif strategy in ["mean", "median"] and col in column_types['numeric']:
-                value = df_copy[col].median() if strategy == "median" else df_copy[col].mean()
+                value = df_copy[col].median() if strategy == "median" else _column_mean(df_copy, col, moments)
                 df_copy[col] = df_copy[col].fillna(value)
             elif strategy == "mode":
-                df_copy[col] = df_copy[col].fillna(df_copy[col].mode()[0])
+                df_copy[col] = df_copy[col].fillna(_column_mode(df_copy, col, frequencies))
 
     # Restore original data types
     for col, dtype in original_dtypes.items():
@@ -108,17 +213,47 @@ def handle_missing_values(
                 pass
 
     return df_copy
-    
-    return df_copy
+
+
+def _column_mean(
+    df: pd.DataFrame, col: str, moments: Optional[Dict[str, MomentsAccumulator]]
+) -> float:
+    if moments is not None and col in moments:
+        return moments[col].mean
+    return df[col].mean()
+
+
+def _column_mode(
+    df: pd.DataFrame, col: str, frequencies: Optional[Dict[str, FrequencyCounter]]
+) -> Any:
+    if frequencies is not None and col in frequencies:
+        return frequencies[col].mode()
+    return df[col].mode()[0]
+
+
+def _column_std(
+    df: pd.DataFrame, col: str, moments: Optional[Dict[str, MomentsAccumulator]]
+) -> float:
+    if moments is not None and col in moments:
+        return moments[col].std()
+    return df[col].std()
 
 
 def handle_outliers(
     df: pd.DataFrame,
     method: str = "iqr",
     columns: Optional[List[str]] = None,
-    target_column: Optional[str] = None
+    target_column: Optional[str] = None,
+    bounds: Optional[Dict[str, Tuple[float, float]]] = None,
+    moments: Optional[Dict[str, MomentsAccumulator]] = None
 ) -> pd.DataFrame:
-    """Detects and handles outliers while preserving data types and excluding target column."""
+    """Detects and handles outliers while preserving data types and excluding target column.
+
+    ``bounds`` gives precomputed IQR bounds per column (see ``iqr_bounds``), for
+    instance computed on the whole dataset while processing it chunk by chunk;
+    ``moments`` likewise gives the mean and standard deviation used by the
+    z-score method.
+    """
     df_copy = df.copy()
     if columns is None:
         columns = [col for col in get_numeric_columns(df_copy) if col != target_column]
@@ -128,14 +263,19 @@ def handle_outliers(
     for col in columns:
         if pd.api.types.is_numeric_dtype(df_copy[col]):
             if method == "iqr":
-                Q1 = df_copy[col].quantile(0.25)
-                Q3 = df_copy[col].quantile(0.75)
-                IQR = Q3 - Q1
-                lower_bound = Q1 - 1.5 * IQR
-                upper_bound = Q3 + 1.5 * IQR
+                if bounds is not None and col in bounds:
+                    lower_bound, upper_bound = bounds[col]
+                else:
+                    Q1 = df_copy[col].quantile(0.25)
+                    Q3 = df_copy[col].quantile(0.75)
+                    IQR = Q3 - Q1
+                    lower_bound = Q1 - 1.5 * IQR
+                    upper_bound = Q3 + 1.5 * IQR
                 df_copy[col] = df_copy[col].clip(lower_bound, upper_bound)
             elif method == "zscore":
-                z_scores = (df_copy[col] - df_copy[col].mean()) / df_copy[col].std()
+                z_scores = (df_copy[col] - _column_mean(df_copy, col, moments)) / _column_std(
+                    df_copy, col, moments
+                )
                 df_copy[col] = df_copy[col].mask(abs(z_scores) > 3, df_copy[col].median())
 
     # Restore original data types
@@ -150,19 +290,32 @@ def handle_outliers(
 
 
 def remove_duplicates(
-    df: pd.DataFrame, subset: Optional[List[str]] = None
+    df: pd.DataFrame,
+    subset: Optional[List[str]] = None,
+    seen: Optional[RowHashSet] = None,
 ) -> pd.DataFrame:
-    """Removes duplicate rows from the DataFrame."""
-    return df.drop_duplicates(subset=subset, keep="first")
+    """Removes duplicate rows from the DataFrame.
+
+    When ``df`` is one chunk of a larger dataset, pass the same ``seen`` set for
+    every chunk: rows already seen in a previous chunk are dropped as well.
+    """
+    if seen is None:
+        return df.drop_duplicates(subset=subset, keep="first")
+    return df[seen.add(row_hashes(df, subset))]
 
 
 def normalize_data(
     df: pd.DataFrame,
     method: str = "minmax",
     columns: Optional[List[str]] = None,
-    target_column: Optional[str] = None
+    target_column: Optional[str] = None,
+    moments: Optional[Dict[str, MomentsAccumulator]] = None
 ) -> Tuple[pd.DataFrame, Dict[str, Dict[str, float]]]:
-    """Normalizes numeric data while preserving integer types and excluding target column."""
+    """Normalizes numeric data while preserving integer types and excluding target column.
+
+    With ``moments``, columns are scaled against the statistics of the whole
+    dataset instead of those of ``df`` (e.g. when ``df`` is a single chunk).
+    """
     df_copy = df.copy()
     if columns is None:
         columns = [col for col in get_numeric_columns(df_copy) if col != target_column]
@@ -177,8 +330,11 @@ def normalize_data(
                 continue
                 
             if method == "minmax":
-                min_val = df_copy[col].min()
-                max_val = df_copy[col].max()
+                if moments is not None and col in moments:
+                    min_val, max_val = moments[col].min, moments[col].max
+                else:
+                    min_val = df_copy[col].min()
+                    max_val = df_copy[col].max()
                 if min_val != max_val:
                     df_copy[col] = (df_copy[col] - min_val) / (max_val - min_val)
                     scaling_params[col] = {"min": float(min_val), "max": float(max_val)}
@@ -188,8 +344,8 @@ def normalize_data(
                         df_copy[col] = (df_copy[col] * 100).round().astype(original_dtypes[col])
             
             elif method == "zscore":
-                mean_val = df_copy[col].mean()
-                std_val = df_copy[col].std()
+                mean_val = _column_mean(df_copy, col, moments)
+                std_val = _column_std(df_copy, col, moments)
                 if std_val != 0:
                     df_copy[col] = (df_copy[col] - mean_val) / std_val
                     scaling_params[col] = {"mean": float(mean_val), "std": float(std_val)}
@@ -0,0 +1,150 @@
+import os
+import shutil
+import tempfile
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Memory used by in-memory hashes before they are spilled to disk (bytes)
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+
+# Spilled runs kept apart before the smallest ones are merged into one file
+DEFAULT_SPILL_FAN_OUT = 4
+
+# Hashes read from each run per step of a k-way merge
+MERGE_BLOCK_SIZE = 1024 * 1024
+
+
+def row_hashes(df: pd.DataFrame, subset: Optional[List[str]] = None) -> np.ndarray:
+    """Returns one 64-bit hash per row, computed on ``subset`` columns (all by default).
+
+    Rows with equal values (missing values included) get equal hashes, as
+    ``DataFrame.duplicated`` would consider them.
+    """
+    if subset is not None:
+        df = df[subset]
+    return pd.util.hash_pandas_object(df, index=False).to_numpy(dtype=np.uint64)
+
+
+class RowHashSet:
+    """Set of 64-bit row hashes used to drop duplicates across chunks.
+
+    Hashes are stored in sorted NumPy runs that are merged as they grow, so a
+    lookup is a binary search per run. Once the in-memory runs exceed
+    ``memory_budget`` bytes they are merged and spilled to a memory-mapped file
+    in ``spill_dir``; spilled runs are searched on disk. Beyond ``fan_out``
+    spilled runs, the smallest ones are merged into a single sorted file, so a
+    lookup never searches more than ``fan_out`` files. Two distinct rows share
+    a hash with negligible probability (64-bit hashes).
+    """
+
+    def __init__(self, memory_budget: int = DEFAULT_MEMORY_BUDGET, spill_dir: Optional[str] = None,
+                 fan_out: int = DEFAULT_SPILL_FAN_OUT):
+        self.memory_budget = memory_budget
+        self.spill_dir = spill_dir
+        self.fan_out = max(fan_out, 2)
+        self.size = 0
+        self._runs: List[np.ndarray] = []
+        self._spilled: List[np.ndarray] = []
+        self._tmpdir: Optional[str] = None
+        self._run_count = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, hashes: np.ndarray) -> np.ndarray:
+        """Adds hashes and returns a mask of the rows seen for the first time.
+
+        Within the batch, only the first occurrence of a hash is new, like
+        ``drop_duplicates(keep="first")``.
+        """
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        unique, first_index = np.unique(hashes, return_index=True)
+        seen = self._contains(unique)
+        new = np.zeros(len(hashes), dtype=bool)
+        new[first_index[~seen]] = True
+        if (~seen).any():
+            self._insert(unique[~seen])
+        return new
+
+    def close(self):
+        """Releases the spilled runs."""
+        self._runs, self._spilled = [], []
+        if self._tmpdir is not None:
+            shutil.rmtree(self._tmpdir, ignore_errors=True)
+            self._tmpdir = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    @property
+    def memory_bytes(self) -> int:
+        return sum(run.nbytes for run in self._runs)
+
+    def _contains(self, values: np.ndarray) -> np.ndarray:
+        found = np.zeros(len(values), dtype=bool)
+        for run in self._runs + self._spilled:
+            if not len(run):
+                continue
+            positions = np.minimum(np.searchsorted(run, values), len(run) - 1)
+            found |= run[positions] == values
+        return found
+
+    def _insert(self, values: np.ndarray):
+        self._runs.append(values)
+        self.size += len(values)
+        # Runs of similar size are merged: their number stays logarithmic
+        while len(self._runs) > 1 and len(self._runs[-2]) <= 2 * len(self._runs[-1]):
+            last = self._runs.pop()
+            self._runs[-1] = np.sort(np.concatenate([self._runs[-1], last]))
+        if self.memory_bytes > self.memory_budget:
+            self._spill()
+
+    def _spill(self):
+        if self._tmpdir is None:
+            self._tmpdir = tempfile.mkdtemp(prefix="row_hashes_", dir=self.spill_dir)
+        run = np.sort(np.concatenate(self._runs))
+        path = self._run_path()
+        np.save(path, run)
+        self._spilled.append(np.load(path, mmap_mode="r"))
+        self._runs = []
+        if len(self._spilled) > self.fan_out:
+            self._spilled.sort(key=len)
+            smallest, self._spilled = self._spilled[:self.fan_out], self._spilled[self.fan_out:]
+            self._spilled.append(self._merge_spilled(smallest))
+
+    def _run_path(self) -> str:
+        self._run_count += 1
+        return os.path.join(self._tmpdir, f"run_{self._run_count}.npy")
+
+    def _merge_spilled(self, runs: List[np.ndarray]) -> np.ndarray:
+        """K-way merge of sorted spilled runs into one file, ``MERGE_BLOCK_SIZE`` hashes per run at a time."""
+        path = self._run_path()
+        merged = np.lib.format.open_memmap(path, mode="w+", dtype=np.uint64,
+                                           shape=(sum(len(run) for run in runs),))
+        positions = [0] * len(runs)
+        written = 0
+        while written < len(merged):
+            heads = [run[position:position + MERGE_BLOCK_SIZE]
+                     for run, position in zip(runs, positions) if position < len(run)]
+            # Every hash up to the smallest block end is in the blocks read
+            bound = min(head[-1] for head in heads)
+            parts = []
+            for i, run in enumerate(runs):
+                head = run[positions[i]:positions[i] + MERGE_BLOCK_SIZE]
+                take = int(np.searchsorted(head, bound, side="right"))
+                parts.append(head[:take])
+                positions[i] += take
+            block = np.sort(np.concatenate(parts))
+            merged[written:written + len(block)] = block
+            written += len(block)
+        merged.flush()
+        del merged
+        for run in runs:
+            os.remove(run.filename)
+        return np.load(path, mmap_mode="r")
@@ -0,0 +1,74 @@
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Distinct values counted exactly before switching to the Misra-Gries summary
+DEFAULT_CAPACITY = 1000
+
+
+class FrequencyCounter:
+    """Mergeable value counter for modes and most frequent values.
+
+    Counts are exact while the column has at most ``capacity`` distinct
+    values. Above that, the counter becomes a Misra-Gries summary of
+    ``capacity`` entries: every value more frequent than
+    ``total / (capacity + 1)`` is kept, and each count is at most ``error``
+    below the true one. Summaries built on separate chunks or processes merge
+    with the same guarantee.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.total = 0
+        self.error = 0
+        self._counts = pd.Series(dtype="int64")
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    @property
+    def exact(self) -> bool:
+        return self.error == 0
+
+    def update(self, values: pd.Series) -> "FrequencyCounter":
+        """Counts values (missing values are ignored)."""
+        non_null = values.dropna()
+        self.total += len(non_null)
+        self._add(non_null.value_counts())
+        return self
+
+    def merge(self, other: "FrequencyCounter") -> "FrequencyCounter":
+        """Adds the counts of another counter to this one."""
+        self.total += other.total
+        self.error += other.error
+        self._add(other._counts)
+        return self
+
+    def items(self) -> Tuple[pd.Index, np.ndarray]:
+        """Counted values and their counts (all distinct values while exact)."""
+        return self._counts.index, self._counts.to_numpy()
+
+    def mode(self) -> Optional[Any]:
+        """Most frequent value, the smallest one on ties (like ``Series.mode``)."""
+        if not len(self._counts):
+            return None
+        candidates = self._counts.index[self._counts.to_numpy() == self._counts.max()]
+        try:
+            return sorted(candidates)[0]
+        except TypeError:
+            return candidates[0]
+
+    def most_common(self, n: int = 5) -> List[Tuple[Any, int]]:
+        """The ``n`` most frequent values with their counts, most frequent first."""
+        top = self._counts.sort_values(ascending=False, kind="mergesort").head(n)
+        return list(zip(top.index, top.to_numpy().tolist()))
+
+    def _add(self, counts: pd.Series):
+        self._counts = self._counts.add(counts, fill_value=0).astype("int64")
+        if len(self._counts) > self.capacity:
+            # Misra-Gries: subtract the (capacity + 1)-th largest count from every entry
+            position = len(self._counts) - self.capacity - 1
+            cut = np.partition(self._counts.to_numpy(), position)[position]
+            self._counts = self._counts[self._counts > cut] - cut
+            self.error += int(cut)
@@ -1,13 +1,15 @@
 import json
 import pandas as pd
 import logging
-from typing import Dict, List, Any, Optional, Tuple
+from typing import IO, Dict, Iterator, List, Any, Optional, Tuple
 from .data_processing import (
     validate_dataframe,
     calculate_advanced_stats,
     filter_dataframe,
     transform_data,
+    apply_column_types,
 )
+from .compression import open_compressed
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
@@ -49,16 +51,88 @@ def validate_json_line(line: str) -> Tuple[bool, Optional[dict], str]:
     except Exception as e:
         return False, None, f"Erreur inattendue: {str(e)}"
 
-def load_json_data(json_file_path: str) -> Optional[pd.DataFrame]:
+def iter_json_records(json_file: IO[str], block_size: int = 1024 * 1024,
+                      max_record_size: int = 64 * 1024 * 1024) -> Iterator[Dict[str, Any]]:
+    """Parcourt les enregistrements d'un tableau JSON (ou d'objets JSON successifs) au fil d'un fichier texte.
+
+    Seuls un bloc de ``block_size`` caractères et l'élément en cours sont
+    gardés en mémoire. Les objets sont aplatis comme par ``load_json_data`` ;
+    les autres éléments sont ignorés. Lève ``json.JSONDecodeError`` si le
+    contenu n'est pas du JSON valide ou si un élément dépasse ``max_record_size``.
+    """
+    decoder = json.JSONDecoder()
+    buffer, position, eof = '', 0, False
+
+    def read_more():
+        # Le texte déjà analysé est abandonné
+        nonlocal buffer, position, eof
+        block = json_file.read(block_size)
+        eof = not block
+        buffer, position = buffer[position:] + block, 0
+
+    def next_char() -> Optional[str]:
+        """Prochain caractère significatif, sans le consommer (None en fin de fichier)."""
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position].isspace():
+                position += 1
+            if position < len(buffer):
+                return buffer[position]
+            if eof:
+                return None
+            read_more()
+
+    in_array = next_char() == '['
+    if in_array:
+        position += 1
+    while True:
+        char = next_char()
+        if char is None:
+            if in_array:
+                raise json.JSONDecodeError("Tableau JSON non terminé", buffer, position)
+            return
+        if in_array and char == ']':
+            return
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # Élément coupé par la fin du bloc, ou JSON invalide
+                if eof or len(buffer) - position > max_record_size:
+                    raise
+                read_more()
+                continue
+            if end == len(buffer) and not eof:
+                # Un nombre en fin de bloc peut continuer dans le suivant
+                read_more()
+                continue
+            break
+        position = end
+        if isinstance(value, dict):
+            yield flatten_json(value)
+        if in_array:
+            char = next_char()
+            if char == ',':
+                position += 1
+            elif char != ']':
+                raise json.JSONDecodeError("',' ou ']' attendu", buffer, position)
+
+
+def load_json_data(
+    json_file_path: str,
+    dtypes: Optional[Dict[str, str]] = None,
+    date_formats: Optional[Dict[str, Optional[str]]] = None,
+) -> Optional[pd.DataFrame]:
     """Charge les données JSON dans un DataFrame pandas avec gestion des fichiers semi-structurés.
-    Transforme automatiquement les données en tableau JSON valide lors de l'upload."""
+    Transforme automatiquement les données en tableau JSON valide lors de l'upload.
+    Avec ``dtypes`` (schéma déjà connu), les types sont appliqués sans inférence."""
     try:
         logger.info(f"Début du chargement du fichier JSON: {json_file_path}")
         valid_records = []
         invalid_lines = []
         current_object = ""
         
-        with open(json_file_path, 'r', encoding='utf-8') as file:
+        with open_compressed(json_file_path, 'rt', encoding='utf-8') as file:
             # Lire le fichier ligne par ligne pour éviter les problèmes de mémoire
             lines = []
             for line in file:
@@ -147,6 +221,10 @@ def load_json_data(json_file_path: str) -> Optional[pd.DataFrame]:
             # Créer le DataFrame et gérer les types de données
             df = pd.DataFrame(valid_records)
             
+            # Types connus : pas d'essais de conversion colonne par colonne
+            if dtypes is not None:
+                return apply_column_types(df, dtypes, date_formats)
+            
             # Convertir les colonnes en types appropriés
             for col in df.columns:
                 # Essayer de convertir en numérique si possible
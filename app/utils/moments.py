@@ -0,0 +1,69 @@
+from typing import Any, Dict, Iterable
+
+import numpy as np
+
+
+class MomentsAccumulator:
+    """Streaming count, mean, variance, min and max of a numeric column.
+
+    Each batch is summarized with a two-pass computation, then combined with
+    the running state using Chan's parallel update of Welford's algorithm, so
+    accumulators built on separate chunks or processes can be merged without
+    loss of precision.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = np.nan
+        self.m2 = 0.0
+        self.min = np.nan
+        self.max = np.nan
+
+    def update(self, values: Iterable[float]) -> "MomentsAccumulator":
+        """Adds values (missing values are ignored)."""
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return self
+        batch = MomentsAccumulator()
+        batch.count = len(values)
+        batch.mean = values.mean()
+        batch.m2 = float(np.sum((values - batch.mean) ** 2))
+        batch.min = values.min()
+        batch.max = values.max()
+        return self.merge(batch)
+
+    def merge(self, other: "MomentsAccumulator") -> "MomentsAccumulator":
+        """Adds the content of another accumulator to this one."""
+        if not other.count:
+            return self
+        if not self.count:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def variance(self, ddof: int = 1) -> float:
+        """Variance, with the same ``ddof`` convention as pandas (sample variance by default)."""
+        if self.count <= ddof:
+            return np.nan
+        return self.m2 / (self.count - ddof)
+
+    def std(self, ddof: int = 1) -> float:
+        return float(np.sqrt(self.variance(ddof)))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "std": self.std(),
+            "min": self.min,
+            "max": self.max,
+        }
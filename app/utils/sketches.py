@@ -0,0 +1,140 @@
+import math
+import random
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Default normalized rank error of the quantile sketch
+DEFAULT_ERROR = 0.01
+
+# Smallest compactor size, as in the reference KLL implementation
+MIN_CAPACITY = 8
+
+
+def k_for_error(error: float) -> int:
+    """Returns the KLL accuracy parameter giving the requested normalized rank error."""
+    if not 0 < error < 1:
+        raise ValueError("The quantile error must be between 0 and 1")
+    # Empirical relation between k and the rank error of KLL sketches (99% confidence)
+    return max(int(math.ceil((2.296 / error) ** (1 / 0.9723))), MIN_CAPACITY)
+
+
+def weighted_quantile(values: np.ndarray, weights: np.ndarray, q: float) -> float:
+    """Quantile of weighted values, with the linear interpolation used by numpy.
+
+    With unit weights the result is exactly ``np.quantile(values, q)``.
+    """
+    values = np.asarray(values)
+    order = np.argsort(values, kind="mergesort")
+    sorted_values = values[order]
+    cumulative = np.cumsum(np.asarray(weights)[order])
+    if not len(cumulative):
+        return np.nan
+    position = q * (cumulative[-1] - 1)
+    lower_rank = math.floor(position)
+    lower = sorted_values[np.searchsorted(cumulative, lower_rank, side="right")]
+    upper = sorted_values[
+        np.searchsorted(cumulative, min(lower_rank + 1, cumulative[-1] - 1), side="right")
+    ]
+    return np.quantile(np.array([lower, upper]), position - lower_rank)
+
+
+class KLLSketch:
+    """Streaming, mergeable quantile sketch (KLL).
+
+    Values are kept in compactors of increasing weight; a full compactor is
+    sorted and every other item is promoted to the next level. Memory stays
+    around ``3 * k`` floats whatever the number of rows, and the sketch is
+    exact until more than ``k`` values have been seen. The minimum and the
+    maximum are always tracked exactly.
+    """
+
+    def __init__(self, error: float = DEFAULT_ERROR, seed: Optional[int] = 0):
+        self.error = error
+        self.k = k_for_error(error)
+        self.count = 0
+        self.min = np.nan
+        self.max = np.nan
+        self._levels: List[np.ndarray] = [np.empty(0)]
+        self._random = random.Random(seed)
+
+    def update(self, values: Iterable[float]) -> "KLLSketch":
+        """Adds values (missing values are ignored)."""
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return self
+        self.count += len(values)
+        self.min = np.fmin(self.min, values.min())
+        self.max = np.fmax(self.max, values.max())
+        self._levels[0] = np.concatenate([self._levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """Adds the content of another sketch to this one."""
+        if not other.count:
+            return self
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0))
+        for level, items in enumerate(other._levels):
+            self._levels[level] = np.concatenate([self._levels[level], items])
+        self.count += other.count
+        self.min = np.fmin(self.min, other.min)
+        self.max = np.fmax(self.max, other.max)
+        self._compress()
+        return self
+
+    def copy(self) -> "KLLSketch":
+        sketch = KLLSketch(self.error)
+        sketch.count, sketch.min, sketch.max = self.count, self.min, self.max
+        sketch._levels = [items.copy() for items in self._levels]
+        sketch._random.setstate(self._random.getstate())
+        return sketch
+
+    def weighted_items(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Retained values (sorted, ends set to the exact min/max) and their weights."""
+        values = np.concatenate(self._levels)
+        weights = np.concatenate(
+            [np.full(len(items), 2 ** level, dtype=np.int64) for level, items in enumerate(self._levels)]
+        )
+        order = np.argsort(values, kind="mergesort")
+        values, weights = values[order], weights[order]
+        if len(values):
+            values[0], values[-1] = self.min, self.max
+        return values, weights
+
+    def quantile(self, q: float) -> float:
+        values, weights = self.weighted_items()
+        return weighted_quantile(values, weights, q)
+
+    def quantiles(self, qs: Iterable[float]) -> List[float]:
+        values, weights = self.weighted_items()
+        return [weighted_quantile(values, weights, q) for q in qs]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(items.nbytes for items in self._levels)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self._levels) - level - 1
+        return max(int(math.ceil(self.k * (2 / 3) ** depth)), MIN_CAPACITY)
+
+    def _compress(self):
+        while True:
+            for level, items in enumerate(self._levels):
+                if len(items) > self._capacity(level):
+                    break
+            else:
+                return
+            self._compact(level)
+
+    def _compact(self, level: int):
+        if level + 1 == len(self._levels):
+            self._levels.append(np.empty(0))
+        items = np.sort(self._levels[level])
+        # With an odd number of items, one stays at this level
+        kept, pairs = items[: len(items) % 2], items[len(items) % 2:]
+        offset = self._random.randint(0, 1)
+        self._levels[level] = kept
+        self._levels[level + 1] = np.concatenate([self._levels[level + 1], pairs[offset::2]])
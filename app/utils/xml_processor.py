@@ -7,7 +7,9 @@ from .data_processing import (
     calculate_advanced_stats,
     filter_dataframe,
     transform_data,
+    apply_column_types,
 )
+from .compression import open_compressed
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
@@ -89,13 +91,19 @@ def xml_to_dict(element: ET.Element, parent_path: str = "") -> Dict[str, Any]:
 
 
 
-def load_xml_data(xml_file_path: str) -> Optional[pd.DataFrame]:
-    """Charge les données XML dans un DataFrame pandas."""
+def load_xml_data(
+    xml_file_path: str,
+    dtypes: Optional[Dict[str, str]] = None,
+    date_formats: Optional[Dict[str, Optional[str]]] = None,
+) -> Optional[pd.DataFrame]:
+    """Charge les données XML dans un DataFrame pandas.
+    Avec ``dtypes`` (schéma déjà connu), les types sont appliqués sans inférence."""
     try:
         logger.info(f"Début du chargement du fichier XML: {xml_file_path}")
         
-        # Lire le fichier XML
-        tree = ET.parse(xml_file_path)
+        # Lire le fichier XML (décompressé à la volée s'il est compressé)
+        with open_compressed(xml_file_path) as xml_file:
+            tree = ET.parse(xml_file)
         root = tree.getroot()
         
         logger.debug(f"XML root tag: {root.tag}")
@@ -144,6 +152,12 @@ def load_xml_data(xml_file_path: str) -> Optional[pd.DataFrame]:
             logger.error(f"Erreur lors de la création du DataFrame: {str(e)}")
             return None
         
+        # Types connus : pas d'essais de conversion colonne par colonne
+        if dtypes is not None:
+            df = apply_column_types(df, dtypes, date_formats)
+            logger.info(f"Traitement terminé: {len(df)} enregistrements chargés")
+            return df
+        
         # Convertir les types de données
         for col in df.columns:
             # Essayer de convertir en numérique
@@ -0,0 +1,159 @@
+"""Benchmark de process_features sur des DataFrames larges synthétiques.
+
+Compare le noyau vectorisé (par blocs de dtype) à la boucle colonne par
+colonne d'origine, et vérifie que les deux sorties sont identiques.
+
+Usage : python -m benchmarks.process_features [--rows N] [--columns N] [--repeat N]
+"""
+import argparse
+import itertools
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_processor.processing import process_features
+
+
+def process_features_by_column(df_features, target_data, cleaned_data, processing_summary):
+    """Implémentation de référence : la boucle colonne par colonne d'origine (views.py), recopiée telle quelle."""
+    # Traitement des valeurs manquantes
+    if cleaned_data['handle_missing']:
+        for column in df_features.columns:
+            # Identifier le type de colonne
+            is_binary = df_features[column].dropna().isin([0, 1]).all()
+            is_numeric = pd.api.types.is_numeric_dtype(df_features[column])
+            
+            strategy = cleaned_data['missing_strategy']
+            
+            if is_binary:
+                # Variables binaires : remplacer par le mode (0 ou 1)
+                fill_value = df_features[column].mode()[0]
+                df_features[column] = df_features[column].fillna(fill_value).astype(int)
+            elif is_numeric:
+                # Variables numériques
+                if strategy == 'mean':
+                    fill_value = df_features[column].mean()
+                elif strategy == 'median':
+                    fill_value = df_features[column].median()
+                else:  # mode
+                    fill_value = df_features[column].mode()[0]
+                
+                # Conserver le type d'origine si possible
+                if pd.api.types.is_integer_dtype(df_features[column]):
+                    df_features[column] = df_features[column].fillna(round(fill_value)).astype(int)
+                else:
+                    df_features[column] = df_features[column].fillna(fill_value)
+            else:
+                # Variables catégorielles
+                fill_value = df_features[column].mode()[0]
+                df_features[column] = df_features[column].fillna(fill_value)
+        
+        processing_summary['missing_values'] = 'Traitées selon le type de variable'
+    
+    # Traitement des outliers (uniquement sur les features numériques)
+    if cleaned_data['handle_outliers']:
+        numeric_cols = df_features.select_dtypes(include=[np.number]).columns
+        for column in numeric_cols:
+            Q1 = df_features[column].quantile(0.25)
+            Q3 = df_features[column].quantile(0.75)
+            IQR = Q3 - Q1
+            lower_bound = Q1 - 1.5*IQR
+            upper_bound = Q3 + 1.5*IQR
+            
+            # Ne pas modifier les valeurs si elles sont dans les bornes
+            mask = (df_features[column] >= lower_bound) & (df_features[column] <= upper_bound)
+            df_features[column] = np.where(mask, df_features[column], 
+                                         df_features[column].clip(lower_bound, upper_bound))
+            
+            # Conserver le type d'origine
+            if pd.api.types.is_integer_dtype(df_features[column]):
+                df_features[column] = df_features[column].round().astype(int)
+        
+        processing_summary['outliers'] = 'Traitées avec la méthode IQR'
+    
+    # Normalisation Min-Max (évite les valeurs négatives)
+    if cleaned_data['normalize_data']:
+        numeric_cols = df_features.select_dtypes(include=[np.number]).columns
+        for column in numeric_cols:
+            min_val = df_features[column].min()
+            max_val = df_features[column].max()
+            if max_val != min_val:  # éviter la division par zéro
+                df_features[column] = (df_features[column] - min_val) / (max_val - min_val)
+                # Conserver le type si possible
+                if pd.api.types.is_integer_dtype(df_features[column]):
+                    df_features[column] = (df_features[column] * 100).round().astype(int)
+        
+        processing_summary['normalization'] = 'Normalisation Min-Max (0-1)'
+    
+    # Suppression des doublons (sur les features seulement)
+    if cleaned_data['remove_duplicates']:
+        initial_rows = len(df_features)
+        df_features = df_features.drop_duplicates()
+        processing_summary['duplicates'] = f'{initial_rows - len(df_features)} doublons supprimés'
+    
+    # Réintégrer la colonne cible si elle existe
+    if target_data is not None:
+        return pd.concat([df_features, target_data], axis=1)
+    return df_features
+
+
+def make_wide_frame(rows: int, columns: int, seed: int = 0) -> pd.DataFrame:
+    """Mélange de colonnes flottantes, entières, binaires et textuelles avec des manquants."""
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(columns):
+        kind = i % 5
+        if kind == 0:
+            values = rng.normal(50, 15, rows)
+            values[rng.random(rows) < 0.05] = np.nan
+            values[rng.random(rows) < 0.01] *= 10  # outliers
+        elif kind == 1:
+            values = rng.integers(0, 1000, rows)
+            values[rng.random(rows) < 0.01] = 100000
+        elif kind == 2:
+            values = rng.integers(0, 2, rows).astype(float)
+            values[rng.random(rows) < 0.05] = np.nan
+        elif kind == 3:
+            values = rng.integers(0, 20, rows).astype(float)
+            values[rng.random(rows) < 0.1] = np.nan
+        else:
+            values = rng.choice(np.array(['a', 'b', 'c', None], dtype=object), rows)
+        data[f'col_{i}'] = values
+    return pd.DataFrame(data)
+
+
+def timed(function, repeat):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--columns', type=int, nargs='+', default=[50, 200, 500, 1000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'colonnes':>9} {'stratégie':>9} {'par colonne':>12} {'par blocs':>10} {'gain':>6}")
+    for columns, strategy in itertools.product(args.columns, ['mean', 'median', 'mode']):
+        df = make_wide_frame(args.rows, columns)
+        cleaned_data = {
+            'handle_missing': True, 'handle_outliers': True, 'normalize_data': True,
+            'remove_duplicates': False, 'missing_strategy': strategy,
+        }
+        reference_time, expected = timed(
+            lambda: process_features_by_column(df.copy(), None, cleaned_data, {}), args.repeat)
+        block_time, result = timed(
+            lambda: process_features(df.copy(), None, cleaned_data, {}), args.repeat)
+        pd.testing.assert_frame_equal(result, expected, check_exact=True)
+        print(f'{columns:>9} {strategy:>9} {reference_time:>11.3f}s {block_time:>9.3f}s '
+              f'{reference_time / block_time:>5.1f}x')
+
+
+if __name__ == '__main__':
+    main()
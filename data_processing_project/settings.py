@@ -130,6 +130,50 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 FILE_UPLOAD_PERMISSIONS = 0o644
 FILE_UPLOAD_DIRECTORY_PERMISSIONS = 0o755
 
+# Empreinte SHA-256 (stockage adressé par contenu) et métadonnées calculées pendant la réception
+FILE_UPLOAD_HANDLERS = [
+    'data_processor.upload_handlers.DataMemoryFileUploadHandler',
+    'data_processor.upload_handlers.DataTemporaryFileUploadHandler',
+]
+
+# Imports reprenables en parties numérotées (voir `manage.py cleanup_upload_sessions`)
+UPLOAD_PART_SIZE = env.int('UPLOAD_PART_SIZE', default=8 * 1024 * 1024)
+UPLOAD_MAX_PART_SIZE = env.int('UPLOAD_MAX_PART_SIZE', default=64 * 1024 * 1024)
+# Taille maximale d'un fichier importé en parties (le fichier partiel est alloué à cette taille)
+UPLOAD_MAX_FILE_SIZE = env.int('UPLOAD_MAX_FILE_SIZE', default=20 * 1024 * 1024 * 1024)
+# Durée sans activité après laquelle une session et son fichier partiel sont supprimés
+# (à l'ouverture d'une nouvelle session, ou par `manage.py cleanup_upload_sessions`)
+UPLOAD_SESSION_TTL_HOURS = env.int('UPLOAD_SESSION_TTL_HOURS', default=24)
+
+# Aperçu paginé : une position en octets toutes les PREVIEW_INDEX_STEP lignes (index `<fichier>.rows`)
+PREVIEW_INDEX_STEP = env.int('PREVIEW_INDEX_STEP', default=1000)
+PREVIEW_PAGE_SIZE = env.int('PREVIEW_PAGE_SIZE', default=100)
+PREVIEW_MAX_PAGE_SIZE = env.int('PREVIEW_MAX_PAGE_SIZE', default=1000)
+
+# Exports matérialisés (`<MEDIA_ROOT>/exports`) : taille totale avant éviction des moins récents (0 = pas de cache)
+EXPORT_CACHE_MAX_BYTES = env.int('EXPORT_CACHE_MAX_BYTES', default=2 * 1024 * 1024 * 1024)
+
+# Cache partagé entre le serveur web et les workers de traitement (progression, aperçus) :
+# il doit se trouver sur un volume commun aux deux, comme les fichiers importés
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': env('CACHE_LOCATION', default=os.path.join(MEDIA_ROOT, 'cache')),
+    }
+}
+
+# File des traitements en arrière-plan (voir `manage.py process_jobs`)
+PROCESSING_WORKERS = env.int('PROCESSING_WORKERS', default=2)
+PROCESSING_POLL_INTERVAL = env.float('PROCESSING_POLL_INTERVAL', default=1.0)
+# Processus utilisés par une tâche pour traiter ses chunks en parallèle (1 = séquentiel)
+PROCESSING_CHUNK_WORKERS = env.int('PROCESSING_CHUNK_WORKERS', default=1)
+# Erreur de rang des quantiles (bornes IQR, médiane) calculés sur le fichier entier
+PROCESSING_QUANTILE_ERROR = env.float('PROCESSING_QUANTILE_ERROR', default=0.01)
+# Valeurs distinctes comptées exactement pour le mode, avant de ne garder que les plus fréquentes
+PROCESSING_FREQUENCY_CAPACITY = env.int('PROCESSING_FREQUENCY_CAPACITY', default=1000)
+# Mémoire des empreintes de lignes pour la suppression des doublons (octets)
+PROCESSING_DEDUP_MEMORY = env.int('PROCESSING_DEDUP_MEMORY', default=64 * 1024 * 1024)
+
 # Configuration pour Render
 if env.bool('RENDER', default=False):
     SECURE_SSL_REDIRECT = True
@@ -144,6 +188,7 @@ if env.bool('RENDER', default=False):
     SECURE_HSTS_INCLUDE_SUBDOMAINS = True
     SECURE_HSTS_PRELOAD = True
     MEDIA_ROOT = '/opt/render/project/src/media'
+    CACHES['default']['LOCATION'] = env('CACHE_LOCATION', default=os.path.join(MEDIA_ROOT, 'cache'))
     ALLOWED_HOSTS = ['*']
     CORS_ORIGIN_ALLOW_ALL = True
 
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import DataFile
+from .models import DataFile, ProcessingJob, UploadSession
 
 # Personnalisation de l'interface d'administration
 admin.site.site_header = "Data Processing Admin"
@@ -12,7 +12,7 @@ class DataFileAdmin(admin.ModelAdmin):
     list_display = ('original_filename', 'user', 'file_type', 'upload_date', 'processed', 'status_badge')
     list_filter = ('processed', 'file_type', 'upload_date', 'user')
     search_fields = ('original_filename', 'user__email', 'user__first_name', 'user__last_name')
-    readonly_fields = ('upload_date', 'row_count', 'column_count', 'processing_summary')
+    readonly_fields = ('upload_date', 'row_count', 'column_count', 'file_size', 'schema', 'processing_summary')
     ordering = ('-upload_date',)
     
     fieldsets = (
@@ -23,10 +23,10 @@ class DataFileAdmin(admin.ModelAdmin):
             'fields': ('original_file_type', 'file_type')
         }),
         ('Statistiques', {
-            'fields': ('row_count', 'column_count')
+            'fields': ('row_count', 'column_count', 'file_size', 'schema')
         }),
         ('Traitement', {
-            'fields': ('processed', 'missing_values', 'outliers', 'processing_summary')
+            'fields': ('processed', 'processing_status', 'processing_error', 'missing_values', 'outliers', 'processing_summary')
         })
     )
     
@@ -37,3 +37,18 @@ class DataFileAdmin(admin.ModelAdmin):
     
     status_badge.short_description = 'Statut'
     status_badge.admin_order_field = 'processed'
+
+
+@admin.register(ProcessingJob)
+class ProcessingJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'data_file', 'status', 'created_at', 'started_at', 'finished_at')
+    list_filter = ('status',)
+    readonly_fields = ('created_at', 'started_at', 'finished_at', 'worker_pid')
+    ordering = ('-created_at',)
+
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ('filename', 'user', 'total_size', 'offset', 'created_at', 'updated_at')
+    readonly_fields = ('created_at', 'updated_at')
+    ordering = ('-updated_at',)
@@ -0,0 +1,129 @@
+import contextlib
+import hashlib
+import os
+import shutil
+import tempfile
+from typing import Callable, IO, Iterator, Optional, Union
+
+from django.conf import settings
+
+
+def export_cache_dir() -> str:
+    """Répertoire des exports matérialisés, un sous-répertoire par DataFile."""
+    return os.path.join(settings.MEDIA_ROOT, 'exports')
+
+
+def file_version(path: str) -> str:
+    """Version d'un fichier : change dès qu'il est réécrit (chemin, date de modification, taille)."""
+    stat = os.stat(path)
+    return hashlib.sha256(f'{path}:{stat.st_mtime_ns}:{stat.st_size}'.encode()).hexdigest()[:16]
+
+
+def export_cache_path(data_file, export_format: str) -> str:
+    """Entrée du cache pour un format, propre à la version du fichier traité."""
+    return os.path.join(export_cache_dir(), str(data_file.pk),
+                        f'{file_version(data_file.processed_path)}.{export_format}')
+
+
+def cached_export(data_file, export_format: str) -> Optional[str]:
+    """Export déjà matérialisé pour la version courante du fichier traité, ou None.
+
+    Un accès rafraîchit la date de modification de l'entrée : c'est l'ordre
+    d'éviction (les moins récemment servies d'abord).
+    """
+    if settings.EXPORT_CACHE_MAX_BYTES <= 0:
+        return None
+    path = export_cache_path(data_file, export_format)
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    return path
+
+
+@contextlib.contextmanager
+def _cache_entry(path: str):
+    # Écrit dans un fichier temporaire voisin, publié par renommage atomique
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    target = tempfile.NamedTemporaryFile(dir=os.path.dirname(path), prefix='.', suffix='.tmp', delete=False)
+    temp_path = target.name
+    try:
+        with target:
+            yield target
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    evict_exports()
+
+
+def store_export(data_file, export_format: str, write: Callable[[IO[bytes]], object]) -> IO[bytes]:
+    """Matérialise un export avec ``write(target)`` et l'ouvre en lecture.
+
+    Sans budget (``EXPORT_CACHE_MAX_BYTES`` nul), l'export est écrit dans un
+    fichier temporaire supprimé à la fermeture. Le fichier est ouvert avant
+    l'éviction : il reste lisible même s'il est aussitôt évincé.
+    """
+    if settings.EXPORT_CACHE_MAX_BYTES <= 0:
+        target = tempfile.TemporaryFile()
+        try:
+            write(target)
+        except Exception:
+            target.close()
+            raise
+        target.seek(0)
+        return target
+    with _cache_entry(export_cache_path(data_file, export_format)) as target:
+        write(target)
+        target.flush()
+        opened = open(target.name, 'rb')
+    return opened
+
+
+def tee_export(data_file, export_format: str, parts: Iterator[Union[str, bytes]]) -> Iterator[bytes]:
+    """Transmet un export produit à la volée tout en l'enregistrant dans le cache.
+
+    L'entrée n'est publiée que si l'export est allé à son terme : un
+    téléchargement interrompu ne laisse pas de fichier partiel.
+    """
+    if settings.EXPORT_CACHE_MAX_BYTES <= 0:
+        for part in parts:
+            yield part.encode('utf-8') if isinstance(part, str) else part
+        return
+    with _cache_entry(export_cache_path(data_file, export_format)) as target:
+        for part in parts:
+            data = part.encode('utf-8') if isinstance(part, str) else part
+            target.write(data)
+            yield data
+
+
+def invalidate_exports(data_file_id: int):
+    """Supprime les exports matérialisés d'un fichier (retraité ou supprimé)."""
+    shutil.rmtree(os.path.join(export_cache_dir(), str(data_file_id)), ignore_errors=True)
+
+
+def evict_exports(max_bytes: Optional[int] = None) -> int:
+    """Supprime les exports les moins récemment servis au-delà du budget. Retourne les octets libérés."""
+    max_bytes = settings.EXPORT_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    entries = []
+    for directory, _, filenames in os.walk(export_cache_dir()):
+        for filename in filenames:
+            if filename.startswith('.'):
+                # Export en cours d'écriture
+                continue
+            path = os.path.join(directory, filename)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    freed = 0
+    for _, size, path in sorted(entries):
+        if total - freed <= max_bytes:
+            break
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+        freed += size
+    return freed
@@ -0,0 +1,189 @@
+from typing import IO, Any, Dict, Iterator, List, Union
+
+import pandas as pd
+
+from app.utils.columnar import FeatherChunkWriter, ParquetChunkWriter
+
+from .processing import CHUNK_SIZE, DataChunkReader, JSONLinesError, is_json_array
+from .schema import read_data_file, schema_columns, schema_dtypes
+
+# Taille des lectures d'un fichier recopié tel quel
+READ_SIZE = 1024 * 1024
+
+# Lignes d'une feuille Excel (xlsx), en-tête compris
+EXCEL_MAX_ROWS = 1048576
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+PARQUET_CONTENT_TYPE = 'application/vnd.apache.parquet'
+FEATHER_CONTENT_TYPE = 'application/vnd.apache.arrow.file'
+
+# Formats d'export : type de contenu et extension du fichier téléchargé
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'json': ('application/json', 'json'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'excel': (XLSX_CONTENT_TYPE, 'xlsx'),
+    'parquet': (PARQUET_CONTENT_TYPE, 'parquet'),
+    'feather': (FEATHER_CONTENT_TYPE, 'feather'),
+}
+
+# Formats texte : produits à la volée, compressibles en flux
+TEXT_EXPORT_FORMATS = ('csv', 'json', 'ndjson')
+
+
+def iter_export_chunks(path: str, file_type: str, schema: List[Dict[str, Any]],
+                       chunk_size: int = CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """Chunks d'un fichier traité, lus avec les types de son schéma (dates laissées en texte).
+
+    Un JSON mal formé (ni un enregistrement par ligne, ni un tableau valide)
+    est chargé en une fois.
+    """
+    reader = DataChunkReader(path, file_type, chunk_size, dtype=schema_dtypes(schema))
+    try:
+        yield from reader
+    except JSONLinesError:
+        yield read_data_file(path, file_type, schema, parse_dates=False)
+
+
+def iter_csv_export(path: str, file_type: str, schema: List[Dict[str, Any]],
+                    chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """CSV produit chunk par chunk ; l'en-tête n'est écrit qu'une fois."""
+    header = True
+    for chunk in iter_export_chunks(path, file_type, schema, chunk_size):
+        yield chunk.to_csv(index=False, header=header)
+        header = False
+    if header:
+        # Fichier sans lignes : l'en-tête seul
+        yield pd.DataFrame(columns=schema_columns(schema)).to_csv(index=False)
+
+
+def iter_json_export(path: str, file_type: str, schema: List[Dict[str, Any]],
+                     chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Tableau JSON d'enregistrements, produit chunk par chunk."""
+    yield '['
+    separator = ''
+    for chunk in iter_export_chunks(path, file_type, schema, chunk_size):
+        records = chunk.to_json(orient='records')[1:-1]
+        if records:
+            yield separator + records
+            separator = ','
+    yield ']'
+
+
+def iter_ndjson_export(path: str, file_type: str, schema: List[Dict[str, Any]],
+                       chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Un enregistrement JSON par ligne (NDJSON), produit chunk par chunk."""
+    for chunk in iter_export_chunks(path, file_type, schema, chunk_size):
+        if len(chunk):
+            yield chunk.to_json(orient='records', lines=True).rstrip('\n') + '\n'
+
+
+def write_xlsx_export(path: str, file_type: str, schema: List[Dict[str, Any]], target: IO[bytes],
+                      chunk_size: int = CHUNK_SIZE, max_rows: int = EXCEL_MAX_ROWS) -> int:
+    """Écrit un classeur xlsx dans ``target``, chunk par chunk, en mode écriture seule d'openpyxl.
+
+    Les lignes sont écrites sur disque au fur et à mesure : la mémoire reste
+    de l'ordre d'un chunk. Au-delà de ``max_rows`` lignes (en-tête compris),
+    la suite continue sur une nouvelle feuille (Sheet2, Sheet3...), avec
+    l'en-tête. Retourne le nombre de feuilles.
+    """
+    try:
+        from openpyxl import Workbook
+    except ImportError as e:
+        raise ImportError("Le paquet openpyxl est nécessaire à l'export Excel") from e
+
+    workbook = Workbook(write_only=True)
+    sheet = None
+    sheet_rows = 0
+    header = schema_columns(schema)
+    for chunk in iter_export_chunks(path, file_type, schema, chunk_size):
+        header = [str(column) for column in chunk.columns]
+        # Valeurs Python, manquantes en cellules vides
+        values = chunk.astype(object).where(chunk.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            if sheet is None or sheet_rows >= max_rows:
+                sheet = workbook.create_sheet(f'Sheet{len(workbook.worksheets) + 1}')
+                sheet.append(header)
+                sheet_rows = 1
+            sheet.append(row)
+            sheet_rows += 1
+    if sheet is None:
+        # Fichier sans lignes : l'en-tête seul
+        workbook.create_sheet('Sheet1').append(header)
+    workbook.save(target)
+    return len(workbook.worksheets)
+
+
+def write_parquet_export(path: str, file_type: str, schema: List[Dict[str, Any]], target: IO[bytes],
+                         chunk_size: int = CHUNK_SIZE):
+    """Écrit un fichier Parquet compressé dans ``target``, un groupe de lignes par chunk."""
+    writer = ParquetChunkWriter(target)
+    for chunk in iter_export_chunks(path, file_type, schema, chunk_size):
+        writer.write(chunk)
+    writer.close()
+
+
+def write_feather_export(path: str, file_type: str, schema: List[Dict[str, Any]], target: IO[bytes],
+                         chunk_size: int = CHUNK_SIZE):
+    """Écrit un fichier Feather (Arrow IPC) compressé dans ``target``, un lot par chunk."""
+    writer = FeatherChunkWriter(target)
+    for chunk in iter_export_chunks(path, file_type, schema, chunk_size):
+        writer.write(chunk)
+    writer.close()
+
+
+# Formats binaires : écrits dans un fichier avant d'être servis
+BINARY_EXPORT_WRITERS = {
+    'excel': write_xlsx_export,
+    'parquet': write_parquet_export,
+    'feather': write_feather_export,
+}
+
+
+def is_stored_as(path: str, file_type: str, export_format: str) -> bool:
+    """Le fichier traité a-t-il déjà le format d'export demandé (recopié tel quel) ?"""
+    if export_format in ('csv', 'parquet'):
+        return file_type == export_format
+    if export_format == 'json':
+        return file_type == 'json' and is_json_array(path)
+    if export_format == 'ndjson':
+        return file_type == 'json' and not is_json_array(path)
+    return False
+
+
+def iter_text_export(path: str, file_type: str, schema: List[Dict[str, Any]], export_format: str,
+                     chunk_size: int = CHUNK_SIZE) -> Iterator[Union[str, bytes]]:
+    """Export texte (csv, json, ndjson) produit morceau par morceau, en recopiant le fichier si possible."""
+    if is_stored_as(path, file_type, export_format):
+        return iter_file(path)
+    if export_format == 'json' and file_type == 'json':
+        return iter_json_lines_as_array(path)
+    iter_export = {'csv': iter_csv_export, 'json': iter_json_export, 'ndjson': iter_ndjson_export}[export_format]
+    return iter_export(path, file_type, schema, chunk_size)
+
+
+def iter_file(path: str) -> Iterator[bytes]:
+    with open(path, 'rb') as f:
+        yield from iter(lambda: f.read(READ_SIZE), b'')
+
+
+def iter_json_lines_as_array(path: str) -> Iterator[bytes]:
+    """Tableau JSON à partir d'un fichier d'un enregistrement par ligne, sans analyser les lignes.
+
+    Les lignes ont été écrites par pandas : elles sont recopiées, séparées
+    par des virgules.
+    """
+    yield b'['
+    separator = b''
+    tail = b''
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(READ_SIZE), b''):
+            lines = (tail + block).split(b'\n')
+            tail = lines.pop()
+            records = [line for line in lines if line.strip()]
+            if records:
+                yield separator + b','.join(records)
+                separator = b','
+    if tail.strip():
+        yield separator + tail
+    yield b']'
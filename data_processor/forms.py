@@ -39,7 +39,7 @@ class DataFileUploadForm(forms.ModelForm):
         widgets = {
             'file': forms.FileInput(attrs={
                 'class': 'form-control',
-                'accept': '.csv,.json,.xml'
+                'accept': '.csv,.json,.xml,.gz,.bz2,.zst'
             })
         }
 
@@ -0,0 +1,93 @@
+import datetime
+import os
+import re
+
+from django.http import FileResponse, HttpResponse
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+from .export_cache import file_version
+
+# Une seule plage d'octets : « bytes=début-fin », « bytes=début- » ou « bytes=-longueur »
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def file_etag(path: str, *variant) -> str:
+    """Validateur fort d'une représentation d'un fichier (format, page...), sans guillemets."""
+    return '-'.join([file_version(path)] + [str(part) for part in variant])
+
+
+def file_last_modified(path: str) -> datetime.datetime:
+    return datetime.datetime.fromtimestamp(os.stat(path).st_mtime, tz=datetime.timezone.utc)
+
+
+class FileRange:
+    """Vue en lecture seule sur ``length`` octets d'un fichier ouvert, à partir de ``start``."""
+
+    def __init__(self, f, start: int, length: int):
+        self.file = f
+        self.remaining = length
+        f.seek(start)
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def ranged_file_response(request, response: FileResponse, etag: str,
+                         last_modified: datetime.datetime) -> HttpResponse:
+    """Réponse partielle (206) à une requête ``Range`` sur un fichier servi depuis le disque.
+
+    Les validateurs (``ETag``, ``Last-Modified``) sont posés sur la réponse.
+    Une seule plage est servie ; une plage multiple ou d'une autre unité
+    reçoit le fichier entier, comme une requête dont ``If-Range`` ne
+    correspond plus à la version courante. Une plage hors du fichier
+    reçoit une 416.
+    """
+    response['ETag'] = quote_etag(etag)
+    response['Last-Modified'] = http_date(last_modified.timestamp())
+    response['Accept-Ranges'] = 'bytes'
+    header = request.META.get('HTTP_RANGE', '').strip()
+    if not header or request.method not in ('GET', 'HEAD') or not response.has_header('Content-Length'):
+        return response
+    if not _if_range_matches(request.META.get('HTTP_IF_RANGE'), etag, last_modified):
+        return response
+    match = RANGE_RE.match(header)
+    if match is None or match.groups() == ('', ''):
+        return response
+
+    size = int(response['Content-Length'])
+    first, last = match.groups()
+    if first == '':
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        response.close()
+        unsatisfiable = HttpResponse(status=416)
+        unsatisfiable['Content-Range'] = f'bytes */{size}'
+        return unsatisfiable
+
+    partial = FileResponse(FileRange(response.file_to_stream, start, end - start + 1),
+                           status=206, content_type=response['Content-Type'])
+    for name in ('Content-Disposition', 'Content-Encoding', 'Vary', 'ETag', 'Last-Modified',
+                 'Accept-Ranges'):
+        if response.has_header(name):
+            partial[name] = response[name]
+    partial['Content-Length'] = end - start + 1
+    partial['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return partial
+
+
+def _if_range_matches(if_range, etag: str, last_modified: datetime.datetime) -> bool:
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        # Seul un validateur fort autorise une plage
+        return if_range == quote_etag(etag)
+    return parse_http_date_safe(if_range) == int(last_modified.timestamp())
@@ -0,0 +1,209 @@
+import logging
+import multiprocessing
+import os
+import signal
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from django.utils import timezone
+
+from .export_cache import invalidate_exports
+from .models import DataFile, ProcessingJob
+from .processing import ChunkedProcessor, CHUNK_SIZE
+from .preview import invalidate_preview
+from .progress import ProgressTracker, clear_progress
+from .schema import schema_dtypes
+from .storage import processing_key, release_processed_output
+from .writers import ProcessedFileWriter
+
+logger = logging.getLogger(__name__)
+
+
+def submit_processing_job(data_file: DataFile, options: dict) -> ProcessingJob:
+    """Met le traitement d'un fichier en file d'attente et retourne la tâche.
+
+    Si une tâche est déjà en attente ou en cours pour ce fichier, elle est
+    retournée au lieu d'en créer une nouvelle. Si un fichier de même contenu
+    a déjà été traité avec les mêmes options, son résultat est réutilisé et
+    la tâche est terminée immédiatement.
+    """
+    with transaction.atomic():
+        job = data_file.jobs.filter(
+            status__in=[DataFile.STATUS_PENDING, DataFile.STATUS_RUNNING]
+        ).first()
+        if job is None:
+            job = _reuse_processed_output(data_file, options)
+        if job is None:
+            job = ProcessingJob.objects.create(data_file=data_file, options=options)
+            data_file.processing_status = DataFile.STATUS_PENDING
+            data_file.processing_error = ''
+            data_file.save(update_fields=['processing_status', 'processing_error'])
+    return job
+
+
+def _reuse_processed_output(data_file: DataFile, options: dict):
+    if not data_file.sha256:
+        return None
+    key = processing_key(options)
+    if not os.path.exists(data_file.processed_path_for(key, DataFile.PROCESSED_FORMAT)):
+        return None
+    original = DataFile.objects.filter(
+        sha256=data_file.sha256, file=data_file.file.name, processing_key=key,
+        processed_format=DataFile.PROCESSED_FORMAT,
+        processed=True, processing_status=DataFile.STATUS_DONE
+    ).first()
+    if original is None:
+        return None
+    now = timezone.now()
+    job = ProcessingJob.objects.create(
+        data_file=data_file, options=options, status=DataFile.STATUS_DONE,
+        started_at=now, finished_at=now
+    )
+    old_key, old_format = data_file.processing_key, data_file.processed_format
+    data_file.processed = True
+    data_file.processing_key = key
+    data_file.processed_format = DataFile.PROCESSED_FORMAT
+    data_file.processing_summary = original.processing_summary
+    data_file.processed_schema = original.processed_schema
+    data_file.processed_column_stats = original.processed_column_stats
+    data_file.outliers = original.outliers
+    data_file.processing_status = DataFile.STATUS_DONE
+    data_file.processing_error = ''
+    data_file.save()
+    release_processed_output(data_file, old_key, old_format)
+    invalidate_preview(data_file.id)
+    invalidate_exports(data_file.id)
+    return job
+
+
+def claim_next_job():
+    """Réserve la plus ancienne tâche en attente pour ce processus."""
+    while True:
+        job = ProcessingJob.objects.filter(status=DataFile.STATUS_PENDING).order_by('created_at', 'pk').first()
+        if job is None:
+            return None
+        # La mise à jour conditionnelle garantit qu'un seul worker obtient la tâche
+        claimed = ProcessingJob.objects.filter(pk=job.pk, status=DataFile.STATUS_PENDING).update(
+            status=DataFile.STATUS_RUNNING, started_at=timezone.now(), worker_pid=os.getpid()
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+
+def run_processing(data_file: DataFile, options: dict) -> dict:
+    """Traite le fichier et écrit le fichier ``_processed`` (Parquet). Retourne le résumé.
+
+    Les types du schéma enregistré à l'import sont imposés à la lecture ; le
+    schéma et les statistiques du fichier produit sont placés dans
+    ``data_file.processed_schema`` et ``data_file.processed_column_stats``.
+    """
+    # Progression d'après la position dans le fichier, sans passe de comptage
+    progress = ProgressTracker(data_file.id)
+
+    # Première passe : statistiques sur le fichier entier,
+    # seconde passe : nettoyage chunk par chunk avec ces statistiques
+    processor = ChunkedProcessor(
+        data_file.file.path, data_file.file_type, options,
+        chunk_size=CHUNK_SIZE, progress_callback=progress,
+        workers=settings.PROCESSING_CHUNK_WORKERS,
+        quantile_error=settings.PROCESSING_QUANTILE_ERROR,
+        frequency_capacity=settings.PROCESSING_FREQUENCY_CAPACITY,
+        dedup_memory=settings.PROCESSING_DEDUP_MEMORY,
+        dtype=schema_dtypes(data_file.schema) or None
+    )
+
+    # Chaque chunk traité est ajouté au fichier final puis libéré ; le chemin
+    # dépend du contenu et des options, pour être réutilisé par les fichiers identiques
+    processed_path = data_file.processed_path_for(processing_key(options), DataFile.PROCESSED_FORMAT)
+    with ProcessedFileWriter(processed_path, DataFile.PROCESSED_FORMAT) as writer:
+        for processed_chunk in processor.iter_processed_chunks():
+            writer.write(processed_chunk)
+    data_file.processed_schema = writer.schema
+    data_file.processed_column_stats = writer.column_stats
+
+    return processor.processing_summary
+
+
+def run_job(job: ProcessingJob):
+    """Exécute une tâche réservée et enregistre son résultat sur le DataFile."""
+    data_file = job.data_file
+    data_file.processing_status = DataFile.STATUS_RUNNING
+    data_file.save(update_fields=['processing_status'])
+    try:
+        processing_summary = run_processing(data_file, job.options)
+    except Exception as e:
+        logger.exception(f"Échec de la tâche de traitement {job.pk}")
+        job.status = DataFile.STATUS_FAILED
+        job.error = str(e)
+        data_file.processing_status = DataFile.STATUS_FAILED
+        data_file.processing_error = str(e)
+        data_file.save(update_fields=['processing_status', 'processing_error'])
+    else:
+        job.status = DataFile.STATUS_DONE
+        # Mettre à jour les métadonnées
+        old_key, old_format = data_file.processing_key, data_file.processed_format
+        data_file.processing_key = processing_key(job.options)
+        data_file.processed_format = DataFile.PROCESSED_FORMAT
+        data_file.processed = True
+        data_file.processing_summary = processing_summary
+        data_file.processing_status = DataFile.STATUS_DONE
+        data_file.processing_error = ''
+        data_file.save()
+        release_processed_output(data_file, old_key, old_format)
+        invalidate_preview(data_file.id)
+        invalidate_exports(data_file.id)
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'error', 'finished_at'])
+    # Supprimer la progression du cache : l'état final est sur le DataFile
+    clear_progress(data_file.id)
+
+
+def requeue_interrupted_jobs() -> int:
+    """Remet en attente les tâches restées « en cours » après l'arrêt d'un pool."""
+    return ProcessingJob.objects.filter(status=DataFile.STATUS_RUNNING).update(
+        status=DataFile.STATUS_PENDING, started_at=None, worker_pid=None
+    )
+
+
+def worker_loop(poll_interval: float = 1.0, once: bool = False):
+    """Boucle d'un worker : réserve et exécute les tâches une par une."""
+    # Laisser le processus parent gérer l'arrêt du pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    while True:
+        close_old_connections()
+        job = claim_next_job()
+        if job is not None:
+            run_job(job)
+            continue
+        if once:
+            return
+        time.sleep(poll_interval)
+
+
+def run_worker_pool(workers: int, poll_interval: float = 1.0, once: bool = False):
+    """Lance ``workers`` processus qui consomment la file des tâches."""
+    requeue_interrupted_jobs()
+    # Les connexions ne doivent pas être partagées entre processus
+    connections.close_all()
+
+    processes = [
+        multiprocessing.Process(target=worker_loop, args=(poll_interval, once))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    def stop(signum, frame):
+        for process in processes:
+            process.terminate()
+
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        stop(None, None)
+        for process in processes:
+            process.join()
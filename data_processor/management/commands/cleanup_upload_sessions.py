@@ -0,0 +1,20 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from data_processor.uploads import cleanup_upload_sessions
+
+
+class Command(BaseCommand):
+    help = "Supprime les sessions d'import reprenable abandonnées et leurs fichiers partiels."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-age-hours', type=float, default=settings.UPLOAD_SESSION_TTL_HOURS,
+            help="Durée sans activité (en heures) au-delà de laquelle une session est supprimée"
+        )
+
+    def handle(self, *args, **options):
+        count = cleanup_upload_sessions(timedelta(hours=options['max_age_hours']))
+        self.stdout.write(f"{count} session(s) d'import supprimée(s).")
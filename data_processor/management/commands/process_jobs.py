@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from data_processor.jobs import run_worker_pool
+
+
+class Command(BaseCommand):
+    help = "Exécute les tâches de traitement en attente avec un pool de processus."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=settings.PROCESSING_WORKERS,
+            help='Nombre de processus workers'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=settings.PROCESSING_POLL_INTERVAL,
+            help='Délai (en secondes) entre deux consultations de la file'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help="Traiter les tâches en attente puis s'arrêter"
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Démarrage de {options['workers']} worker(s) de traitement...")
+        run_worker_pool(options['workers'], options['poll_interval'], options['once'])
@@ -0,0 +1,321 @@
+import io
+import json
+import os
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.utils.compression import StreamDecompressor
+from app.utils.moments import MomentsAccumulator
+from app.utils.sketches import KLLSketch
+
+from .processing import CHUNK_SIZE, DataChunkReader, JSONLinesError, _merge_dtype, _records_to_frame
+
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:  # pandas < 2.0
+    from pandas._libs.tslibs.parsing import guess_datetime_format
+
+# Octets reçus accumulés avant d'analyser les lignes complètes
+PROFILE_BLOCK_SIZE = 1024 * 1024
+
+# Taille maximale d'un JSON mal formé, réparé en mémoire par ``load_json_data``
+JSON_REPAIR_MAX_BYTES = 100 * 1024 * 1024
+
+# Colonne texte candidate catégorielle : peu de valeurs distinctes, en nombre et en proportion
+CATEGORICAL_MAX_VALUES = 100
+CATEGORICAL_MAX_RATIO = 0.05
+
+BOOLEAN_TEXT = ('True', 'False')
+
+
+class MetadataScanner:
+    """Métadonnées et schéma d'un fichier importé, calculés chunk par chunk.
+
+    Seuls les compteurs, les types, les formats de date, au plus
+    ``CATEGORICAL_MAX_VALUES`` valeurs distinctes par colonne texte et un
+    sketch de quantiles par colonne numérique sont conservés entre deux
+    chunks : la mémoire reste de l'ordre d'un chunk quelle que soit la
+    taille du fichier.
+    """
+
+    def __init__(self):
+        self.row_count = 0
+        self.missing: Dict[str, int] = {}
+        self.dtypes: Dict[str, Any] = {}
+        self.null_dtypes: Dict[str, Any] = {}
+        # Formats de date encore possibles pour chaque colonne texte
+        # (jour ou mois en premier) ; liste vide : pas une date
+        self.date_formats: Dict[str, List[str]] = {}
+        # Valeurs distinctes des colonnes texte (None : trop nombreuses)
+        self.categories: Dict[str, Optional[set]] = {}
+        # Médiane et moments des colonnes numériques (None : colonne non numérique)
+        self.numeric: Dict[str, Optional[Tuple[KLLSketch, MomentsAccumulator]]] = {}
+
+    def update(self, chunk: pd.DataFrame):
+        for column in self.missing.keys() - set(chunk.columns):
+            # Colonne absente de ce chunk (enregistrements JSON hétérogènes)
+            self.missing[column] += len(chunk)
+        for column, count in chunk.isnull().sum().items():
+            self.missing[column] = self.missing.get(column, self.row_count) + int(count)
+            values = chunk[column]
+            if int(count) == len(values):
+                self.dtypes.setdefault(column, None)
+                self.null_dtypes.setdefault(column, values.dtype)
+                continue
+            self.dtypes[column] = _merge_dtype(self.dtypes.get(column), values.dtype)
+            if values.dtype == object:
+                self._update_dates(column, values.dropna())
+            else:
+                # Colonne mixte (nombres puis texte) : pas une date
+                self.date_formats[column] = []
+            if values.dtype == object or pd.api.types.is_bool_dtype(values):
+                self._update_categories(column, values.dropna())
+            else:
+                self.categories[column] = None
+            if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+                self._update_numeric(column, values)
+            else:
+                self.numeric[column] = None
+        self.row_count += len(chunk)
+
+    def _update_dates(self, column, values: pd.Series):
+        if column not in self.date_formats:
+            first = values.iloc[0]
+            formats = []
+            if isinstance(first, str):
+                for dayfirst in (False, True):
+                    date_format = guess_datetime_format(first, dayfirst=dayfirst)
+                    if date_format is not None and date_format not in formats:
+                        formats.append(date_format)
+            self.date_formats[column] = formats
+        self.date_formats[column] = [date_format for date_format in self.date_formats[column]
+                                     if self._parses_as_dates(values, date_format)]
+
+    def _update_categories(self, column, values: pd.Series):
+        categories = self.categories.get(column, set())
+        if categories is not None:
+            try:
+                categories.update(values.unique())
+            except TypeError:
+                # Valeurs non hachables (listes ou objets JSON)
+                categories = None
+            if categories is not None and len(categories) > CATEGORICAL_MAX_VALUES:
+                categories = None
+        self.categories[column] = categories
+
+    def _update_numeric(self, column, values: pd.Series):
+        if column not in self.numeric:
+            self.numeric[column] = (KLLSketch(), MomentsAccumulator())
+        if self.numeric[column] is not None:
+            numeric = values.to_numpy(dtype=float)
+            sketch, moments = self.numeric[column]
+            sketch.update(numeric)
+            moments.update(numeric)
+
+    @staticmethod
+    def _parses_as_dates(values: pd.Series, date_format: str) -> bool:
+        try:
+            parsed = pd.to_datetime(values, format=date_format, errors='coerce')
+        except (TypeError, ValueError):
+            return False
+        return not parsed.isna().any()
+
+    @property
+    def schema(self) -> List[Dict[str, Any]]:
+        """Description de chaque colonne, dans l'ordre du fichier.
+
+        ``dtype`` est le type qu'aurait pandas en lisant le fichier entier ;
+        ``datetime_format`` est présent pour les colonnes de dates (lues comme
+        texte), ``categorical`` pour les colonnes texte à peu de valeurs et
+        ``infer`` pour les booléens avec valeurs manquantes, dont le type est
+        laissé à l'inférence de pandas à la lecture.
+        """
+        schema = []
+        for column, dtype in self.dtypes.items():
+            entry = {'name': column}
+            non_null = self.row_count - self.missing[column]
+            if dtype is None:
+                dtype = self.null_dtypes.get(column, np.dtype(object))
+            elif self.missing[column] and pd.api.types.is_integer_dtype(dtype):
+                dtype = np.dtype('float64')
+            elif (pd.api.types.is_bool_dtype(dtype) and self.missing[column]
+                  or dtype == object and self._is_boolean(column)):
+                # Booléens avec valeurs manquantes : lus en objets par pandas
+                dtype = np.dtype(object)
+                entry['infer'] = True
+            elif dtype == object and self.date_formats.get(column):
+                dtype = np.dtype('datetime64[ns]')
+                entry['datetime_format'] = self.date_formats[column][0]
+            elif dtype == object and self.categories.get(column) is not None:
+                distinct = len(self.categories[column])
+                if distinct <= CATEGORICAL_MAX_RATIO * non_null:
+                    entry['categorical'] = True
+            entry['dtype'] = str(dtype)
+            schema.append(entry)
+        return schema
+
+    def _is_boolean(self, column) -> bool:
+        """Colonne de booléens, ou de leur texte (« True »/« False ») une fois réécrits en CSV."""
+        categories = self.categories.get(column)
+        return bool(categories) and all(
+            isinstance(value, (bool, np.bool_)) or value in BOOLEAN_TEXT for value in categories
+        )
+
+    @property
+    def column_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Statistiques descriptives des colonnes numériques (médiane approchée par le sketch)."""
+        stats = {}
+        for column, accumulators in self.numeric.items():
+            if accumulators is None:
+                continue
+            sketch, moments = accumulators
+            stats[column] = {
+                'moyenne': _stat_value(moments.mean),
+                'médiane': _stat_value(sketch.quantile(0.5) if sketch.count else np.nan),
+                'écart_type': _stat_value(moments.std()),
+                'min': _stat_value(moments.min),
+                'max': _stat_value(moments.max),
+                'valeurs_manquantes': self.missing[column],
+            }
+        return stats
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'row_count': self.row_count,
+            'column_count': len(self.dtypes),
+            'missing_values': {column: count for column, count in self.missing.items() if count > 0},
+            'schema': self.schema,
+            'column_stats': self.column_stats,
+        }
+
+
+def _stat_value(value: float) -> Optional[float]:
+    """Valeur arrondie pour l'affichage et le stockage JSON (None si indéfinie)."""
+    return None if np.isnan(value) else round(float(value), 4)
+
+
+def scan_file_metadata(path: str, file_type: str, chunk_size: int = CHUNK_SIZE) -> Dict[str, Any]:
+    """Nombre de lignes et de colonnes, valeurs manquantes, types et taille d'un fichier.
+
+    Un JSON mal formé (ni un enregistrement par ligne, ni un tableau valide)
+    est réparé en mémoire par ``load_json_data`` ; au-delà de
+    ``JSON_REPAIR_MAX_BYTES`` il est refusé.
+    """
+    scanner = MetadataScanner()
+    try:
+        for chunk in DataChunkReader(path, file_type, chunk_size):
+            scanner.update(chunk)
+    except JSONLinesError:
+        if os.path.getsize(path) > JSON_REPAIR_MAX_BYTES:
+            raise ValueError(f"Fichier JSON invalide : au-delà de {JSON_REPAIR_MAX_BYTES // (1024 * 1024)} Mo, "
+                             "il n'est pas réparé")
+        from app.utils.json_processor import load_json_data
+        df = load_json_data(path)
+        if df is None:
+            raise ValueError("Erreur lors du chargement du fichier JSON")
+        scanner = MetadataScanner()
+        scanner.update(df)
+    metadata = scanner.to_dict()
+    metadata['file_size'] = os.path.getsize(path)
+    return metadata
+
+
+class StreamingProfiler:
+    """Métadonnées d'un fichier CSV ou JSON (une ligne par enregistrement) analysé à la réception.
+
+    Un fichier compressé (``compression`` : gzip, bz2 ou zstd) est
+    décompressé au fil des octets reçus ; ``file_size`` reste la taille
+    compressée, celle du fichier stocké.
+
+    Les octets reçus sont accumulés jusqu'à ``block_size`` puis les lignes
+    complètes sont analysées (en CSV, une coupure n'a lieu qu'en dehors d'un
+    champ entre guillemets) ; le reste attend le bloc suivant. Si le contenu
+    ne peut pas être analysé ainsi, ``close`` retourne None et le fichier est
+    analysé après son enregistrement.
+    """
+
+    def __init__(self, file_type: str, block_size: int = PROFILE_BLOCK_SIZE,
+                 compression: Optional[str] = None):
+        self.file_type = file_type
+        self._decompressor = StreamDecompressor(compression) if compression else None
+        self.block_size = block_size
+        self.scanner = MetadataScanner()
+        self.file_size = 0
+        self.failed = False
+        # Étendu sur place : pas de recopie de tout le tampon à chaque paquet reçu
+        self._buffer = bytearray()
+        self._header: Optional[bytes] = None
+
+    def feed(self, data: bytes):
+        self.file_size += len(data)
+        if self.failed:
+            return
+        if self._decompressor is not None:
+            try:
+                data = self._decompressor.decompress(data)
+            except (OSError, EOFError, ValueError, zlib.error):
+                self.failed = True
+                self._buffer = bytearray()
+                return
+        self._buffer += data
+        if len(self._buffer) >= self.block_size:
+            self._parse(final=False)
+
+    def close(self) -> Optional[Dict[str, Any]]:
+        if not self.failed:
+            self._parse(final=True)
+        if self.failed:
+            return None
+        metadata = self.scanner.to_dict()
+        metadata['file_size'] = self.file_size
+        return metadata
+
+    def _parse(self, final: bool):
+        ends = self._record_ends(self._buffer)
+        end = len(self._buffer) if final else (int(ends[-1]) + 1 if len(ends) else 0)
+        if not end:
+            return
+        block = bytes(self._buffer[:end])
+        del self._buffer[:end]
+        try:
+            if self.file_type == 'csv':
+                chunk = self._read_csv(block, ends)
+            else:
+                chunk = self._read_json_lines(block)
+        except (ValueError, UnicodeDecodeError, pd.errors.ParserError):
+            self.failed = True
+            self._buffer = bytearray()
+            return
+        if chunk is not None:
+            self.scanner.update(chunk)
+
+    def _record_ends(self, buffer: bytearray) -> np.ndarray:
+        """Positions des sauts de ligne qui terminent un enregistrement."""
+        data = np.frombuffer(buffer, dtype=np.uint8)
+        newlines = np.flatnonzero(data == ord('\n'))
+        if self.file_type == 'csv':
+            # Un saut de ligne précédé d'un nombre impair de guillemets est dans un champ
+            quotes = np.cumsum(data == ord('"'))
+            newlines = newlines[quotes[newlines] % 2 == 0]
+        return newlines
+
+    def _read_csv(self, block: bytes, ends: np.ndarray) -> Optional[pd.DataFrame]:
+        if self._header is None:
+            # Premier enregistrement : l'en-tête, répété devant chaque bloc
+            header_end = int(ends[0]) + 1 if len(ends) else len(block)
+            self._header, block = block[:header_end], block[header_end:]
+        elif not block.strip():
+            return None
+        return pd.read_csv(io.BytesIO(self._header + block))
+
+    def _read_json_lines(self, block: bytes) -> Optional[pd.DataFrame]:
+        records = [json.loads(line) for line in block.decode('utf-8').splitlines() if line.strip()]
+        if not records:
+            return None
+        if not all(isinstance(record, dict) for record in records):
+            # Tableau JSON : analysé après l'enregistrement du fichier
+            raise ValueError("Le fichier n'est pas à raison d'un objet JSON par ligne")
+        return _records_to_frame(records, None, None, self.scanner.row_count)
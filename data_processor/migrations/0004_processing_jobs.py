@@ -0,0 +1,44 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_processor', '0003_auto_20250413_0158'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='datafile',
+            name='processing_error',
+            field=models.TextField(blank=True, default='', verbose_name='Erreur de traitement'),
+        ),
+        migrations.AddField(
+            model_name='datafile',
+            name='processing_status',
+            field=models.CharField(blank=True, choices=[('pending', 'En attente'), ('running', 'En cours'), ('done', 'Terminé'), ('failed', 'Échec')], default='', max_length=10, verbose_name='État du traitement'),
+        ),
+        migrations.CreateModel(
+            name='ProcessingJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('options', models.JSONField(default=dict, verbose_name='Options de traitement')),
+                ('status', models.CharField(choices=[('pending', 'En attente'), ('running', 'En cours'), ('done', 'Terminé'), ('failed', 'Échec')], db_index=True, default='pending', max_length=10, verbose_name='État')),
+                ('error', models.TextField(blank=True, default='', verbose_name='Erreur')),
+                ('worker_pid', models.IntegerField(blank=True, null=True, verbose_name='PID du worker')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Date de création')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Début')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Fin')),
+                ('data_file', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to='data_processor.datafile', verbose_name='Fichier')),
+            ],
+            options={
+                'verbose_name': 'Tâche de traitement',
+                'verbose_name_plural': 'Tâches de traitement',
+                'ordering': ['created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_processor', '0004_processing_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='datafile',
+            name='file_size',
+            field=models.BigIntegerField(default=0, verbose_name='Taille du fichier (octets)'),
+        ),
+        migrations.AddField(
+            model_name='datafile',
+            name='schema',
+            field=models.JSONField(default=dict, verbose_name='Types des colonnes'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:13
+
+import data_processor.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_processor', '0005_datafile_schema_file_size'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='datafile',
+            name='processing_key',
+            field=models.CharField(blank=True, default='', max_length=64, verbose_name='Clé des options de traitement'),
+        ),
+        migrations.AddField(
+            model_name='datafile',
+            name='sha256',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64, verbose_name='Empreinte SHA-256'),
+        ),
+        migrations.AlterField(
+            model_name='datafile',
+            name='file',
+            field=models.FileField(upload_to=data_processor.models.content_path, verbose_name='Fichier'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:18
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('data_processor', '0006_content_addressed_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255, verbose_name='Nom du fichier')),
+                ('file_type', models.CharField(max_length=10, verbose_name='Type de fichier')),
+                ('total_size', models.BigIntegerField(verbose_name='Taille totale (octets)')),
+                ('part_size', models.IntegerField(verbose_name='Taille des parties (octets)')),
+                ('received_parts', models.JSONField(default=list, verbose_name='Parties reçues')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Date de création')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Dernière activité')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur')),
+            ],
+            options={
+                'verbose_name': "Session d'import",
+                'verbose_name_plural': "Sessions d'import",
+                'ordering': ['created_at'],
+            },
+        ),
+    ]
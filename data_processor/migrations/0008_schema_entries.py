@@ -0,0 +1,41 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:24
+
+from django.db import migrations, models
+
+
+def schema_to_entries(apps, schema_editor):
+    """Ancien format {colonne: type} -> liste ordonnée [{'name', 'dtype'}]."""
+    DataFile = apps.get_model('data_processor', 'DataFile')
+    for data_file in DataFile.objects.all():
+        if isinstance(data_file.schema, dict):
+            data_file.schema = [{'name': name, 'dtype': dtype} for name, dtype in data_file.schema.items()]
+            data_file.save(update_fields=['schema'])
+
+
+def entries_to_schema(apps, schema_editor):
+    DataFile = apps.get_model('data_processor', 'DataFile')
+    for data_file in DataFile.objects.all():
+        if isinstance(data_file.schema, list):
+            data_file.schema = {entry['name']: entry['dtype'] for entry in data_file.schema}
+            data_file.save(update_fields=['schema'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_processor', '0007_upload_sessions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='datafile',
+            name='processed_schema',
+            field=models.JSONField(default=list, verbose_name='Schéma du fichier traité'),
+        ),
+        migrations.AlterField(
+            model_name='datafile',
+            name='schema',
+            field=models.JSONField(default=list, verbose_name='Schéma des colonnes'),
+        ),
+        migrations.RunPython(schema_to_entries, entries_to_schema),
+    ]
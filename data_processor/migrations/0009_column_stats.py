@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_processor', '0008_schema_entries'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='datafile',
+            name='column_stats',
+            field=models.JSONField(default=dict, verbose_name='Statistiques descriptives'),
+        ),
+        migrations.AddField(
+            model_name='datafile',
+            name='processed_column_stats',
+            field=models.JSONField(default=dict, verbose_name='Statistiques du fichier traité'),
+        ),
+    ]
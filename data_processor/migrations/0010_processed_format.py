@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_processor', '0009_column_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='datafile',
+            name='processed_format',
+            field=models.CharField(blank=True, default='', max_length=10, verbose_name='Format du fichier traité'),
+        ),
+    ]
@@ -1,10 +1,40 @@
+from django.conf import settings
 from django.db import models
 from django.utils import timezone
 from django.contrib.auth.models import User
+import os
+import uuid
+
+from app.utils.compression import data_file_extension
+
+
+def content_path(instance, filename):
+    """Chemin d'un fichier importé : adressé par son contenu quand le SHA-256 est connu."""
+    if instance.sha256:
+        # Extension complète, compression comprise (.csv.gz)
+        extension = data_file_extension(filename)
+        return f'blobs/{instance.sha256[:2]}/{instance.sha256}{extension}'
+    return timezone.now().strftime('uploads/%Y/%m/%d/') + filename
+
 
 class DataFile(models.Model):
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    PROCESSING_STATUS_CHOICES = [
+        (STATUS_PENDING, 'En attente'),
+        (STATUS_RUNNING, 'En cours'),
+        (STATUS_DONE, 'Terminé'),
+        (STATUS_FAILED, 'Échec'),
+    ]
+
+    # Format des résultats de traitement : Parquet compressé
+    PROCESSED_FORMAT = 'parquet'
+
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='data_files', verbose_name='Utilisateur')
-    file = models.FileField(upload_to='uploads/%Y/%m/%d/', verbose_name='Fichier')
+    file = models.FileField(upload_to=content_path, verbose_name='Fichier')
+    sha256 = models.CharField(max_length=64, blank=True, default='', db_index=True, verbose_name='Empreinte SHA-256')
     original_filename = models.CharField(max_length=255, verbose_name='Nom du fichier original')
     upload_date = models.DateTimeField(default=timezone.now, verbose_name='Date d\'importation')
     original_file_type = models.CharField(max_length=10, verbose_name='Type de fichier original', default='unknown')
@@ -13,13 +43,129 @@ class DataFile(models.Model):
     row_count = models.IntegerField(default=0, verbose_name='Nombre de lignes')
     column_count = models.IntegerField(default=0, verbose_name='Nombre de colonnes')
     missing_values = models.JSONField(default=dict, verbose_name='Valeurs manquantes')
+    schema = models.JSONField(default=list, verbose_name='Schéma des colonnes')
+    column_stats = models.JSONField(default=dict, verbose_name='Statistiques descriptives')
+    file_size = models.BigIntegerField(default=0, verbose_name='Taille du fichier (octets)')
     outliers = models.JSONField(default=dict, verbose_name='Valeurs aberrantes')
     processing_summary = models.JSONField(default=dict, verbose_name='Résumé du traitement')
+    processed_schema = models.JSONField(default=list, verbose_name='Schéma du fichier traité')
+    processed_column_stats = models.JSONField(default=dict, verbose_name='Statistiques du fichier traité')
+    processing_status = models.CharField(max_length=10, choices=PROCESSING_STATUS_CHOICES, blank=True, default='', verbose_name='État du traitement')
+    processing_error = models.TextField(blank=True, default='', verbose_name='Erreur de traitement')
+    processing_key = models.CharField(max_length=64, blank=True, default='', verbose_name='Clé des options de traitement')
+    processed_format = models.CharField(max_length=10, blank=True, default='', verbose_name='Format du fichier traité')
 
     class Meta:
         verbose_name = 'Fichier de données'
         verbose_name_plural = 'Fichiers de données'
         ordering = ['-upload_date']
 
+    @property
+    def descriptive_stats(self):
+        """Moyenne et médiane de chaque colonne numérique du fichier traité, pour la liste des fichiers."""
+        return [{'variable': column, 'mean': stats['moyenne'], 'median': stats['médiane']}
+                for column, stats in self.processed_column_stats.items()]
+
+    @property
+    def column_names(self):
+        """Colonnes du fichier d'après le schéma enregistré, sans relire le fichier."""
+        return [entry['name'] for entry in self.schema]
+
+    @property
+    def processed_file_type(self):
+        """Format du fichier traité ; sans format enregistré, celui du fichier importé (anciens résultats)."""
+        return self.processed_format or self.file_type
+
+    @property
+    def processed_path(self):
+        """Chemin du fichier traité, à côté du fichier importé."""
+        return self.processed_path_for(self.processing_key)
+
+    def processed_path_for(self, processing_key, processed_format=None):
+        """Chemin du résultat d'un traitement : partagé par les fichiers de même contenu et mêmes options.
+
+        ``processed_format`` vaut par défaut celui du fichier ; les anciens
+        résultats, au format de l'import, n'ont pas d'extension.
+        """
+        if processed_format is None:
+            processed_format = self.processed_format
+        if not processing_key:
+            path = f'{self.file.path}_processed'
+        else:
+            path = f'{self.file.path}_{processing_key}_processed'
+        return f'{path}.{processed_format}' if processed_format else path
+
     def __str__(self):
         return f"{self.original_filename} (importé le {self.upload_date.strftime('%d/%m/%Y')})"
+
+
+class ProcessingJob(models.Model):
+    """Tâche de traitement exécutée en arrière-plan par le pool de workers."""
+    data_file = models.ForeignKey(DataFile, on_delete=models.CASCADE, related_name='jobs', verbose_name='Fichier')
+    options = models.JSONField(default=dict, verbose_name='Options de traitement')
+    status = models.CharField(max_length=10, choices=DataFile.PROCESSING_STATUS_CHOICES, default=DataFile.STATUS_PENDING, db_index=True, verbose_name='État')
+    error = models.TextField(blank=True, default='', verbose_name='Erreur')
+    worker_pid = models.IntegerField(null=True, blank=True, verbose_name='PID du worker')
+    created_at = models.DateTimeField(default=timezone.now, verbose_name='Date de création')
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name='Début')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='Fin')
+
+    class Meta:
+        verbose_name = 'Tâche de traitement'
+        verbose_name_plural = 'Tâches de traitement'
+        ordering = ['created_at']
+
+    def __str__(self):
+        return f"Tâche {self.pk} - {self.data_file.original_filename} ({self.get_status_display()})"
+
+
+class UploadSession(models.Model):
+    """Import reprenable d'un gros fichier, envoyé en parties numérotées.
+
+    Chaque partie (``part_size`` octets, la dernière éventuellement plus
+    courte) est écrite directement à sa position dans le fichier partiel ;
+    ``offset`` indique jusqu'où le fichier est reçu sans trou.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_sessions', verbose_name='Utilisateur')
+    filename = models.CharField(max_length=255, verbose_name='Nom du fichier')
+    file_type = models.CharField(max_length=10, verbose_name='Type de fichier')
+    total_size = models.BigIntegerField(verbose_name='Taille totale (octets)')
+    part_size = models.IntegerField(verbose_name='Taille des parties (octets)')
+    received_parts = models.JSONField(default=list, verbose_name='Parties reçues')
+    created_at = models.DateTimeField(default=timezone.now, verbose_name='Date de création')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Dernière activité')
+
+    class Meta:
+        verbose_name = "Session d'import"
+        verbose_name_plural = "Sessions d'import"
+        ordering = ['created_at']
+
+    @property
+    def part_count(self):
+        return max(-(-self.total_size // self.part_size), 1)
+
+    @property
+    def path(self):
+        """Fichier partiel, alloué à sa taille finale dès la création de la session."""
+        return os.path.join(settings.MEDIA_ROOT, 'uploads', 'partial', f'{self.id}.part')
+
+    @property
+    def offset(self):
+        """Nombre d'octets reçus de façon contiguë depuis le début du fichier."""
+        received = set(self.received_parts)
+        part = 0
+        while part in received:
+            part += 1
+        return min(part * self.part_size, self.total_size)
+
+    @property
+    def complete(self):
+        return len(set(self.received_parts)) == self.part_count
+
+    def part_length(self, part):
+        """Taille attendue d'une partie."""
+        return max(min(self.part_size, self.total_size - part * self.part_size), 0)
+
+    def __str__(self):
+        return f"Import de {self.filename} ({self.offset}/{self.total_size} octets)"
@@ -0,0 +1,105 @@
+import json
+import os
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.core.cache import cache as django_cache
+
+from app.utils.columnar import parquet_row_count
+
+from .metadata import scan_file_metadata
+from .row_index import read_rows
+
+# Durée de conservation d'un aperçu dans le cache (secondes)
+PREVIEW_TIMEOUT = 3600
+
+
+def preview_cache_key(data_file_id: int) -> str:
+    return f'preview_{data_file_id}'
+
+
+def invalidate_preview(data_file_id: int):
+    """Oublie l'aperçu en cache d'un fichier (retraité ou supprimé)."""
+    django_cache.delete(preview_cache_key(data_file_id))
+
+
+def preview_source(data_file) -> Tuple[str, str, List[Dict[str, Any]]]:
+    """Fichier présenté, son format et son schéma : le résultat du traitement s'il existe, sinon l'import."""
+    if data_file.processed:
+        return data_file.processed_path, data_file.processed_file_type, data_file.processed_schema
+    return data_file.file.path, data_file.file_type, data_file.schema
+
+
+def stored_column_stats(data_file) -> Dict[str, Dict[str, Any]]:
+    """Statistiques descriptives enregistrées sur le fichier.
+
+    Elles sont calculées à l'import et au traitement ; un fichier qui n'en a
+    pas encore (importé avant leur ajout) est analysé une fois, par chunks,
+    et le résultat enregistré.
+    """
+    field, schema_field = (('processed_column_stats', 'processed_schema') if data_file.processed
+                           else ('column_stats', 'schema'))
+    stats = getattr(data_file, field)
+    schema = getattr(data_file, schema_field)
+    if not stats and data_file.row_count and (not schema or _has_numeric_columns(schema)):
+        path, file_type, _ = preview_source(data_file)
+        metadata = scan_file_metadata(path, file_type)
+        stats = metadata['column_stats']
+        setattr(data_file, field, stats)
+        setattr(data_file, schema_field, metadata['schema'])
+        data_file.save(update_fields=[field, schema_field])
+    return stats
+
+
+def _has_numeric_columns(schema: List[Dict[str, Any]]) -> bool:
+    return any(pd.api.types.is_numeric_dtype(np.dtype(entry['dtype']))
+               and not pd.api.types.is_bool_dtype(np.dtype(entry['dtype'])) for entry in schema)
+
+
+def build_preview(data_file, page: int, page_size: int) -> Dict[str, Any]:
+    """Page de lignes et statistiques descriptives, sérialisables en JSON."""
+    path, file_type, schema = preview_source(data_file)
+    if file_type == 'parquet':
+        # Nombre exact de lignes, lu dans le pied du fichier
+        row_count = parquet_row_count(path)
+    else:
+        row_count = data_file.row_count
+        if data_file.processed:
+            row_count -= data_file.processing_summary.get('duplicates_removed', 0)
+    df = read_rows(path, file_type, schema, (page - 1) * page_size, page_size)
+    return {
+        'file_id': data_file.id,
+        'processed': data_file.processed,
+        'columns': [str(column) for column in df.columns],
+        # to_json convertit NaN, dates et types numpy
+        'data': json.loads(df.to_json(orient='records', date_format='iso')),
+        'stats': stored_column_stats(data_file),
+        'row_count': row_count,
+        'column_count': len(schema) or data_file.column_count,
+        'page': page,
+        'page_size': page_size,
+        'page_count': max(1, -(-row_count // page_size)),
+    }
+
+
+def get_preview(data_file, page: int = 1, page_size: int = None) -> Dict[str, Any]:
+    """Aperçu d'un fichier ; la première page est servie depuis le cache.
+
+    L'entrée du cache porte la date de modification du fichier présenté :
+    un fichier réécrit n'est jamais servi depuis une entrée périmée.
+    """
+    page_size = page_size or settings.PREVIEW_PAGE_SIZE
+    if page != 1 or page_size != settings.PREVIEW_PAGE_SIZE:
+        return build_preview(data_file, page, page_size)
+
+    path, _, _ = preview_source(data_file)
+    modified = os.stat(path).st_mtime_ns
+    key = preview_cache_key(data_file.id)
+    cached = django_cache.get(key)
+    if cached is not None and cached['path'] == path and cached['modified'] == modified:
+        return cached['preview']
+    preview = build_preview(data_file, page, page_size)
+    django_cache.set(key, {'path': path, 'modified': modified, 'preview': preview}, PREVIEW_TIMEOUT)
+    return preview
@@ -0,0 +1,884 @@
+import collections
+import contextlib
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.utils.columnar import iter_parquet_frames, parquet_row_count
+from app.utils.compression import decompress_stream, open_compressed, split_compression
+from app.utils.dedup import DEFAULT_MEMORY_BUDGET, RowHashSet, row_hashes
+from app.utils.frequency import DEFAULT_CAPACITY, FrequencyCounter
+from app.utils.moments import MomentsAccumulator
+from app.utils.sketches import DEFAULT_ERROR, KLLSketch, weighted_quantile
+
+# Taille de chunk par défaut : bon équilibre mémoire/performance
+CHUNK_SIZE = 50000
+
+
+class JSONLinesError(Exception):
+    """Fichier JSON ni à raison d'un enregistrement par ligne, ni tableau JSON valide."""
+
+
+class DataChunkReader:
+    """Lit un fichier CSV, JSON (une ligne par enregistrement, ou tableau) ou Parquet par chunks.
+
+    ``dtype`` impose les types des colonnes ; ``columns`` sélectionne les
+    colonnes (et, en JSON et Parquet, ajoute celles absentes d'un chunk).
+    La position dans le fichier (``bytes_read``) permet de suivre la
+    progression sans compter les lignes au préalable. Un fichier compressé
+    (gzip, bz2, zstd, d'après son extension) est décompressé à la volée ; la
+    position est alors celle dans le fichier compressé. Un tableau JSON est
+    lu enregistrement par enregistrement, ses objets aplatis comme par
+    ``load_json_data``. En Parquet, seules les colonnes demandées sont décodées.
+    """
+
+    def __init__(self, path: str, file_type: str, chunk_size: int = CHUNK_SIZE,
+                 dtype: Optional[Dict[str, Any]] = None,
+                 columns: Optional[List[str]] = None):
+        self.path = path
+        self.file_type = file_type
+        self.compression = split_compression(path)[1]
+        self.chunk_size = chunk_size
+        self.dtype = dtype
+        self.columns = columns
+        self.total_bytes = os.path.getsize(path)
+        self.bytes_read = 0
+        self.rows_read = 0
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        if self.file_type == 'parquet':
+            yield from self._count_rows(self._read_parquet())
+            return
+        with open(self.path, 'rb') as raw, decompress_stream(raw, self.compression) as f:
+            if self.file_type == 'csv':
+                chunks = self._read_csv(f, raw)
+            elif is_json_array(self.path):
+                chunks = self._read_json_array(f, raw)
+            else:
+                chunks = self._read_json_lines(f, raw)
+            yield from self._count_rows(chunks)
+
+    def _count_rows(self, chunks):
+        for chunk in chunks:
+            self.rows_read += len(chunk)
+            yield chunk
+
+    def _read_csv(self, f, raw):
+        for chunk in pd.read_csv(f, chunksize=self.chunk_size, dtype=self.dtype, usecols=self.columns):
+            # Le parseur lit par blocs : la position est arrondie au bloc lu
+            self.bytes_read = raw.tell()
+            yield chunk
+
+    def _read_json_lines(self, f, raw):
+        chunk_data = []
+        row_offset = 0
+        for raw_line in f:
+            if self.compression is None:
+                self.bytes_read += len(raw_line)
+            else:
+                self.bytes_read = raw.tell()
+            line = raw_line.decode('utf-8').strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise JSONLinesError(f"Erreur de parsing JSON à la ligne: {line}. {str(e)}")
+            if not isinstance(record, dict):
+                # Tableau JSON sur une seule ligne, par exemple
+                raise JSONLinesError(f"La ligne n'est pas un objet JSON: {line[:100]}")
+            chunk_data.append(record)
+            if len(chunk_data) >= self.chunk_size:
+                yield _records_to_frame(chunk_data, self.dtype, self.columns, row_offset)
+                row_offset += len(chunk_data)
+                chunk_data = []
+        if chunk_data:
+            yield _records_to_frame(chunk_data, self.dtype, self.columns, row_offset)
+
+    def _read_json_array(self, f, raw):
+        # Tableau JSON : les enregistrements sont lus au fil du fichier, sans le charger en entier
+        from app.utils.json_processor import iter_json_records
+
+        chunk_data = []
+        row_offset = 0
+        text = io.TextIOWrapper(f, encoding='utf-8')
+        try:
+            for record in iter_json_records(text):
+                chunk_data.append(record)
+                if len(chunk_data) >= self.chunk_size:
+                    self.bytes_read = raw.tell()
+                    yield _records_to_frame(chunk_data, self.dtype, self.columns, row_offset)
+                    row_offset += len(chunk_data)
+                    chunk_data = []
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            raise JSONLinesError(f"Tableau JSON invalide. {str(e)}")
+        finally:
+            # Le fichier reste ouvert : il est fermé par l'appelant
+            text.detach()
+        self.bytes_read = raw.tell()
+        if chunk_data:
+            yield _records_to_frame(chunk_data, self.dtype, self.columns, row_offset)
+
+    def _read_parquet(self):
+        total_rows = parquet_row_count(self.path)
+        row_offset = 0
+        for chunk in iter_parquet_frames(self.path, self.chunk_size, self.columns):
+            chunk.index = pd.RangeIndex(row_offset, row_offset + len(chunk))
+            row_offset += len(chunk)
+            if self.dtype:
+                chunk = chunk.astype({col: dt for col, dt in self.dtype.items() if col in chunk.columns})
+            # Pas de position d'octet par ligne : estimée d'après les lignes lues
+            self.bytes_read = self.total_bytes * row_offset // max(total_rows, 1)
+            yield chunk
+
+
+def is_json_array(path: str) -> bool:
+    """Le fichier JSON (éventuellement compressé) est-il un tableau (premier caractère significatif ``[``) ?"""
+    with open_compressed(path, 'rb') as f:
+        for block in iter(lambda: f.read(64 * 1024), b''):
+            stripped = block.lstrip()
+            if stripped:
+                return stripped.startswith(b'[')
+    return False
+
+
+def iter_data_chunks(path: str, file_type: str, chunk_size: int = CHUNK_SIZE,
+                     dtype: Optional[Dict[str, Any]] = None,
+                     columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """Lit un fichier par chunks (voir ``DataChunkReader``)."""
+    return iter(DataChunkReader(path, file_type, chunk_size, dtype, columns))
+
+
+def _records_to_frame(records, dtype, columns, row_offset):
+    # Index continu d'un chunk à l'autre, comme read_csv(chunksize=...)
+    df = pd.DataFrame(records, columns=columns,
+                      index=pd.RangeIndex(row_offset, row_offset + len(records)))
+    # Colonne sans aucune valeur : des NaN flottants, comme pour read_csv
+    empty = [column for column, column_dtype in df.dtypes.items()
+             if column_dtype == object and df[column].isna().all()]
+    if empty:
+        df[empty] = df[empty].astype('float64')
+    if dtype:
+        df = df.astype({col: dt for col, dt in dtype.items() if col in df.columns})
+    return df
+
+
+def _merge_dtype(current, new):
+    """Type commun de deux chunks, comme le ferait pandas sur le fichier entier."""
+    if current is None or current == new:
+        return new
+    if (pd.api.types.is_numeric_dtype(current) and pd.api.types.is_numeric_dtype(new)
+            and not pd.api.types.is_bool_dtype(current) and not pd.api.types.is_bool_dtype(new)):
+        return np.promote_types(current, new)
+    return np.dtype(object)
+
+
+class ColumnStatistics:
+    """Statistiques fusionnables d'une colonne, collectées chunk par chunk.
+
+    Les quantiles des valeurs numériques viennent d'un sketch KLL de taille
+    bornée (``quantile_error`` : erreur de rang normalisée), la moyenne,
+    l'écart-type et l'étendue d'un accumulateur de moments, et le mode d'un
+    compteur de fréquences exact jusqu'à ``frequency_capacity`` valeurs
+    distinctes, approché au-delà.
+    """
+
+    def __init__(self, quantile_error: float = DEFAULT_ERROR, frequency_capacity: int = DEFAULT_CAPACITY):
+        self.sketch: Optional[KLLSketch] = KLLSketch(quantile_error)
+        self.moments: Optional[MomentsAccumulator] = MomentsAccumulator()
+        self.frequencies = FrequencyCounter(frequency_capacity)
+        self.dtype = None
+        self.null_dtype = None
+        self.mixed = False
+        self.missing = 0
+        # Toutes les valeurs non manquantes valent 0 ou 1
+        self.binary = True
+        # Toutes les valeurs non manquantes sont des booléens
+        self.boolean = True
+
+    def update(self, series: pd.Series):
+        non_null = series.dropna()
+        self.missing += len(series) - len(non_null)
+        if non_null.empty:
+            if self.null_dtype is None:
+                self.null_dtype = series.dtype
+            return
+        self._merge_dtype(series.dtype)
+        if self.moments is not None:
+            try:
+                numeric = non_null.to_numpy(dtype=float)
+            except (TypeError, ValueError):
+                # Valeurs non numériques : ni quantiles ni moments
+                self.sketch = self.moments = None
+            else:
+                self.sketch.update(numeric)
+                self.moments.update(numeric)
+        self.binary = self.binary and bool(non_null.isin([0, 1]).all())
+        self.boolean = self.boolean and pd.api.types.infer_dtype(non_null, skipna=True) == 'boolean'
+        self.frequencies.update(non_null)
+
+    def merge(self, other: 'ColumnStatistics') -> 'ColumnStatistics':
+        if other.dtype is not None:
+            self._merge_dtype(other.dtype)
+        if self.null_dtype is None:
+            self.null_dtype = other.null_dtype
+        self.mixed = self.mixed or other.mixed
+        if self.moments is not None and other.moments is not None:
+            self.sketch.merge(other.sketch)
+            self.moments.merge(other.moments)
+        else:
+            self.sketch = self.moments = None
+        self.missing += other.missing
+        self.binary = self.binary and other.binary
+        self.boolean = self.boolean and other.boolean
+        self.frequencies.merge(other.frequencies)
+        return self
+
+    def _merge_dtype(self, dtype):
+        merged = _merge_dtype(self.dtype, dtype)
+        # Colonne numérique dans un chunk et texte dans un autre
+        if self.dtype is not None and merged == object and (self.dtype != object or dtype != object):
+            self.mixed = True
+        self.dtype = merged
+
+    @property
+    def final_dtype(self):
+        """Type de la colonne entière : un entier ou booléen avec des manquants change de type."""
+        if self.dtype is None:
+            return self.null_dtype
+        if not self.missing:
+            return self.dtype
+        if pd.api.types.is_bool_dtype(self.dtype):
+            return np.dtype(object)
+        if pd.api.types.is_integer_dtype(self.dtype):
+            return np.dtype('float64')
+        return self.dtype
+
+    def distribution(self):
+        """Valeurs distinctes (avec le type final) et leurs effectifs.
+
+        Au-delà de la capacité du compteur, seules les valeurs fréquentes sont retenues.
+        """
+        dtype = self.final_dtype if self.final_dtype is not None else object
+        values, counts = self.frequencies.items()
+        return pd.Series(values, dtype=dtype), counts
+
+    def mean(self):
+        return self.moments.mean if self.moments is not None else np.nan
+
+    def quantile_items(self):
+        """Valeurs pondérées pour le calcul des quantiles : sketch, ou effectifs exacts."""
+        if self.sketch is not None:
+            return self.sketch.weighted_items()
+        values, counts = self.distribution()
+        return values.to_numpy(), counts
+
+
+class DatasetStatistics:
+    """Statistiques de toutes les colonnes d'un fichier, fusionnables entre chunks."""
+
+    def __init__(self, quantile_error: float = DEFAULT_ERROR, frequency_capacity: int = DEFAULT_CAPACITY):
+        self.quantile_error = quantile_error
+        self.frequency_capacity = frequency_capacity
+        self.columns: Dict[str, ColumnStatistics] = {}
+        self.row_count = 0
+
+    def _column(self, column) -> ColumnStatistics:
+        if column not in self.columns:
+            # Colonne absente des lignes déjà vues (enregistrements JSON hétérogènes)
+            self.columns[column] = ColumnStatistics(self.quantile_error, self.frequency_capacity)
+            self.columns[column].missing = self.row_count
+        return self.columns[column]
+
+    def update(self, chunk: pd.DataFrame):
+        for column in self.columns.keys() - set(chunk.columns):
+            self.columns[column].missing += len(chunk)
+        for column in chunk.columns:
+            self._column(column).update(chunk[column])
+        self.row_count += len(chunk)
+
+    def merge(self, other: 'DatasetStatistics') -> 'DatasetStatistics':
+        for column in self.columns.keys() - other.columns.keys():
+            self.columns[column].missing += other.row_count
+        for column, stats in other.columns.items():
+            self._column(column).merge(stats)
+        self.row_count += other.row_count
+        return self
+
+    def read_dtypes(self, text: bool = True) -> Dict[str, Any]:
+        """Types imposés à la seconde passe.
+
+        Dans un fichier texte (CSV), les booléens avec valeurs manquantes sont
+        laissés à l'inférence : lus en objets, ils donneraient le texte
+        « True »/« False ». Ailleurs, ils sont lus en objets dans tous les
+        chunks, y compris ceux sans valeur manquante, comme dans le fichier entier.
+        """
+        return {column: stats.final_dtype for column, stats in self.columns.items()
+                if stats.final_dtype is not None
+                and not (text and stats.boolean and stats.final_dtype == object and stats.dtype is not None)}
+
+
+# --- Opérations élémentaires, partagées par le chemin en mémoire et le chemin par chunks ---
+
+def _mode(values: pd.Series, counts=None):
+    """Mode d'une série (le plus petit en cas d'égalité, comme Series.mode)."""
+    if counts is None:
+        modes = values.mode()
+        return modes[0] if len(modes) else None
+    if not len(values):
+        return None
+    candidates = values[counts == counts.max()]
+    try:
+        return sorted(candidates)[0]
+    except TypeError:
+        return candidates.iloc[0]
+
+
+def _fill_missing(series: pd.Series, fill_value, is_binary: bool, is_numeric: bool) -> pd.Series:
+    if fill_value is None:
+        return series
+    if is_binary:
+        return series.fillna(fill_value).astype(int)
+    if is_numeric and pd.api.types.is_integer_dtype(series):
+        return series.fillna(round(fill_value)).astype(int)
+    return series.fillna(fill_value)
+
+
+def _clip_outliers(series: pd.Series, lower_bound, upper_bound) -> pd.Series:
+    # Ne pas modifier les valeurs si elles sont dans les bornes
+    mask = (series >= lower_bound) & (series <= upper_bound)
+    clipped = pd.Series(np.where(mask, series, series.clip(lower_bound, upper_bound)), index=series.index)
+    # Conserver le type d'origine
+    if pd.api.types.is_integer_dtype(clipped):
+        clipped = clipped.round().astype(int)
+    return clipped
+
+
+def _scale_min_max(series: pd.Series, min_val, max_val) -> pd.Series:
+    if max_val != min_val:  # éviter la division par zéro
+        series = (series - min_val) / (max_val - min_val)
+        # Conserver le type si possible
+        if pd.api.types.is_integer_dtype(series):
+            series = (series * 100).round().astype(int)
+    return series
+
+
+def _iqr_bounds(q1, q3):
+    iqr = q3 - q1
+    return q1 - 1.5 * iqr, q3 + 1.5 * iqr
+
+
+def _missing_fill_value(series: pd.Series, strategy: str, is_binary: bool, is_numeric: bool, stats=None):
+    """Valeur de remplacement, calculée sur la série ou sur les statistiques du fichier."""
+    values, counts = stats.distribution() if stats is not None else (series, None)
+    if is_binary or not is_numeric or strategy not in ('mean', 'median'):
+        return _mode(values, counts)
+    if strategy == 'mean':
+        return stats.mean() if stats is not None else series.mean()
+    return weighted_quantile(*stats.quantile_items(), 0.5) if stats is not None else series.median()
+
+
+def build_processing_plan(statistics: DatasetStatistics, columns, cleaned_data) -> Dict[str, Dict[str, Any]]:
+    """Déduit des statistiques du fichier entier les paramètres de chaque étape.
+
+    Les étapes étant monotones et élément par élément, il suffit de les
+    appliquer aux extrêmes de la colonne pour connaître son étendue et son type
+    finaux ; les quantiles portent sur le sketch complété des valeurs
+    remplacées. Les bornes obtenues sont celles du traitement du fichier en
+    mémoire, aux erreurs de rang du sketch près.
+    """
+    plan = {}
+    for column in columns:
+        stats = statistics.columns[column]
+        dtype = stats.final_dtype if stats.final_dtype is not None else object
+        column_plan = {
+            'is_binary': stats.binary,
+            'is_numeric': pd.api.types.is_numeric_dtype(dtype),
+        }
+        extremes = pd.Series([], dtype=dtype)
+        if stats.moments is not None and stats.moments.count:
+            extremes = pd.Series([stats.moments.min, stats.moments.max]).astype(dtype)
+
+        fill_value = None
+        if cleaned_data['handle_missing']:
+            fill_value = _missing_fill_value(None, cleaned_data['missing_strategy'],
+                                             column_plan['is_binary'], column_plan['is_numeric'], stats)
+            column_plan['fill_value'] = fill_value
+            if stats.missing and fill_value is not None:
+                extremes = _with_missing(extremes)
+            extremes = _fill_missing(extremes, fill_value, column_plan['is_binary'], column_plan['is_numeric'])
+            if stats.moments is None:
+                # Valeurs non numériques dans le fichier : la colonne remplie reste en objets,
+                # même dans un chunk où pandas la convertirait en nombres
+                column_plan['dtype'] = np.dtype(object)
+                extremes = extremes.astype(object)
+
+        if cleaned_data['handle_outliers'] and pd.api.types.is_numeric_dtype(extremes):
+            # Les valeurs remplacées s'ajoutent aux quantiles avec leur effectif
+            items, weights = stats.quantile_items()
+            if stats.missing and fill_value is not None:
+                items, weights = np.append(items, float(fill_value)), np.append(weights, stats.missing)
+            bounds = _iqr_bounds(weighted_quantile(items, weights, 0.25), weighted_quantile(items, weights, 0.75))
+            column_plan['bounds'] = bounds
+            clipped = _clip_outliers(extremes, *bounds)
+            # Une colonne entière écrêtée à une borne non entière devient flottante
+            # dans tous les chunks, même ceux où aucune valeur n'est écrêtée
+            column_plan['clip_to_float'] = (pd.api.types.is_integer_dtype(extremes)
+                                            and pd.api.types.is_float_dtype(clipped))
+            extremes = clipped
+
+        if cleaned_data['normalize_data'] and pd.api.types.is_numeric_dtype(extremes):
+            column_plan['range'] = (extremes.min(), extremes.max())
+
+        plan[column] = column_plan
+    return plan
+
+
+def _with_missing(values: pd.Series) -> pd.Series:
+    return pd.concat([values, pd.Series([np.nan])], ignore_index=True).astype(values.dtype)
+
+
+# --- Noyau vectorisé : une seule opération par bloc de colonnes de même dtype ---
+
+# Dtypes traités par blocs NumPy ; les autres colonnes passent par les opérations élémentaires
+_BLOCK_INT = np.dtype('int64')
+_BLOCK_FLOAT = np.dtype('float64')
+
+
+def _dtype_blocks(frame: pd.DataFrame):
+    """Colonnes regroupées par dtype, dans l'ordre d'apparition."""
+    blocks = {}
+    for column, dtype in frame.dtypes.items():
+        blocks.setdefault(dtype, []).append(column)
+    return blocks.items()
+
+
+def _replace_blocks(frame: pd.DataFrame, blocks: List[pd.DataFrame]) -> pd.DataFrame:
+    """Remplace des groupes de colonnes de ``frame`` en conservant l'ordre des colonnes."""
+    if not blocks:
+        return frame
+    replaced = [column for block in blocks for column in block.columns]
+    return pd.concat([frame.drop(columns=replaced)] + blocks, axis=1)[frame.columns]
+
+
+def _binary_columns(values: np.ndarray) -> np.ndarray:
+    """Colonnes dont les valeurs non manquantes sont toutes 0 ou 1."""
+    binary = (values == 0) | (values == 1)
+    if values.dtype.kind == 'f':
+        binary |= np.isnan(values)
+    return binary.all(axis=0)
+
+
+def _block_fill_values(block: pd.DataFrame, strategy: str, is_binary: np.ndarray) -> List[Any]:
+    """Valeurs de remplacement des colonnes d'un bloc (None si la colonne est vide)."""
+    fill_values = [None] * block.shape[1]
+    values = block.to_numpy()
+
+    # Mode d'une colonne binaire : 1 s'il est strictement majoritaire (le plus petit en cas d'égalité)
+    ones, zeros = (values == 1).sum(axis=0), (values == 0).sum(axis=0)
+    binary_mode = np.where(ones > zeros, 1, 0).astype(values.dtype)
+
+    use_mode = is_binary | (strategy not in ('mean', 'median'))
+    other = ~is_binary & use_mode
+    modes = block.loc[:, other].mode() if other.any() else None
+    if not use_mode.all():
+        averages = (block.loc[:, ~use_mode].mean() if strategy == 'mean'
+                    else block.loc[:, ~use_mode].median())
+
+    for i, column in enumerate(block.columns):
+        if is_binary[i]:
+            if ones[i] or zeros[i]:
+                fill_values[i] = binary_mode[i]
+        elif other[i]:
+            if len(modes) and not pd.isna(modes[column].iloc[0]):
+                fill_values[i] = modes[column].iloc[0]
+        else:
+            fill_values[i] = averages[column]
+    return fill_values
+
+
+def _fill_missing_block(block: pd.DataFrame, strategy: str, plan) -> Optional[pd.DataFrame]:
+    """Remplace les valeurs manquantes d'un bloc numérique en une opération.
+
+    Retourne None si le bloc doit être traité colonne par colonne.
+    """
+    values = block.to_numpy()
+    if plan is not None:
+        is_binary = np.array([plan[column]['is_binary'] for column in block.columns], dtype=bool)
+        fill_values = [plan[column]['fill_value'] for column in block.columns]
+    else:
+        is_binary = _binary_columns(values)
+        missing = np.isnan(values).any(axis=0) if values.dtype.kind == 'f' else np.zeros(block.shape[1], bool)
+        # Seules les colonnes incomplètes ont besoin d'une valeur de remplacement ;
+        # pour les autres, seul compte le fait qu'elle existe (colonne non vide)
+        fill_values = [0 if len(block) else None] * block.shape[1]
+        if missing.any():
+            computed = _block_fill_values(block.loc[:, missing], strategy, is_binary[missing])
+            for i, fill_value in zip(np.flatnonzero(missing), computed):
+                fill_values[i] = fill_value
+    has_fill = np.array([fill_value is not None for fill_value in fill_values], dtype=bool)
+
+    if values.dtype.kind == 'f':
+        if not all(isinstance(v, (int, float, np.integer, np.floating)) and not isinstance(v, bool)
+                   for v in fill_values if v is not None):
+            return None
+        fill_row = np.array([np.nan if v is None else v for v in fill_values], dtype=float)
+        values = np.where(np.isnan(values), fill_row, values)
+        to_int = is_binary & has_fill
+    else:
+        # Pas de valeurs manquantes : seule la conversion en entier s'applique
+        to_int = has_fill & (is_binary | (values.dtype.kind in 'iu'))
+
+    if not to_int.any():
+        return pd.DataFrame(values, index=block.index, columns=block.columns)
+    return pd.concat([
+        pd.DataFrame(values[:, ~to_int], index=block.index, columns=block.columns[~to_int]),
+        pd.DataFrame(values[:, to_int].astype(int), index=block.index, columns=block.columns[to_int]),
+    ], axis=1)[block.columns]
+
+
+def _fill_missing_frame(df_features: pd.DataFrame, strategy: str, plan) -> pd.DataFrame:
+    blocks = []
+    for dtype, columns in _dtype_blocks(df_features):
+        filled = None
+        if dtype == _BLOCK_FLOAT or (isinstance(dtype, np.dtype) and dtype.kind in 'biu'):
+            filled = _fill_missing_block(df_features[columns], strategy, plan)
+        if filled is None:
+            # Colonnes texte, catégorielles... : une colonne à la fois
+            filled = pd.DataFrame({
+                column: _fill_missing_column(df_features[column], strategy, plan)
+                for column in columns
+            }, index=df_features.index)
+        blocks.append(filled)
+    df_features = _replace_blocks(df_features, blocks)
+    if plan is not None:
+        # Types du fichier entier, que le remplissage d'un chunk a pu changer
+        restore = {column: plan[column]['dtype'] for column in df_features.columns
+                   if 'dtype' in plan[column] and df_features[column].dtype != plan[column]['dtype']}
+        if restore:
+            df_features = df_features.astype(restore)
+    return df_features
+
+
+def _fill_missing_column(series: pd.Series, strategy: str, plan) -> pd.Series:
+    if plan is not None:
+        column_plan = plan[series.name]
+        return _fill_missing(series, column_plan['fill_value'],
+                             column_plan['is_binary'], column_plan['is_numeric'])
+    # Identifier le type de colonne
+    is_binary = series.dropna().isin([0, 1]).all()
+    is_numeric = pd.api.types.is_numeric_dtype(series)
+    fill_value = _missing_fill_value(series, strategy, is_binary, is_numeric)
+    return _fill_missing(series, fill_value, is_binary, is_numeric)
+
+
+def _planned_columns(df_features: pd.DataFrame, plan, step: str) -> pd.Index:
+    """Colonnes numériques du chunk ; avec un plan, seulement celles qu'il prévoit pour ``step``."""
+    numeric_cols = df_features.select_dtypes(include=[np.number]).columns
+    if plan is None:
+        return numeric_cols
+    return pd.Index([column for column in numeric_cols if plan[column].get(step) is not None])
+
+
+def _clip_outliers_frame(df_features: pd.DataFrame, plan) -> pd.DataFrame:
+    numeric_cols = _planned_columns(df_features, plan, 'bounds')
+    block_cols = [column for column, dtype in df_features.dtypes[numeric_cols].items()
+                  if dtype in (_BLOCK_INT, _BLOCK_FLOAT)]
+    bounds = None
+    if plan is not None:
+        bounds = pd.DataFrame([plan[column]['bounds'] for column in block_cols],
+                              index=block_cols, columns=['lower', 'upper'], dtype=float)
+    elif block_cols:
+        # Un seul calcul de quantiles pour toutes les colonnes numériques
+        quartiles = df_features[block_cols].quantile([0.25, 0.75])
+        lower, upper = _iqr_bounds(quartiles.iloc[0], quartiles.iloc[1])
+        bounds = pd.DataFrame({'lower': lower, 'upper': upper})
+
+    blocks = []
+    for dtype, columns in _dtype_blocks(df_features[numeric_cols]):
+        if dtype not in (_BLOCK_INT, _BLOCK_FLOAT):
+            for column in columns:
+                if plan is not None:
+                    lower_bound, upper_bound = plan[column]['bounds']
+                else:
+                    lower_bound, upper_bound = _iqr_bounds(df_features[column].quantile(0.25),
+                                                           df_features[column].quantile(0.75))
+                blocks.append(_clip_outliers(df_features[column], lower_bound, upper_bound).to_frame(column))
+            continue
+        to_float = None
+        if plan is not None:
+            to_float = np.array([plan[column].get('clip_to_float', False) for column in columns], dtype=bool)
+        blocks.append(_clip_outliers_block(df_features[columns],
+                                           bounds.loc[columns, 'lower'].to_numpy(),
+                                           bounds.loc[columns, 'upper'].to_numpy(), to_float))
+    return _replace_blocks(df_features, blocks)
+
+
+def _clip_outliers_block(block: pd.DataFrame, lower: np.ndarray, upper: np.ndarray,
+                         to_float: Optional[np.ndarray] = None) -> pd.DataFrame:
+    """Écrête un bloc de colonnes, avec les mêmes types de sortie que ``_clip_outliers``.
+
+    ``to_float`` impose les colonnes entières qui deviennent flottantes (décidé
+    sur le fichier entier par le plan).
+    """
+    values = block.to_numpy()
+    below, above = values < lower, values > upper
+    if values.dtype.kind == 'f':
+        return pd.DataFrame(np.where(below, lower, np.where(above, upper, values)),
+                            index=block.index, columns=block.columns)
+
+    # Une colonne entière ne passe en flottant que si une valeur est ramenée à une borne non entière
+    if to_float is None:
+        to_float = ((below.any(axis=0) & (lower != np.floor(lower)))
+                    | (above.any(axis=0) & (upper != np.floor(upper))))
+    clipped = pd.DataFrame(index=block.index)
+    if to_float.any():
+        v, lo, hi = values[:, to_float], lower[to_float], upper[to_float]
+        clipped = pd.DataFrame(np.where(below[:, to_float], lo, np.where(above[:, to_float], hi, v)),
+                               index=block.index, columns=block.columns[to_float])
+    if not to_float.all():
+        keep = ~to_float
+        v, b, a = values[:, keep], below[:, keep], above[:, keep]
+        # Bornes entières (ou jamais atteintes) : le calcul reste en entiers
+        lo = np.where(b.any(axis=0), lower[keep], 0).astype(values.dtype)
+        hi = np.where(a.any(axis=0), upper[keep], 0).astype(values.dtype)
+        clipped = pd.concat([clipped, pd.DataFrame(np.where(b, lo, np.where(a, hi, v)),
+                                                   index=block.index, columns=block.columns[keep])], axis=1)
+    return clipped[block.columns]
+
+
+def _scale_min_max_frame(df_features: pd.DataFrame, plan) -> pd.DataFrame:
+    numeric_cols = _planned_columns(df_features, plan, 'range')
+    blocks = []
+    for dtype, columns in _dtype_blocks(df_features[numeric_cols]):
+        if dtype not in (_BLOCK_INT, _BLOCK_FLOAT):
+            for column in columns:
+                if plan is not None:
+                    min_val, max_val = plan[column]['range']
+                else:
+                    min_val, max_val = df_features[column].min(), df_features[column].max()
+                blocks.append(_scale_min_max(df_features[column], min_val, max_val).to_frame(column))
+            continue
+        block = df_features[columns]
+        if plan is not None:
+            min_vals = np.array([plan[column]['range'][0] for column in columns])
+            max_vals = np.array([plan[column]['range'][1] for column in columns])
+        else:
+            min_vals, max_vals = block.min().to_numpy(), block.max().to_numpy()
+        # Les colonnes constantes sont laissées telles quelles (division par zéro)
+        scaled = max_vals != min_vals
+        if scaled.any():
+            values = block.loc[:, scaled].to_numpy()
+            blocks.append(pd.DataFrame(
+                (values - min_vals[scaled]) / (max_vals[scaled] - min_vals[scaled]),
+                index=block.index, columns=block.columns[scaled]
+            ))
+    return _replace_blocks(df_features, blocks)
+
+
+def process_features(df_features, target_data, cleaned_data, processing_summary, plan=None):
+    """Nettoie les features.
+
+    Sans ``plan``, les statistiques sont calculées sur ``df_features`` ; avec un
+    plan issu de ``build_processing_plan``, elles portent sur le fichier entier.
+    Les colonnes numériques sont traitées par blocs de même dtype, en une
+    opération vectorisée par étape plutôt qu'en une boucle sur les colonnes.
+    """
+    # Traitement des valeurs manquantes
+    if cleaned_data['handle_missing']:
+        df_features = _fill_missing_frame(df_features, cleaned_data['missing_strategy'], plan)
+        processing_summary['missing_values'] = 'Traitées selon le type de variable'
+
+    # Traitement des outliers (uniquement sur les features numériques)
+    if cleaned_data['handle_outliers']:
+        df_features = _clip_outliers_frame(df_features, plan)
+        processing_summary['outliers'] = 'Traitées avec la méthode IQR'
+
+    # Normalisation Min-Max (évite les valeurs négatives)
+    if cleaned_data['normalize_data']:
+        df_features = _scale_min_max_frame(df_features, plan)
+        processing_summary['normalization'] = 'Normalisation Min-Max (0-1)'
+
+    # Suppression des doublons (comparés sur les features seulement) :
+    # la ligne entière est retirée, cible comprise
+    if cleaned_data['remove_duplicates']:
+        duplicated = df_features.duplicated()
+        df_features = df_features[~duplicated]
+        if target_data is not None:
+            target_data = target_data[~duplicated]
+        _count_duplicates(processing_summary, int(duplicated.sum()))
+
+    # Réintégrer la colonne cible si elle existe
+    if target_data is not None:
+        return pd.concat([df_features, target_data], axis=1)
+    return df_features
+
+
+def _count_duplicates(processing_summary, removed: int):
+    """Cumule les doublons supprimés d'un chunk à l'autre."""
+    processing_summary['duplicates_removed'] = processing_summary.get('duplicates_removed', 0) + removed
+    processing_summary['duplicates'] = f"{processing_summary['duplicates_removed']} doublons supprimés"
+
+
+def merge_processing_summary(processing_summary, chunk_summary):
+    """Fusionne le résumé d'un chunk traité séparément dans le résumé global."""
+    for key, value in chunk_summary.items():
+        if key == 'duplicates_removed':
+            _count_duplicates(processing_summary, value)
+        elif key != 'duplicates':
+            processing_summary[key] = value
+    return processing_summary
+
+
+def split_target(chunk: pd.DataFrame, target_column: Optional[str]):
+    """Sépare la colonne cible (exclue du traitement) des features."""
+    if target_column and target_column in chunk.columns:
+        return chunk.drop(columns=[target_column]), chunk[target_column]
+    return chunk.copy(), None
+
+
+def _chunk_statistics(chunk: pd.DataFrame, quantile_error: float = DEFAULT_ERROR,
+                      frequency_capacity: int = DEFAULT_CAPACITY) -> DatasetStatistics:
+    statistics = DatasetStatistics(quantile_error, frequency_capacity)
+    statistics.update(chunk)
+    return statistics
+
+
+def _process_chunk(chunk: pd.DataFrame, target_column, cleaned_data, plan):
+    """Traite un chunk avec son propre résumé (exécutable dans un autre processus).
+
+    Les doublons sont supprimés sur le fichier entier par l'appelant : le chunk
+    est retourné complet, avec les empreintes de ses lignes.
+    """
+    chunk_summary = {}
+    df_features, target_data = split_target(chunk, target_column)
+    options = dict(cleaned_data, remove_duplicates=False)
+    processed = process_features(df_features, target_data, options, chunk_summary, plan)
+    hashes = None
+    if cleaned_data['remove_duplicates']:
+        hashes = row_hashes(processed, subset=list(df_features.columns))
+    return processed, chunk_summary, hashes
+
+
+def _ordered_map(function, chunks, executor=None, window=1, args=()):
+    """Applique ``function`` à chaque chunk, dans le pool si fourni, en conservant l'ordre.
+
+    Au plus ``window`` chunks sont en vol à la fois pour garder une mémoire bornée.
+    """
+    if executor is None:
+        for chunk in chunks:
+            yield function(chunk, *args)
+        return
+
+    pending = collections.deque()
+    for chunk in chunks:
+        pending.append(executor.submit(function, chunk, *args))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+class ChunkedProcessor:
+    """Traitement d'un fichier en deux passes à mémoire bornée par la taille de chunk.
+
+    La première passe collecte des statistiques fusionnables sur toutes les
+    colonnes ; la seconde applique le nettoyage chunk par chunk avec les
+    paramètres calculés sur le fichier entier.
+    """
+
+    # Phases rapportées au callback de progression
+    PHASE_STATISTICS = 'statistics'
+    PHASE_PROCESSING = 'processing'
+
+    def __init__(self, path: str, file_type: str, cleaned_data: Dict[str, Any],
+                 chunk_size: int = CHUNK_SIZE,
+                 progress_callback: Optional[Callable[[str, 'DataChunkReader'], None]] = None,
+                 workers: int = 1, quantile_error: float = DEFAULT_ERROR,
+                 frequency_capacity: int = DEFAULT_CAPACITY,
+                 dedup_memory: int = DEFAULT_MEMORY_BUDGET, spill_dir: Optional[str] = None,
+                 dtype: Optional[Dict[str, Any]] = None):
+        self.path = path
+        self.file_type = file_type
+        self.cleaned_data = cleaned_data
+        self.chunk_size = chunk_size
+        self.progress_callback = progress_callback
+        # Au-delà d'un worker, les chunks sont traités dans un pool de processus
+        self.workers = workers
+        self.quantile_error = quantile_error
+        self.frequency_capacity = frequency_capacity
+        # Empreintes des lignes déjà écrites, déversées sur disque au-delà de ce budget
+        self.dedup_memory = dedup_memory
+        self.spill_dir = spill_dir
+        # Types connus (schéma du fichier) : la première passe ne les infère pas
+        self.dtype = dtype
+        self.statistics: Optional[DatasetStatistics] = None
+        self.processing_summary: Dict[str, Any] = {}
+
+    def collect_statistics(self) -> DatasetStatistics:
+        """Première passe : statistiques de toutes les colonnes."""
+        statistics = DatasetStatistics(self.quantile_error, self.frequency_capacity)
+        reader = DataChunkReader(self.path, self.file_type, self.chunk_size, dtype=self.dtype)
+        with self._executor() as executor:
+            for chunk_statistics in _ordered_map(_chunk_statistics, reader, executor, self._window,
+                                                 (self.quantile_error, self.frequency_capacity)):
+                statistics.merge(chunk_statistics)
+                self._report_progress(self.PHASE_STATISTICS, reader)
+
+        # En CSV, une colonne mixte est lue comme du texte sur le fichier entier :
+        # ses effectifs sont recomptés sur les valeurs brutes. Des booléens avec
+        # et sans valeurs manquantes selon le chunk ne sont pas mixtes.
+        mixed = [column for column, stats in statistics.columns.items() if stats.mixed and not stats.boolean]
+        if mixed and self.file_type == 'csv':
+            recount = DatasetStatistics(self.quantile_error, self.frequency_capacity)
+            for chunk in iter_data_chunks(self.path, self.file_type, self.chunk_size,
+                                          dtype={column: object for column in mixed}, columns=mixed):
+                recount.update(chunk)
+            statistics.columns.update(recount.columns)
+
+        self.statistics = statistics
+        return statistics
+
+    def iter_processed_chunks(self) -> Iterator[pd.DataFrame]:
+        """Seconde passe : chunks nettoyés avec les statistiques du fichier entier."""
+        if self.statistics is None:
+            self.collect_statistics()
+
+        target_column = self.cleaned_data.get('target_column')
+        feature_columns = [column for column in self.statistics.columns if column != target_column]
+        plan = build_processing_plan(self.statistics, feature_columns, self.cleaned_data)
+
+        columns = list(self.statistics.columns) if self.file_type != 'csv' else None
+        reader = DataChunkReader(self.path, self.file_type, self.chunk_size,
+                                 dtype=self.statistics.read_dtypes(self.file_type == 'csv'), columns=columns)
+        with self._executor() as executor, RowHashSet(self.dedup_memory, self.spill_dir) as seen_rows:
+            results = _ordered_map(_process_chunk, reader, executor, self._window,
+                                   (target_column, self.cleaned_data, plan))
+            for processed_chunk, chunk_summary, hashes in results:
+                merge_processing_summary(self.processing_summary, chunk_summary)
+                if hashes is not None:
+                    # Doublons d'une ligne d'un chunk précédent ou du même chunk
+                    first_seen = seen_rows.add(hashes)
+                    processed_chunk = processed_chunk[first_seen]
+                    _count_duplicates(self.processing_summary, int((~first_seen).sum()))
+                yield processed_chunk
+                self._report_progress(self.PHASE_PROCESSING, reader)
+
+    @property
+    def _window(self):
+        # Deux chunks en vol par worker : aucun processus n'attend de travail
+        return 2 * self.workers
+
+    def _executor(self):
+        if self.workers > 1:
+            return ProcessPoolExecutor(max_workers=self.workers)
+        return contextlib.nullcontext()
+
+    def _report_progress(self, phase: str, reader: DataChunkReader):
+        if self.progress_callback:
+            self.progress_callback(phase, reader)
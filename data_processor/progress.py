@@ -0,0 +1,62 @@
+import time
+from typing import Any, Dict, Optional
+
+from django.core.cache import cache as django_cache
+
+# Durée de conservation de la progression dans le cache (secondes)
+PROGRESS_TIMEOUT = 300
+
+
+def progress_cache_key(data_file_id: int) -> str:
+    return f'process_progress_{data_file_id}'
+
+
+def get_progress(data_file_id: int) -> Optional[Dict[str, Any]]:
+    return django_cache.get(progress_cache_key(data_file_id))
+
+
+def clear_progress(data_file_id: int):
+    django_cache.delete(progress_cache_key(data_file_id))
+
+
+class ProgressTracker:
+    """Publie la progression d'un traitement à partir de la position dans le fichier.
+
+    Le fichier est lu une fois par passe : la quantité de travail totale vaut
+    ``passes`` fois sa taille en octets, sans passe de comptage préalable.
+    """
+
+    def __init__(self, data_file_id: int, passes: int = 2):
+        self.data_file_id = data_file_id
+        self.passes = passes
+        self.started_at = time.monotonic()
+        self._phases = []
+        self._completed_bytes = 0
+        self._completed_rows = 0
+
+    def __call__(self, phase: str, reader):
+        # Nouvelle passe : cumuler le travail de la passe précédente
+        if phase not in self._phases:
+            if self._phases:
+                self._completed_bytes += self._last_bytes
+                self._completed_rows += self._last_rows
+            self._phases.append(phase)
+        self._last_bytes = reader.bytes_read
+        self._last_rows = reader.rows_read
+
+        total_bytes = max(reader.total_bytes * self.passes, 1)
+        done_bytes = min(self._completed_bytes + reader.bytes_read, total_bytes)
+        rows_read = self._completed_rows + reader.rows_read
+        elapsed = max(time.monotonic() - self.started_at, 1e-6)
+        fraction = done_bytes / total_bytes
+
+        django_cache.set(progress_cache_key(self.data_file_id), {
+            'phase': phase,
+            'percent': round(fraction * 100, 1),
+            'rows_processed': reader.rows_read,
+            'bytes_processed': done_bytes,
+            'total_bytes': total_bytes,
+            'rows_per_second': round(rows_read / elapsed, 1),
+            'elapsed_seconds': round(elapsed, 1),
+            'eta_seconds': round(elapsed * (1 - fraction) / fraction, 1) if fraction else None,
+        }, PROGRESS_TIMEOUT)
@@ -0,0 +1,206 @@
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+from app.utils.columnar import read_parquet_rows
+from app.utils.compression import split_compression
+
+from .processing import CHUNK_SIZE, DataChunkReader, JSONLinesError, _records_to_frame
+from .schema import parse_schema_dates, read_data_file, schema_columns, schema_dtypes
+
+# Taille des lectures lors de la construction de l'index
+READ_SIZE = 1024 * 1024
+
+# En-tête de l'index : le pas (nombre de lignes entre deux positions)
+HEADER_SIZE = 8
+ENTRY_SIZE = 8
+
+
+def row_index_path(path: str) -> str:
+    """Index des lignes, enregistré à côté du fichier de données."""
+    return f'{path}.rows'
+
+
+class RowIndexBuilder:
+    """Position en octets d'une ligne de données sur ``step``, relevée sur le flux brut.
+
+    Seuls les sauts de ligne sont cherchés (en CSV, hors des champs entre
+    guillemets) : le fichier n'est pas analysé. Les lignes vides, ignorées
+    par les lecteurs, ne sont pas comptées ; en CSV, la première ligne est
+    l'en-tête.
+    """
+
+    def __init__(self, file_type: str, step: int):
+        self.csv = file_type == 'csv'
+        self.step = step
+        self.rows = 0
+        self.offsets: List[int] = []
+        self._position = 0
+        self._record_start = 0
+        self._in_quotes = False
+        self._header_seen = not self.csv
+        self._last_byte = b'\n'
+
+    def feed(self, data: bytes):
+        if not data:
+            return
+        buffer = np.frombuffer(data, dtype=np.uint8)
+        ends = np.flatnonzero(buffer == ord('\n'))
+        if self.csv:
+            quotes = np.cumsum(buffer == ord('"')) + self._in_quotes
+            ends = ends[quotes[ends] % 2 == 0]
+            self._in_quotes = bool(quotes[-1] % 2)
+        if len(ends):
+            # Octet précédant chaque saut de ligne, pour les fins de ligne \r\n
+            previous = np.concatenate((np.frombuffer(self._last_byte, dtype=np.uint8), buffer))[ends]
+            ends = ends + self._position
+            starts = np.concatenate(([self._record_start], ends[:-1] + 1))
+            lengths = ends - starts
+            blank = (lengths == 0) | ((lengths == 1) & (previous == ord('\r')))
+            self._add(starts[~blank])
+            self._record_start = int(ends[-1]) + 1
+        self._position += len(data)
+        self._last_byte = data[-1:]
+
+    def close(self) -> np.ndarray:
+        # Dernière ligne sans saut de ligne final
+        length = self._position - self._record_start
+        if length > 1 or (length == 1 and self._last_byte != b'\r'):
+            self._add(np.array([self._record_start]))
+        return np.array(self.offsets, dtype='<i8')
+
+    def _add(self, starts: np.ndarray):
+        if not self._header_seen and len(starts):
+            starts = starts[1:]
+            self._header_seen = True
+        numbers = self.rows + np.arange(len(starts))
+        self.offsets.extend(int(start) for start in starts[numbers % self.step == 0])
+        self.rows += len(starts)
+
+
+def build_row_index(path: str, file_type: str, step: Optional[int] = None) -> Optional[str]:
+    """Construit l'index des lignes d'un fichier CSV ou JSON (un enregistrement par ligne).
+
+    Retourne le chemin de l'index, ou None si le fichier ne s'y prête pas :
+    fichier compressé (pas d'accès direct à une position) ou JSON qui n'est
+    pas à raison d'un enregistrement par ligne.
+    """
+    if split_compression(path)[1] is not None or file_type not in ('csv', 'json'):
+        return None
+    if file_type == 'json' and not _is_json_lines(path):
+        return None
+    builder = RowIndexBuilder(file_type, step or settings.PREVIEW_INDEX_STEP)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(READ_SIZE), b''):
+            builder.feed(block)
+    offsets = builder.close()
+
+    index_path = row_index_path(path)
+    temp_path = f'{index_path}.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(np.array([builder.step], dtype='<i8').tobytes())
+        f.write(offsets.tobytes())
+    os.replace(temp_path, index_path)
+    return index_path
+
+
+def _is_json_lines(path: str) -> bool:
+    with open(path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                try:
+                    return isinstance(json.loads(line), dict)
+                except ValueError:
+                    return False
+    return True
+
+
+def _index_offset(path: str, row: int) -> Optional[tuple]:
+    """Position de la ligne indexée au plus proche avant ``row`` et nombre de lignes à sauter."""
+    index_path = row_index_path(path)
+    if not os.path.exists(index_path):
+        return None
+    with open(index_path, 'rb') as f:
+        step = int(np.frombuffer(f.read(HEADER_SIZE), dtype='<i8')[0])
+        entry = row // step
+        f.seek(HEADER_SIZE + entry * ENTRY_SIZE)
+        data = f.read(ENTRY_SIZE)
+    if len(data) < ENTRY_SIZE:
+        # Au-delà de la dernière ligne
+        return -1, 0
+    return int(np.frombuffer(data, dtype='<i8')[0]), row - entry * step
+
+
+def read_rows(path: str, file_type: str, schema: List[Dict[str, Any]],
+              start: int, count: int) -> pd.DataFrame:
+    """Lignes ``start`` à ``start + count`` d'un fichier, lues avec les types de son schéma.
+
+    Avec un index, la lecture commence à la ligne indexée la plus proche :
+    au plus ``PREVIEW_INDEX_STEP`` lignes sont lues en plus de la page,
+    quelle que soit la taille du fichier. Sans index (fichier compressé,
+    JSON sur plusieurs lignes), le fichier est lu depuis le début. En
+    Parquet, seuls les groupes de lignes contenant la page sont lus.
+    """
+    if file_type == 'parquet':
+        df = read_parquet_rows(path, start, count, schema_columns(schema) or None)
+        if schema:
+            df = df.astype(schema_dtypes(schema, list(df.columns)))
+        df.index = pd.RangeIndex(start, start + len(df))
+        return parse_schema_dates(df, schema)
+    located = _index_offset(path, start)
+    if located is None:
+        return _read_rows_sequential(path, file_type, schema, start, count)
+    offset, skip = located
+    columns = schema_columns(schema) or None
+    dtypes = schema_dtypes(schema)
+    if offset < 0:
+        df = pd.DataFrame(columns=columns)
+    elif file_type == 'csv':
+        if columns is None:
+            columns = list(pd.read_csv(path, nrows=0).columns)
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            df = pd.read_csv(f, header=None, names=columns, dtype=dtypes, nrows=skip + count)
+        df = df.iloc[skip:]
+    else:
+        records = []
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.strip():
+                    continue
+                if skip:
+                    skip -= 1
+                    continue
+                records.append(json.loads(line))
+                if len(records) == count:
+                    break
+        df = _records_to_frame(records, dtypes, columns, start)
+    df.index = pd.RangeIndex(start, start + len(df))
+    return parse_schema_dates(df, schema)
+
+
+def _read_rows_sequential(path: str, file_type: str, schema: List[Dict[str, Any]],
+                          start: int, count: int) -> pd.DataFrame:
+    dtypes = schema_dtypes(schema)
+    columns = schema_columns(schema) or None
+    chunks = []
+    position = 0
+    try:
+        for chunk in DataChunkReader(path, file_type, CHUNK_SIZE, dtype=dtypes, columns=columns):
+            end = position + len(chunk)
+            if end > start:
+                chunks.append(chunk.iloc[max(start - position, 0):start + count - position])
+            position = end
+            if position >= start + count:
+                break
+    except JSONLinesError:
+        df = read_data_file(path, file_type, schema, nrows=start + count)
+        return df.iloc[start:]
+    df = pd.concat(chunks) if chunks else pd.DataFrame(columns=columns)
+    df.index = pd.RangeIndex(start, start + len(df))
+    return parse_schema_dates(df, schema)
@@ -0,0 +1,77 @@
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from .processing import CHUNK_SIZE, DataChunkReader, JSONLinesError
+
+
+def schema_columns(schema: List[Dict[str, Any]]) -> List[str]:
+    """Noms des colonnes, dans l'ordre du fichier."""
+    return [entry['name'] for entry in schema]
+
+
+def schema_dtypes(schema: List[Dict[str, Any]], columns: Optional[List[str]] = None) -> Dict[str, str]:
+    """Types explicites à passer aux lecteurs (``dtype=``).
+
+    Les dates sont lues comme texte puis converties par ``parse_schema_dates`` ;
+    les colonnes marquées ``infer`` sont laissées à l'inférence de pandas.
+    """
+    dtypes = {}
+    for entry in schema:
+        if entry.get('infer') or (columns is not None and entry['name'] not in columns):
+            continue
+        dtype = entry['dtype']
+        dtypes[entry['name']] = 'object' if dtype.startswith('datetime64') else dtype
+    return dtypes
+
+
+def schema_date_formats(schema: List[Dict[str, Any]]) -> Dict[str, Optional[str]]:
+    """Colonnes de dates et leur format (None : format à déterminer par pandas)."""
+    return {entry['name']: entry.get('datetime_format') for entry in schema
+            if entry['dtype'].startswith('datetime64')}
+
+
+def parse_schema_dates(df: pd.DataFrame, schema: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Convertit les colonnes de dates du schéma avec leur format enregistré."""
+    for column, date_format in schema_date_formats(schema).items():
+        if column in df.columns and not pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column] = pd.to_datetime(df[column], format=date_format, errors='coerce')
+    return df
+
+
+def read_data_file(path: str, file_type: str, schema: List[Dict[str, Any]],
+                   nrows: Optional[int] = None, usecols: Optional[List[str]] = None,
+                   parse_dates: bool = True) -> pd.DataFrame:
+    """Lit un fichier (éventuellement compressé) avec les types de son schéma, sans inférence.
+
+    ``nrows`` limite la lecture aux premières lignes et ``usecols`` aux
+    colonnes utiles ; avec ``parse_dates=False`` les dates restent le texte
+    du fichier. Un JSON mal formé (ni un enregistrement par ligne, ni un
+    tableau valide) est réparé par ``load_json_data``.
+    """
+    dtypes = schema_dtypes(schema, usecols)
+    if file_type == 'csv':
+        df = pd.read_csv(path, dtype=dtypes, usecols=usecols, nrows=nrows)
+    else:
+        columns = usecols or schema_columns(schema) or None
+        chunks = []
+        rows = 0
+        try:
+            for chunk in DataChunkReader(path, file_type, nrows or CHUNK_SIZE,
+                                         dtype=dtypes, columns=columns):
+                chunks.append(chunk)
+                rows += len(chunk)
+                if nrows is not None and rows >= nrows:
+                    break
+            df = pd.concat(chunks) if chunks else pd.DataFrame(columns=columns)
+        except JSONLinesError:
+            from app.utils.json_processor import load_json_data
+            date_formats = schema_date_formats(schema) if parse_dates else {}
+            df = load_json_data(path, dtypes=dtypes, date_formats=date_formats)
+            if df is None:
+                raise ValueError("Erreur lors du chargement du fichier JSON")
+            if usecols is not None:
+                df = df[usecols]
+        if nrows is not None:
+            df = df.head(nrows)
+    return parse_schema_dates(df, schema) if parse_dates else df
@@ -0,0 +1,80 @@
+import glob
+import hashlib
+import json
+import os
+from typing import Optional
+
+from .export_cache import invalidate_exports
+from .models import DataFile
+from .preview import invalidate_preview
+from .row_index import row_index_path
+
+# Champs d'analyse repris d'un fichier de même contenu déjà importé
+REUSED_METADATA_FIELDS = [
+    'file', 'file_type', 'row_count', 'column_count', 'missing_values', 'schema', 'column_stats', 'file_size'
+]
+
+
+def uploaded_file_sha256(uploaded_file) -> str:
+    """SHA-256 d'un fichier importé, calculé à la réception ou, à défaut, en le relisant."""
+    sha256 = getattr(uploaded_file, 'sha256', None)
+    if sha256:
+        return sha256
+    digest = hashlib.sha256()
+    for chunk in uploaded_file.chunks():
+        digest.update(chunk)
+    uploaded_file.seek(0)
+    return digest.hexdigest()
+
+
+def processing_key(options: dict) -> str:
+    """Identifiant des options de traitement : même contenu et même clé, même résultat."""
+    canonical = json.dumps(options, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+def find_stored_copy(sha256: str) -> Optional[DataFile]:
+    """Fichier déjà importé et analysé avec le même contenu, dont le blob existe encore."""
+    for data_file in DataFile.objects.filter(sha256=sha256).exclude(file='').order_by('pk'):
+        if os.path.exists(data_file.file.path):
+            return data_file
+    return None
+
+
+def reuse_stored_copy(data_file: DataFile, original: DataFile):
+    """Fait pointer ``data_file`` sur le blob de ``original`` et reprend son analyse."""
+    for field in REUSED_METADATA_FIELDS:
+        setattr(data_file, field, getattr(original, field))
+    # Le nom seul : le FieldFile de l'original reste lié à son instance
+    data_file.file = original.file.name
+
+
+def delete_data_file(data_file: DataFile):
+    """Supprime un DataFile ; le blob et les résultats partagés ne sont supprimés qu'au dernier référent."""
+    others = DataFile.objects.filter(file=data_file.file.name).exclude(pk=data_file.pk)
+    if data_file.file and not others.exists():
+        # Dernier référent : le blob et tous les résultats de traitement associés
+        paths = [data_file.file.path, row_index_path(data_file.file.path)] + glob.glob(glob.escape(data_file.file.path) + '_*processed*')
+    elif not others.filter(processing_key=data_file.processing_key,
+                           processed_format=data_file.processed_format).exists():
+        paths = [data_file.processed_path]
+    else:
+        paths = []
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+    invalidate_preview(data_file.pk)
+    invalidate_exports(data_file.pk)
+    data_file.delete()
+
+
+def release_processed_output(data_file: DataFile, old_key: str, old_format: str = ''):
+    """Supprime l'ancien résultat d'un fichier retraité s'il n'est plus référencé."""
+    if (old_key, old_format) == (data_file.processing_key, data_file.processed_format):
+        return
+    referenced = DataFile.objects.filter(
+        file=data_file.file.name, processing_key=old_key, processed_format=old_format
+    ).exclude(pk=data_file.pk).exists()
+    path = data_file.processed_path_for(old_key, old_format)
+    if not referenced and os.path.exists(path):
+        os.remove(path)
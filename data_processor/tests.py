@@ -1,3 +1,986 @@
-from django.test import TestCase
+import asyncio
+import bz2
+import gzip
+import hashlib
+import io
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import FileResponse
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from app.main import app, lifespan
+from app.routes import data_routes
+from app.services.data_service import DataService
+from app.utils.csv_validator import generate_data_profile
+from app.utils.data_processing import build_moments, build_quantile_sketches
+from app.utils.dedup import RowHashSet, row_hashes
+from app.utils.frequency import FrequencyCounter
+from app.utils.moments import MomentsAccumulator
+from app.utils.sketches import DEFAULT_ERROR, KLLSketch
+from benchmarks.process_features import make_wide_frame, process_features_by_column
+from .export_cache import evict_exports, export_cache_dir
+from .exports import write_xlsx_export
+from .jobs import claim_next_job, run_job
+from .metadata import StreamingProfiler, scan_file_metadata
+from .models import DataFile, ProcessingJob, UploadSession
+from .preview import build_preview, get_preview, preview_cache_key
+from .processing import ChunkedProcessor, DataChunkReader, iter_data_chunks, process_features, split_target
+from .row_index import build_row_index, read_rows, row_index_path
+from .schema import read_data_file
+from .uploads import cleanup_upload_sessions
+from .writers import ProcessedFileWriter
+
+
+class ChunkedProcessingTests(SimpleTestCase):
+    """Le traitement par chunks donne le même résultat que le traitement en mémoire."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir, ignore_errors=True)
+
+    def write_json_lines(self, records, name='data.json'):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, 'w') as f:
+            for record in records:
+                f.write(json.dumps(record) + '\n')
+        return path
+
+    def options(self, **overrides):
+        options = dict(handle_missing=True, handle_outliers=False, normalize_data=False,
+                       remove_duplicates=False, missing_strategy='mean', target_column='')
+        options.update(overrides)
+        return options
+
+    def assert_same_as_in_memory(self, path, file_type, full, options, chunk_size=10):
+        expected = process_features(*split_target(full, options['target_column']), options, {})
+        processor = ChunkedProcessor(path, file_type, options, chunk_size=chunk_size)
+        result = pd.concat(list(processor.iter_processed_chunks()))
+        pd.testing.assert_frame_equal(expected, result)
+
+    def test_mixed_column_filled_to_numbers_in_one_chunk(self):
+        # Entiers et quelques textes : un chunk sans texte devient entier une fois rempli
+        records = [{'a': i % 7, 'b': float(i)} for i in range(40)]
+        records[5]['a'] = None
+        records[6]['a'] = '7'
+        records[30]['a'] = 'abc'
+        path = self.write_json_lines(records)
+        for handle_outliers in (False, True):
+            with self.subTest(handle_outliers=handle_outliers):
+                self.assert_same_as_in_memory(path, 'json', pd.DataFrame(records),
+                                              self.options(handle_outliers=handle_outliers,
+                                                           normalize_data=True))
+
+    def test_json_dtypes_match_whole_file(self):
+        # Colonne vide et booléens avec valeurs manquantes concentrées dans certains chunks
+        records = [{'empty': None, 'flag': None if i < 15 else i % 2 == 0, 'value': i % 9}
+                   for i in range(40)]
+        path = self.write_json_lines(records)
+        full = next(iter_data_chunks(path, 'json', chunk_size=len(records)))
+        self.assertEqual(full['empty'].dtype, 'float64')
+        options = self.options(handle_missing=False)
+        for chunk in ChunkedProcessor(path, 'json', options, chunk_size=10).iter_processed_chunks():
+            pd.testing.assert_series_equal(chunk.dtypes, full.dtypes)
+        for handle_missing in (False, True):
+            with self.subTest(handle_missing=handle_missing):
+                self.assert_same_as_in_memory(path, 'json', full,
+                                              self.options(handle_missing=handle_missing,
+                                                           handle_outliers=True, normalize_data=True))
+
+    def test_json_array_read_in_chunks(self):
+        records = [{'a': i, 'nested': {'b': i / 2}} for i in range(25)]
+        path = os.path.join(self.tmpdir, 'array.json')
+        with open(path, 'w') as f:
+            json.dump(records, f, indent=2)
+        reader = DataChunkReader(path, 'json', chunk_size=10)
+        chunks = list(reader)
+        self.assertEqual([len(chunk) for chunk in chunks], [10, 10, 5])
+        self.assertEqual(reader.bytes_read, os.path.getsize(path))
+        df = pd.concat(chunks)
+        self.assertEqual(list(df.columns), ['a', 'nested_b'])
+        self.assertEqual(list(df.index), list(range(25)))
+        self.assertEqual(df['nested_b'].tolist(), [i / 2 for i in range(25)])
+
+
+class ProcessedFileWriterTests(SimpleTestCase):
+    """Le fichier traité n'apparaît qu'une fois complet ; un échec ne laisse rien derrière lui."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir, ignore_errors=True)
+        self.path = os.path.join(self.tmpdir, 'data.csv_processed.csv')
+        self.chunks = [pd.DataFrame({'a': range(i, i + 5), 'b': list('abcde')}) for i in (0, 5)]
+
+    def test_committed_by_rename(self):
+        with ProcessedFileWriter(self.path, 'csv') as writer:
+            for chunk in self.chunks:
+                writer.write(chunk)
+                self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(os.listdir(self.tmpdir), [os.path.basename(self.path)])
+        self.assertEqual(writer.rows_written, 10)
+        pd.testing.assert_frame_equal(pd.read_csv(self.path), pd.concat(self.chunks, ignore_index=True))
+
+    def test_failure_leaves_previous_output(self):
+        with open(self.path, 'w') as f:
+            f.write('previous\n')
+        with self.assertRaises(RuntimeError):
+            with ProcessedFileWriter(self.path, 'csv') as writer:
+                writer.write(self.chunks[0])
+                raise RuntimeError('chunk illisible')
+        self.assertEqual(os.listdir(self.tmpdir), [os.path.basename(self.path)])
+        with open(self.path) as f:
+            self.assertEqual(f.read(), 'previous\n')
+
+
+class ParallelProcessingTests(SimpleTestCase):
+    """Les chunks traités dans un pool de processus donnent le résultat du traitement séquentiel."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir, ignore_errors=True)
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({
+            'x': rng.normal(10, 3, 2000).round(1),
+            'n': rng.integers(0, 50, 2000),
+            'label': rng.choice(['a', 'b', 'c', None], 2000),
+        })
+        df.loc[rng.random(2000) < 0.05, 'x'] = np.nan
+        # Doublons répartis sur plusieurs chunks
+        df = pd.concat([df, df.sample(300, random_state=0)], ignore_index=True)
+        self.path = os.path.join(self.tmpdir, 'data.csv')
+        df.to_csv(self.path, index=False)
+        self.options = dict(handle_missing=True, handle_outliers=True, normalize_data=True,
+                            remove_duplicates=True, missing_strategy='median', target_column='')
+
+    def run_processor(self, workers):
+        processor = ChunkedProcessor(self.path, 'csv', self.options, chunk_size=250, workers=workers,
+                                     dedup_memory=8 * 500, spill_dir=self.tmpdir)
+        return processor, pd.concat(list(processor.iter_processed_chunks()))
+
+    def test_two_workers_match_sequential(self):
+        sequential, expected = self.run_processor(1)
+        parallel, result = self.run_processor(2)
+        pd.testing.assert_frame_equal(result, expected)
+        self.assertEqual(parallel.processing_summary, sequential.processing_summary)
+        self.assertGreater(sequential.processing_summary['duplicates_removed'], 0)
+
+        self.assertEqual(parallel.statistics.row_count, sequential.statistics.row_count)
+        for column, expected_stats in sequential.statistics.columns.items():
+            stats = parallel.statistics.columns[column]
+            with self.subTest(column=column):
+                self.assertEqual(stats.missing, expected_stats.missing)
+                self.assertEqual(stats.frequencies.most_common(10), expected_stats.frequencies.most_common(10))
+                if expected_stats.moments is None:
+                    self.assertIsNone(stats.moments)
+                    continue
+                self.assertEqual(stats.moments.to_dict(), expected_stats.moments.to_dict())
+                self.assertEqual(stats.sketch.quantiles([0.25, 0.5, 0.75]),
+                                 expected_stats.sketch.quantiles([0.25, 0.5, 0.75]))
+
+
+class ProcessFeaturesReferenceTests(SimpleTestCase):
+    """Le noyau par blocs de dtype reproduit la boucle colonne par colonne d'origine."""
+
+    def options(self, strategy):
+        return dict(handle_missing=True, handle_outliers=True, normalize_data=True,
+                    remove_duplicates=False, missing_strategy=strategy)
+
+    def test_same_output_as_reference_loop(self):
+        df = make_wide_frame(500, 15, seed=3)
+        for strategy in ('mean', 'median', 'mode'):
+            with self.subTest(strategy=strategy):
+                summary, expected_summary = {}, {}
+                expected = process_features_by_column(df.copy(), None, self.options(strategy), expected_summary)
+                result = process_features(df.copy(), None, self.options(strategy), summary)
+                pd.testing.assert_frame_equal(result, expected, check_exact=True)
+                self.assertEqual(summary, expected_summary)
+
+    def test_all_missing_column_left_empty(self):
+        df = make_wide_frame(200, 10, seed=4)
+        with_empty = df.assign(empty=np.nan)
+        # La boucle d'origine échoue sur le mode d'une colonne vide
+        with self.assertRaises(KeyError):
+            process_features_by_column(with_empty.copy(), None, self.options('mean'), {})
+        result = process_features(with_empty.copy(), None, self.options('mean'), {})
+        self.assertTrue(result['empty'].isna().all())
+        expected = process_features_by_column(df.copy(), None, self.options('mean'), {})
+        pd.testing.assert_frame_equal(result.drop(columns='empty'), expected, check_exact=True)
+
+
+class StreamingSummaryTests(SimpleTestCase):
+    """Les résumés construits par chunks se fusionnent et restent proches des valeurs exactes."""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.values = rng.lognormal(size=20000)
+        self.chunks = np.array_split(self.values, 7)
+
+    def test_kll_sketch_merge_within_error(self):
+        sketch = KLLSketch()
+        for chunk in self.chunks:
+            sketch.merge(KLLSketch().update(chunk))
+        self.assertEqual(sketch.count, len(self.values))
+        self.assertEqual((sketch.min, sketch.max), (self.values.min(), self.values.max()))
+        sorted_values = np.sort(self.values)
+        for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+            rank = np.searchsorted(sorted_values, sketch.quantile(q)) / len(sorted_values)
+            self.assertLess(abs(rank - q), 2 * DEFAULT_ERROR)
+
+    def test_kll_sketch_exact_below_capacity(self):
+        sketch = KLLSketch()
+        values = self.values[:sketch.k]
+        for chunk in np.array_split(values, 3):
+            sketch.update(chunk)
+        for q in (0.1, 0.25, 0.5, 0.9):
+            self.assertAlmostEqual(sketch.quantile(q), np.quantile(values, q))
+
+    def test_moments_merge_matches_pandas(self):
+        moments = MomentsAccumulator()
+        for chunk in self.chunks:
+            moments.merge(MomentsAccumulator().update(chunk))
+        series = pd.Series(self.values)
+        self.assertEqual(moments.count, len(series))
+        self.assertAlmostEqual(moments.mean, series.mean(), places=10)
+        self.assertAlmostEqual(moments.std(), series.std(), places=10)
+        self.assertEqual((moments.min, moments.max), (series.min(), series.max()))
+
+    def test_frequency_counter_merge(self):
+        rng = np.random.default_rng(1)
+        # Quelques valeurs fréquentes au milieu de nombreuses valeurs rares
+        values = pd.Series(np.concatenate([rng.integers(0, 5, 3000), rng.integers(100, 600, 3000)]))
+        values = values.sample(frac=1, random_state=0).reset_index(drop=True)
+        exact = FrequencyCounter()
+        summary = FrequencyCounter(capacity=20)
+        for chunk in np.array_split(values, 6):
+            exact.merge(FrequencyCounter().update(chunk))
+            summary.merge(FrequencyCounter(capacity=20).update(chunk))
+        self.assertTrue(exact.exact)
+        self.assertEqual(exact.most_common(5), list(values.value_counts().head(5).items()))
+        self.assertEqual(exact.mode(), values.mode()[0])
+        self.assertFalse(summary.exact)
+        true_counts = values.value_counts()
+        for value, count in summary.most_common(5):
+            self.assertLess(value, 5)
+            self.assertLessEqual(count, true_counts[value])
+            self.assertGreaterEqual(count, true_counts[value] - summary.error)
+
+
+class DataProfileTests(SimpleTestCase):
+    """Profil de l'API : quartiles et valeurs fréquentes exacts, résumés fournis complétés."""
+
+    def setUp(self):
+        rng = np.random.default_rng(2)
+        self.df = pd.DataFrame({
+            'x': rng.lognormal(size=1001),
+            'n': rng.integers(0, 100, 1001),
+            'label': rng.choice(['a', 'b', 'c', 'd', 'e', 'f', 'g'], 1001, p=[.3, .2, .15, .15, .1, .05, .05]),
+        })
+
+    def test_exact_quartiles_and_frequent_values(self):
+        profile = generate_data_profile(self.df)
+        for column in ('x', 'n'):
+            stats = profile['numeric_statistics'][column]
+            expected = self.df[column].describe()
+            for key in ('count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'):
+                self.assertAlmostEqual(stats[key], expected[key], places=10, msg=f'{column} {key}')
+        self.assertEqual(profile['categorical_statistics']['label']['frequent_values'],
+                         self.df['label'].value_counts().head(5).to_dict())
+
+    def test_sketch_used_when_it_covers_more_rows(self):
+        sketches = build_quantile_sketches(self.df, ['x'])
+        build_quantile_sketches(self.df, ['x'], sketches)
+        moments = build_moments(pd.concat([self.df, self.df]), ['x'])
+        profile = generate_data_profile(self.df, sketches=sketches, moments=moments)
+        self.assertEqual(profile['numeric_statistics']['x']['count'], 2 * len(self.df))
+        self.assertEqual(profile['numeric_statistics']['x']['50%'], sketches['x'].quantile(0.5))
+        self.assertAlmostEqual(profile['numeric_statistics']['n']['50%'], self.df['n'].median())
+        # Colonne sans moments fournis : calculés sur df
+        self.assertEqual(profile['numeric_statistics']['n']['count'], len(self.df))
+        self.assertAlmostEqual(profile['numeric_statistics']['n']['mean'], self.df['n'].mean())
+
+    def test_frequent_values_from_counters(self):
+        frequencies = {'label': FrequencyCounter().update(self.df['label'])}
+        profile = generate_data_profile(self.df, frequencies=frequencies)
+        self.assertEqual(profile['categorical_statistics']['label']['frequent_values'],
+                         dict(frequencies['label'].most_common(5)))
+
+
+class RowHashSetTests(SimpleTestCase):
+    """La suppression des doublons entre chunks, y compris une fois les empreintes écrites sur disque."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir, ignore_errors=True)
+
+    def test_spilled_hashes_match_drop_duplicates(self):
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({'a': rng.integers(0, 2000, 6000), 'b': rng.choice(['x', 'y', None], 6000)})
+        expected = ~df.duplicated()
+        with RowHashSet(memory_budget=8 * 200, spill_dir=self.tmpdir, fan_out=2) as seen:
+            mask = np.concatenate([seen.add(row_hashes(chunk)) for chunk in np.array_split(df, 40)])
+            self.assertTrue(seen._spilled)
+            self.assertLessEqual(len(seen._spilled), 2)
+            self.assertEqual(len(seen), expected.sum())
+        self.assertEqual(mask.tolist(), expected.tolist())
+        self.assertEqual(os.listdir(self.tmpdir), [])
+
+
+class StreamingProfilerTests(SimpleTestCase):
+    """Métadonnées relevées à la réception : identiques à l'analyse du fichier enregistré."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir, ignore_errors=True)
+        rng = np.random.default_rng(5)
+        self.df = pd.DataFrame({
+            'id': range(120),
+            'value': rng.normal(size=120).round(3),
+            'label': rng.choice(['a', 'b', None], 120),
+            # Champs entre guillemets avec sauts de ligne et virgules
+            'comment': [f'ligne {i}\nsuite, "citée"' if i % 4 == 0 else f'ligne {i}' for i in range(120)],
+        })
+        self.df.loc[::7, 'value'] = np.nan
+
+    def write(self, name, content):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def profile(self, content, file_type, packet_size=7, **kwargs):
+        profiler = StreamingProfiler(file_type, block_size=64, **kwargs)
+        for start in range(0, len(content), packet_size):
+            profiler.feed(content[start:start + packet_size])
+        return profiler.close()
+
+    def test_csv_quoted_newlines_across_blocks(self):
+        content = self.df.to_csv(index=False).encode()
+        path = self.write('data.csv', content)
+        metadata = self.profile(content, 'csv')
+        self.assertEqual(metadata, scan_file_metadata(path, 'csv', chunk_size=17))
+
+        full = pd.read_csv(path)
+        self.assertEqual(metadata['row_count'], len(full))
+        self.assertEqual([entry['name'] for entry in metadata['schema']], list(full.columns))
+        self.assertEqual({entry['name']: entry['dtype'] for entry in metadata['schema']},
+                         {column: str(dtype) for column, dtype in full.dtypes.items()})
+        self.assertEqual(metadata['missing_values'],
+                         {column: count for column, count in full.isnull().sum().items() if count})
+        self.assertEqual(metadata['column_stats']['value']['médiane'], round(full['value'].median(), 4))
+        self.assertEqual(metadata['file_size'], len(content))
+
+    def test_json_lines_and_compressed_input(self):
+        content = self.df.to_json(orient='records', lines=True).encode()
+        path = self.write('data.json', content)
+        metadata = self.profile(content, 'json')
+        self.assertEqual(metadata, scan_file_metadata(path, 'json', chunk_size=17))
+
+        compressed = gzip.compress(content)
+        gzip_metadata = self.profile(compressed, 'json', compression='gzip')
+        self.assertEqual(gzip_metadata, dict(metadata, file_size=len(compressed)))
+
+    def test_json_array_left_to_file_scan(self):
+        self.assertIsNone(self.profile(self.df.to_json(orient='records', indent=2).encode(), 'json'))
+
+
+class RowIndexTests(SimpleTestCase):
+    """Pages lues depuis l'index des lignes, y compris le dernier bloc incomplet et au-delà de la fin."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir, ignore_errors=True)
+        self.df = pd.DataFrame({
+            'id': range(25),
+            'text': [f'ligne\n{i}' if i % 3 == 0 else f'ligne {i}' for i in range(25)],
+            'value': [i / 4 if i % 5 else None for i in range(25)],
+        })
+
+    def indexed(self, file_type):
+        path = os.path.join(self.tmpdir, f'data.{file_type}')
+        if file_type == 'csv':
+            # Lignes vides et fins de ligne \r\n, ignorées par les lecteurs
+            self.df.to_csv(path, index=False, lineterminator='\r\n')
+            with open(path, 'ab') as f:
+                f.write(b'\r\n\r\n')
+        else:
+            self.df.to_json(path, orient='records', lines=True)
+        self.assertEqual(build_row_index(path, file_type, step=10), row_index_path(path))
+        return path, scan_file_metadata(path, file_type)['schema']
+
+    def test_pages_match_full_read(self):
+        for file_type in ('csv', 'json'):
+            path, schema = self.indexed(file_type)
+            full = read_data_file(path, file_type, schema)
+            for start, count in ((0, 10), (3, 10), (12, 5), (20, 10), (24, 3)):
+                with self.subTest(file_type=file_type, start=start):
+                    rows = read_rows(path, file_type, schema, start, count)
+                    pd.testing.assert_frame_equal(rows, full.iloc[start:start + count])
+            for start in (25, 30, 100):
+                with self.subTest(file_type=file_type, start=start):
+                    rows = read_rows(path, file_type, schema, start, 10)
+                    self.assertTrue(rows.empty)
+                    self.assertEqual(list(rows.columns), list(self.df.columns))
+
+    def test_no_index_for_compressed_file(self):
+        path = os.path.join(self.tmpdir, 'data.csv.gz')
+        self.df.to_csv(path, index=False)
+        self.assertIsNone(build_row_index(path, 'csv', step=10))
+        schema = scan_file_metadata(path, 'csv')['schema']
+        pd.testing.assert_frame_equal(read_rows(path, 'csv', schema, 20, 10),
+                                      read_data_file(path, 'csv', schema).iloc[20:])
+
+
+class MediaTestCase(TestCase):
+    """Utilisateur connecté, MEDIA_ROOT temporaire et requêtes HTTP acceptées sans redirection."""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        # Cache propre à chaque test (aperçus, progression)
+        media = override_settings(MEDIA_ROOT=media_root, SECURE_SSL_REDIRECT=False, CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': media_root},
+        })
+        media.enable()
+        self.addCleanup(media.disable)
+        self.user = User.objects.create_user('user@example.com', 'user@example.com', 'password')
+        self.client.force_login(self.user)
+        rows = [f'{i},{(i * 7) % 13 if i % 5 else ""},{"abc"[i % 3]}' for i in range(300)]
+        self.data = ('id,value,label\n' + '\n'.join(rows) + '\n').encode()
+        self.options = {'handle_missing': 'on', 'missing_strategy': 'mean',
+                        'outliers_method': 'iqr', 'normalization_method': 'minmax'}
+
+    def upload(self, data, filename='data.csv'):
+        self.client.post('/upload/', {'file': SimpleUploadedFile(filename, data)})
+        return DataFile.objects.latest('pk')
+
+    def submit(self, data_file, **options):
+        response = self.client.post(f'/process/{data_file.pk}/', dict(self.options, **options),
+                                    HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, 202)
+        return response.json()
+
+    def process(self, data_file, **options):
+        self.submit(data_file, **options)
+        job = claim_next_job()
+        if job is not None:
+            run_job(job)
+        data_file.refresh_from_db()
+        return data_file
+
+    def upload_in_parts(self, data, part_size, filename='data.csv'):
+        session = self.client.post('/upload/sessions/', {
+            'filename': filename, 'total_size': len(data), 'part_size': part_size,
+        }).json()
+        for part in range(session['part_count']):
+            self.put_part(session['id'], part, data[part * part_size:(part + 1) * part_size])
+        return session['id'], self.client.post(f"/upload/sessions/{session['id']}/complete/")
+
+    def put_part(self, session_id, part, body):
+        return self.client.generic('PUT', f'/upload/sessions/{session_id}/parts/{part}/', body,
+                                   content_type='application/octet-stream')
+
+
+class ProcessingJobTests(MediaTestCase):
+    """File des traitements : une seule tâche par fichier, échec enregistré."""
+
+    def setUp(self):
+        super().setUp()
+        self.data_file = self.upload(self.data)
+
+    def test_resubmitted_while_pending_returns_same_job(self):
+        first = self.submit(self.data_file)
+        self.assertEqual(first['status'], DataFile.STATUS_PENDING)
+        self.assertEqual(self.submit(self.data_file, missing_strategy='median')['job_id'], first['job_id'])
+        self.assertEqual(ProcessingJob.objects.count(), 1)
+
+        run_job(claim_next_job())
+        self.data_file.refresh_from_db()
+        self.assertEqual(self.data_file.processing_status, DataFile.STATUS_DONE)
+        self.assertTrue(os.path.exists(self.data_file.processed_path))
+        self.assertIsNone(claim_next_job())
+        progress = self.client.get(f'/process/{self.data_file.pk}/progress/').json()
+        self.assertEqual((progress['status'], progress['percent']), (DataFile.STATUS_DONE, 100.0))
+
+    def test_failed_job_records_error(self):
+        job_id = self.submit(self.data_file)['job_id']
+        os.remove(self.data_file.file.path)
+        with self.assertLogs('data_processor.jobs', 'ERROR'):
+            run_job(claim_next_job())
+        job = ProcessingJob.objects.get(pk=job_id)
+        self.data_file.refresh_from_db()
+        self.assertEqual(job.status, DataFile.STATUS_FAILED)
+        self.assertIn('No such file', job.error)
+        self.assertEqual(self.data_file.processing_status, DataFile.STATUS_FAILED)
+        self.assertEqual(self.data_file.processing_error, job.error)
+        self.assertFalse(self.data_file.processed)
+        progress = self.client.get(f'/process/{self.data_file.pk}/progress/').json()
+        self.assertEqual((progress['status'], progress['error']), (DataFile.STATUS_FAILED, job.error))
+        # Une nouvelle soumission crée une nouvelle tâche
+        self.assertNotEqual(self.submit(self.data_file)['job_id'], job_id)
+
+
+class UploadTests(MediaTestCase):
+    """Import d'un fichier : stockage par contenu, formats et compression, schéma enregistré."""
+
+    def blobs(self):
+        return sorted(os.path.relpath(os.path.join(root, name), settings.MEDIA_ROOT)
+                      for root, _, files in os.walk(settings.MEDIA_ROOT) for name in files)
+
+    def test_identical_content_shares_blob_and_processed_output(self):
+        first = self.upload(self.data, 'first.csv')
+        second = self.upload(self.data, 'second.csv')
+        self.assertEqual(second.file.name, first.file.name)
+        self.assertEqual(second.sha256, hashlib.sha256(self.data).hexdigest())
+        self.assertEqual((second.row_count, second.schema), (first.row_count, first.schema))
+
+        first = self.process(first)
+        self.assertEqual(self.submit(second)['status'], DataFile.STATUS_DONE)
+        self.assertIsNone(claim_next_job())
+        second.refresh_from_db()
+        self.assertTrue(second.processed)
+        self.assertEqual(second.processed_path, first.processed_path)
+        self.assertEqual(second.processing_summary, first.processing_summary)
+        blobs = self.blobs()
+
+        # Le blob et le résultat restent tant qu'un autre import les utilise
+        self.client.post(f'/delete/{first.pk}/')
+        self.assertEqual(self.blobs(), blobs)
+        self.client.post(f'/delete/{second.pk}/')
+        self.assertEqual(self.blobs(), [])
+        self.assertFalse(DataFile.objects.exists())
+
+    def test_processed_output_kept_while_shared(self):
+        first = self.process(self.upload(self.data, 'first.csv'))
+        second = self.process(self.upload(self.data, 'second.csv'), missing_strategy='median')
+        self.assertNotEqual(second.processed_path, first.processed_path)
+        self.client.post(f'/delete/{second.pk}/')
+        self.assertFalse(os.path.exists(second.processed_path))
+        self.assertTrue(os.path.exists(first.processed_path))
+        self.assertTrue(os.path.exists(first.file.path))
+
+    def test_compressed_inputs_processed_and_previewed(self):
+        import zstandard
+        plain = self.process(self.upload(self.data))
+        expected = self.client.get(f'/export/{plain.pk}/?format=csv&compression=none')
+        expected = b''.join(expected.streaming_content)
+        compressors = {'gz': gzip.compress, 'bz2': bz2.compress,
+                       'zst': zstandard.ZstdCompressor().compress}
+        for extension, compress in compressors.items():
+            with self.subTest(compression=extension):
+                data_file = self.upload(compress(self.data), f'data.csv.{extension}')
+                self.assertEqual(data_file.file_type, 'csv')
+                self.assertEqual(data_file.row_count, 300)
+                self.assertEqual(data_file.schema, plain.schema)
+                self.assertFalse(os.path.exists(row_index_path(data_file.file.path)))
+                preview = self.client.get(f'/preview/{data_file.pk}/data/?page=3&page_size=100').json()
+                self.assertEqual([row['id'] for row in preview['data']], list(range(200, 300)))
+
+                data_file = self.process(data_file)
+                self.assertEqual(data_file.processing_status, DataFile.STATUS_DONE)
+                response = self.client.get(f'/export/{data_file.pk}/?format=csv&compression=none')
+                self.assertEqual(b''.join(response.streaming_content), expected)
+
+    def test_metadata_scanned_in_chunks(self):
+        data_file = self.upload(self.data)
+        expected = pd.read_csv(io.BytesIO(self.data))
+        self.assertEqual((data_file.row_count, data_file.column_count), expected.shape)
+        self.assertEqual(data_file.missing_values, {'value': int(expected['value'].isna().sum())})
+        self.assertEqual({entry['name']: entry['dtype'] for entry in data_file.schema},
+                         {column: str(dtype) for column, dtype in expected.dtypes.items()})
+        self.assertEqual(data_file.file_size, len(self.data))
+
+    def test_json_and_xml_inputs(self):
+        records = [{'id': i, 'value': i / 2, 'label': 'abc'[i % 3]} for i in range(50)]
+        json_lines = ''.join(json.dumps(record) + '\n' for record in records).encode()
+        json_array = json.dumps(records, indent=2).encode()
+        xml = ('<rows>' + ''.join(f"<row><id>{r['id']}</id><value>{r['value']}</value><label>{r['label']}</label></row>"
+                                  for r in records) + '</rows>').encode()
+        for filename, content in (('lines.json', json_lines), ('array.json', json_array),
+                                  ('array.json.gz', gzip.compress(json_array)), ('rows.xml', xml)):
+            with self.subTest(filename=filename):
+                data_file = self.upload(content, filename)
+                self.assertEqual((data_file.row_count, data_file.column_count), (50, 3))
+                self.assertEqual(data_file.file_type, 'csv' if filename.endswith('.xml') else 'json')
+                self.assertEqual([entry['name'] for entry in data_file.schema], ['id', 'value', 'label'])
+                self.assertEqual(data_file.column_stats['value']['max'], 24.5)
+                preview = self.client.get(f'/preview/{data_file.pk}/data/').json()
+                self.assertEqual(preview['data'][49], records[49])
+
+    def test_schema_persisted_and_applied(self):
+        rows = [f'{i},2024-01-{i % 28 + 1:02d},{"" if i % 10 == 0 else i % 2 == 0},{i:05d}' for i in range(60)]
+        data = ('id,day,flag,code\n' + '\n'.join(rows) + '\n').encode()
+        data_file = self.upload(data)
+        schema = {entry['name']: entry for entry in data_file.schema}
+        self.assertEqual(schema['id']['dtype'], 'int64')
+        self.assertEqual(schema['day']['dtype'], 'datetime64[ns]')
+        self.assertEqual(schema['day']['datetime_format'], '%Y-%m-%d')
+        self.assertTrue(schema['flag']['infer'])
+        self.assertEqual(schema['code']['dtype'], 'int64')
+        self.assertEqual(data_file.column_names, ['id', 'day', 'flag', 'code'])
+
+        df = read_data_file(data_file.file.path, 'csv', data_file.schema)
+        self.assertEqual(df['day'].dtype, 'datetime64[ns]')
+        self.assertEqual(df['day'].iloc[1], pd.Timestamp('2024-01-02'))
+
+        data_file = self.process(data_file)
+        processed = {entry['name']: entry['dtype'] for entry in data_file.processed_schema}
+        self.assertEqual(list(processed), ['id', 'day', 'flag', 'code'])
+        # Booléens à trous remplis par le mode (0 ou 1), dates relues comme dates
+        self.assertEqual(processed, {'id': 'int64', 'day': 'datetime64[ns]', 'flag': 'int64', 'code': 'int64'})
+        self.assertEqual(data_file.processed_column_stats['flag']['valeurs_manquantes'], 0)
+
+
+class UploadSessionTests(MediaTestCase):
+    """Import reprenable : parties dans le désordre, reprise et assemblage."""
+
+    def test_parts_out_of_order_and_resume(self):
+        part_size = 1000
+        response = self.client.post('/upload/sessions/', {
+            'filename': 'data.csv', 'total_size': len(self.data), 'part_size': part_size,
+        })
+        self.assertEqual(response.status_code, 201)
+        session = response.json()
+        self.assertEqual(session['offset'], 0)
+        session_id = session['id']
+
+        # Partie de mauvaise taille refusée
+        self.assertEqual(self.put_part(session_id, 0, self.data[:part_size - 1]).status_code, 400)
+        for part in reversed(range(1, session['part_count'])):
+            self.put_part(session_id, part, self.data[part * part_size:(part + 1) * part_size])
+        self.assertEqual(self.client.get(f'/upload/sessions/{session_id}/').json()['offset'], 0)
+        self.assertEqual(self.client.post(f'/upload/sessions/{session_id}/complete/').status_code, 400)
+
+        self.put_part(session_id, 0, self.data[:part_size])
+        self.assertEqual(self.client.get(f'/upload/sessions/{session_id}/').json()['offset'], len(self.data))
+        response = self.client.post(f'/upload/sessions/{session_id}/complete/')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['row_count'], 300)
+        data_file = DataFile.objects.get(pk=response.json()['data_file_id'])
+        with open(data_file.file.path, 'rb') as f:
+            self.assertEqual(f.read(), self.data)
+        self.assertEqual(data_file.sha256, hashlib.sha256(self.data).hexdigest())
+        self.assertFalse(UploadSession.objects.exists())
+
+    def test_failed_completion_removes_blob(self):
+        _, response = self.upload_in_parts(b'\x00\xff not a csv', 100)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(UploadSession.objects.exists())
+        self.assertFalse(DataFile.objects.exists())
+        self.assertEqual([files for _, _, files in os.walk(settings.MEDIA_ROOT) if files], [])
+
+    def test_stale_sessions_cleaned_up(self):
+        session_id = self.client.post('/upload/sessions/', {
+            'filename': 'old.csv', 'total_size': len(self.data),
+        }).json()['id']
+        UploadSession.objects.filter(pk=session_id).update(
+            updated_at=timezone.now() - timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS + 1))
+        self.assertEqual(cleanup_upload_sessions(), 1)
+        self.assertEqual(self.client.get(f'/upload/sessions/{session_id}/').status_code, 404)
+
+    @override_settings(UPLOAD_MAX_FILE_SIZE=1000)
+    def test_oversized_file_refused(self):
+        response = self.client.post('/upload/sessions/', {'filename': 'big.csv', 'total_size': 1001})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('1000', response.json()['error'])
+        self.assertFalse(UploadSession.objects.exists())
+        self.assertEqual(self.client.post('/upload/sessions/', {
+            'filename': 'data.csv', 'total_size': 1000,
+        }).status_code, 201)
+
+
+class PreviewCacheTests(MediaTestCase):
+    """Première page de l'aperçu servie depuis le cache, oubliée quand le fichier change."""
+
+    def setUp(self):
+        super().setUp()
+        self.data_file = self.upload(self.data)
+
+    def preview(self, **params):
+        response = self.client.get(f'/preview/{self.data_file.pk}/data/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_first_page_cached_until_file_changes(self):
+        with mock.patch('data_processor.preview.build_preview', wraps=build_preview) as build:
+            first = self.preview()
+            self.assertEqual(self.preview(), first)
+            self.assertEqual(build.call_count, 1)
+            self.assertIsNotNone(cache.get(preview_cache_key(self.data_file.pk)))
+            # Autres pages et tailles : jamais en cache
+            self.preview(page=2)
+            self.preview(page_size=10)
+            self.assertEqual(build.call_count, 3)
+
+            # Fichier réécrit : l'entrée porte l'ancienne date de modification
+            stat = os.stat(self.data_file.file.path)
+            os.utime(self.data_file.file.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+            self.preview()
+            self.assertEqual(build.call_count, 4)
+
+            # Traité : l'aperçu du résultat remplace celui de l'import
+            self.process(self.data_file)
+            self.assertIsNone(cache.get(preview_cache_key(self.data_file.pk)))
+            processed = self.preview()
+            self.assertTrue(processed['processed'])
+            self.assertEqual(build.call_count, 5)
+
+            self.client.post(f'/delete/{self.data_file.pk}/')
+            self.assertIsNone(cache.get(preview_cache_key(self.data_file.pk)))
+
+    def test_conditional_get(self):
+        url = f'/preview/{self.data_file.pk}/data/'
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # Une autre page a sa propre version
+        self.assertNotEqual(self.client.get(url, {'page': 2})['ETag'], etag)
+        self.assertEqual(self.client.get(url, {'page': 2}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_get_preview_pages(self):
+        preview = get_preview(self.data_file, page=3, page_size=100)
+        self.assertEqual((preview['row_count'], preview['page_count']), (300, 3))
+        self.assertEqual([row['id'] for row in preview['data']], list(range(200, 300)))
+        self.assertEqual(get_preview(self.data_file, page=4, page_size=100)['data'], [])
+
+
+class ExportTests(MediaTestCase):
+    """Exports servis depuis le disque ou produits chunk par chunk."""
+
+    def setUp(self):
+        super().setUp()
+        _, response = self.upload_in_parts(self.data, len(self.data))
+        self.data_file = DataFile.objects.get(pk=response.json()['data_file_id'])
+        self.client.post(f'/process/{self.data_file.pk}/', {
+            'handle_missing': 'on', 'missing_strategy': 'mean',
+            'outliers_method': 'iqr', 'normalization_method': 'minmax',
+        })
+        run_job(claim_next_job())
+        self.data_file.refresh_from_db()
+        self.assertTrue(self.data_file.processed)
+
+    def export(self, export_format, **headers):
+        response = self.client.get(f'/export/{self.data_file.pk}/?format={export_format}', **headers)
+        return response, b''.join(response.streaming_content) if response.streaming else response.content
+
+    def cache_entries(self):
+        directory = os.path.join(export_cache_dir(), str(self.data_file.pk))
+        return sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+
+    def test_conditional_and_range_requests(self):
+        self.export('excel')
+        response, full = self.export('excel')
+        etag = response['ETag']
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(self.export('excel', HTTP_IF_NONE_MATCH=etag)[0].status_code, 304)
+
+        response, body = self.export('excel', HTTP_RANGE='bytes=100-199', HTTP_IF_RANGE=etag)
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 100-199/{len(full)}')
+        self.assertEqual(body, full[100:200])
+        self.assertEqual(self.export('excel', HTTP_RANGE='bytes=-50')[1], full[-50:])
+        self.assertEqual(self.export('excel', HTTP_RANGE=f'bytes={len(full)}-')[0].status_code, 416)
+        # Version différente ou plusieurs plages : fichier entier
+        response, body = self.export('excel', HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+        self.assertEqual((response.status_code, body), (200, full))
+        self.assertEqual(self.export('excel', HTTP_RANGE='bytes=0-9,20-29')[0].status_code, 200)
+
+    def test_text_exports(self):
+        response, body = self.export('csv')
+        self.assertTrue(response.streaming)
+        expected = pd.read_csv(io.BytesIO(body))
+        self.assertEqual(len(expected), 300)
+
+        response, body = self.export('json')
+        pd.testing.assert_frame_equal(pd.DataFrame(json.loads(body)), expected, check_dtype=False)
+        response, body = self.export('ndjson')
+        pd.testing.assert_frame_equal(pd.read_json(io.BytesIO(body), lines=True), expected, check_dtype=False)
+        response, body = self.export('excel')
+        pd.testing.assert_frame_equal(pd.read_excel(io.BytesIO(body)), expected, check_dtype=False)
+
+        # Import JSON : mêmes enregistrements quel que soit le format d'export
+        data_file = self.process(self.upload(pd.read_csv(io.BytesIO(self.data)).to_json(orient='records').encode(),
+                                             'data.json'))
+        exported = {}
+        for export_format in ('csv', 'json', 'ndjson'):
+            response = self.client.get(f'/export/{data_file.pk}/?format={export_format}')
+            exported[export_format] = b''.join(response.streaming_content)
+        records = json.loads(exported['json'])
+        self.assertEqual([json.loads(line) for line in exported['ndjson'].splitlines()], records)
+        pd.testing.assert_frame_equal(pd.read_csv(io.BytesIO(exported['csv'])), pd.DataFrame(records),
+                                      check_dtype=False)
+
+    def test_cache_reused_and_evicted_least_recent_first(self):
+        bodies = {}
+        for export_format in ('csv', 'json', 'ndjson'):
+            bodies[export_format] = self.export(export_format)[1]
+        self.assertEqual(len(self.cache_entries()), 3)
+        response, body = self.export('csv')
+        self.assertIsInstance(response, FileResponse)
+        self.assertEqual(body, bodies['csv'])
+
+        paths = {entry.rsplit('.', 1)[1]: os.path.join(export_cache_dir(), str(self.data_file.pk), entry)
+                 for entry in self.cache_entries()}
+        for age, export_format in enumerate(('csv', 'ndjson', 'json')):
+            os.utime(paths[export_format], (1000 + age, 1000 + age))
+        sizes = {export_format: os.path.getsize(path) for export_format, path in paths.items()}
+        self.assertEqual(evict_exports(sizes['json'] + sizes['ndjson']), sizes['csv'])
+        self.assertEqual([entry.rsplit('.', 1)[1] for entry in self.cache_entries()], ['json', 'ndjson'])
+
+        with override_settings(EXPORT_CACHE_MAX_BYTES=0):
+            self.assertEqual(self.export('excel')[0].status_code, 200)
+        self.assertEqual([entry.rsplit('.', 1)[1] for entry in self.cache_entries()], ['json', 'ndjson'])
+
+    def test_columnar_exports(self):
+        expected = pd.read_csv(io.BytesIO(self.export('csv')[1]))
+        for export_format, read in (('parquet', pd.read_parquet), ('feather', pd.read_feather)):
+            with self.subTest(export_format=export_format):
+                response, body = self.export(export_format)
+                self.assertEqual(response['Content-Disposition'],
+                                 f'attachment; filename="data_processed.{export_format}"')
+                pd.testing.assert_frame_equal(read(io.BytesIO(body)), expected, check_dtype=False)
+
+    def test_excel_split_into_sheets(self):
+        expected = pd.read_csv(io.BytesIO(self.export('csv')[1]))
+        target = io.BytesIO()
+        sheets = write_xlsx_export(self.data_file.processed_path, self.data_file.processed_file_type,
+                                   self.data_file.processed_schema, target, chunk_size=64, max_rows=101)
+        self.assertEqual(sheets, 3)
+        workbook = pd.read_excel(io.BytesIO(target.getvalue()), sheet_name=None)
+        self.assertEqual(list(workbook), ['Sheet1', 'Sheet2', 'Sheet3'])
+        self.assertEqual([len(sheet) for sheet in workbook.values()], [100, 100, 100])
+        pd.testing.assert_frame_equal(pd.concat(workbook.values(), ignore_index=True), expected,
+                                      check_dtype=False)
+
+    def test_compressed_text_exports(self):
+        import zstandard
+        decompress = {'gzip': gzip.decompress,
+                      'zstd': lambda body: zstandard.ZstdDecompressor().decompressobj().decompress(body)}
+        for export_format in ('csv', 'json', 'ndjson'):
+            plain = self.client.get(f'/export/{self.data_file.pk}/?format={export_format}&compression=none')
+            self.assertNotIn('Content-Encoding', plain)
+            plain = b''.join(plain.streaming_content)
+            for compression, (suffix, content_type) in (('gzip', ('.gz', 'application/gzip')),
+                                                        ('zstd', ('.zst', 'application/zstd'))):
+                with self.subTest(export_format=export_format, compression=compression):
+                    # Fichier compressé à télécharger
+                    response, body = self.export(f'{export_format}&compression={compression}')
+                    self.assertEqual(response['Content-Type'], content_type)
+                    self.assertNotIn('Content-Encoding', response)
+                    self.assertEqual(response['Content-Disposition'],
+                                     f'attachment; filename="data_processed.{export_format}{suffix}"')
+                    self.assertEqual(decompress[compression](body), plain)
+
+                    # Négociée : le client décompresse, le nom reste celui du format
+                    response, body = self.export(export_format, HTTP_ACCEPT_ENCODING=f'{compression}, identity;q=0.5')
+                    self.assertEqual(response['Content-Encoding'], compression)
+                    self.assertIn('Accept-Encoding', response['Vary'])
+                    self.assertEqual(response['Content-Disposition'],
+                                     f'attachment; filename="data_processed.{export_format}"')
+                    self.assertEqual(decompress[compression](body), plain)
+
+
+class DataServiceTests(SimpleTestCase):
+    """Connexions SQLite de l'API : une par thread, toutes fermées à l'arrêt."""
+
+    def setUp(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir, ignore_errors=True)
+        self.service = DataService(os.path.join(tmpdir, 'database.sqlite'))
+        self.addCleanup(self.service.close)
+        self.df = pd.DataFrame({'id': range(120), 'value': [i / 3 for i in range(120)],
+                                'label': ['abc'[i % 3] for i in range(120)]})
+        self.assertTrue(self.service.save_dataframe(self.df))
+
+    def in_thread(self, function):
+        results = []
+        thread = threading.Thread(target=lambda: results.append(function()))
+        thread.start()
+        thread.join()
+        return results[0]
+
+    def test_one_connection_per_thread_closed_together(self):
+        self.assertIs(self.service.connection(), self.service.connection())
+        other = self.in_thread(self.service.connection)
+        self.assertIsNot(other, self.service.connection())
+        pd.testing.assert_frame_equal(self.in_thread(self.service.get_dataframe), self.df)
+        self.assertEqual(self.service.connection().execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+
+        connections = list(self.service._connections)
+        self.assertEqual(len(connections), 3)
+        self.service.close()
+        self.assertEqual(self.service._connections, [])
+        for conn in connections:
+            with self.assertRaises(sqlite3.ProgrammingError):
+                conn.execute('SELECT 1')
+        # Reconnexion au premier usage suivant
+        pd.testing.assert_frame_equal(self.service.get_dataframe(), self.df)
+
+    def test_iter_dataframe_consumed_from_another_thread(self):
+        chunks = self.service.iter_dataframe(chunksize=50)
+        chunks = self.in_thread(lambda: list(chunks))
+        self.assertEqual([len(chunk) for chunk in chunks], [50, 50, 20])
+        pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), self.df)
+        self.assertIsNone(self.service.iter_dataframe('missing_table'))
+
+
+class ExportRouteTests(DataServiceTests):
+    """Route d'export de l'API et fermeture des connexions à l'arrêt de l'application."""
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(data_routes, 'data_service', self.service)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.csv = self.df.to_csv(index=False).encode()
+
+    def export(self, compression=None, accept_encoding=None):
+        response = data_routes.export_data(compression=compression, accept_encoding=accept_encoding)
+
+        async def body():
+            # Morceaux texte encodés à l'envoi, comme le fait Starlette
+            return b''.join([part if isinstance(part, bytes) else part.encode(response.charset)
+                             async for part in response.body_iterator])
+
+        return response, asyncio.run(body())
+
+    def test_export_formats(self):
+        import zstandard
+        zstd = lambda body: zstandard.ZstdDecompressor().decompressobj().decompress(body)
+        cases = [
+            (None, None, None, 'data_processed.csv', lambda body: body),
+            ('none', 'gzip', None, 'data_processed.csv', lambda body: body),
+            ('gzip', None, None, 'data_processed.csv.gz', gzip.decompress),
+            ('zstd', None, None, 'data_processed.csv.zst', zstd),
+            (None, 'gzip', 'gzip', 'data_processed.csv', gzip.decompress),
+            (None, 'gzip, zstd', 'zstd', 'data_processed.csv', zstd),
+        ]
+        for compression, accept_encoding, content_encoding, filename, decompress in cases:
+            with self.subTest(compression=compression, accept_encoding=accept_encoding):
+                response, body = self.export(compression, accept_encoding)
+                self.assertEqual(response.headers.get('content-encoding'), content_encoding)
+                self.assertEqual(response.headers['content-disposition'], f'attachment; filename={filename}')
+                self.assertEqual(response.headers['vary'], 'Accept-Encoding')
+                self.assertEqual(decompress(body), self.csv)
+
+    def test_lifespan_closes_connections(self):
+        self.in_thread(self.service.connection)
+        self.service.connection()
+
+        async def run():
+            async with lifespan(app):
+                self.assertEqual(len(self.service._connections), 2)
+
+        asyncio.run(run())
+        self.assertEqual(self.service._connections, [])
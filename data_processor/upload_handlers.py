@@ -0,0 +1,72 @@
+import hashlib
+
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+
+from app.utils.compression import data_file_type
+
+from .metadata import StreamingProfiler
+
+# Extensions analysées pendant la réception
+PROFILED_FILE_TYPES = ('csv', 'json')
+
+
+class Sha256UploadMixin:
+    """Calcule le SHA-256 d'un fichier pendant sa réception.
+
+    Le fichier importé obtient un attribut ``sha256`` : le contenu n'est pas
+    relu pour être identifié dans le stockage adressé par contenu.
+    """
+
+    def new_file(self, *args, **kwargs):
+        # Avant super() : le gestionnaire en mémoire l'interrompt par StopFutureHandlers
+        self.sha256 = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        # Le gestionnaire en mémoire inactif transmet les données au suivant, qui les hache
+        if getattr(self, 'activated', True):
+            self.sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        if file is not None:
+            file.sha256 = self.sha256.hexdigest()
+        return file
+
+
+class ProfilingUploadMixin:
+    """Analyse un fichier CSV ou JSON, compressé ou non, pendant sa réception (voir ``StreamingProfiler``).
+
+    Le fichier importé obtient un attribut ``profile`` (None si le contenu n'a
+    pas pu être analysé au fil de l'eau) : réception et analyse se
+    chevauchent au lieu de se suivre.
+    """
+
+    def new_file(self, field_name, file_name, *args, **kwargs):
+        file_type, compression = data_file_type(file_name)
+        if file_type in PROFILED_FILE_TYPES:
+            self.profiler = StreamingProfiler(file_type, compression=compression)
+        else:
+            self.profiler = None
+        super().new_file(field_name, file_name, *args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        # Le gestionnaire en mémoire inactif transmet les données au suivant sans les garder
+        if self.profiler is not None and getattr(self, 'activated', True):
+            self.profiler.feed(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        if file is not None:
+            file.profile = self.profiler.close() if self.profiler is not None else None
+        return file
+
+
+class DataMemoryFileUploadHandler(Sha256UploadMixin, ProfilingUploadMixin, MemoryFileUploadHandler):
+    pass
+
+
+class DataTemporaryFileUploadHandler(Sha256UploadMixin, ProfilingUploadMixin, TemporaryFileUploadHandler):
+    pass
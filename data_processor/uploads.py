@@ -0,0 +1,184 @@
+import hashlib
+import os
+import time
+from datetime import timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.db import OperationalError
+from django.utils import timezone
+
+from app.utils.compression import data_file_type, split_compression
+
+from .metadata import StreamingProfiler, scan_file_metadata
+from .models import DataFile, UploadSession, content_path
+from .row_index import build_row_index, row_index_path
+from .storage import find_stored_copy, reuse_stored_copy
+
+# Formats acceptés en import reprenable (l'XML est converti en mémoire)
+RESUMABLE_FILE_TYPES = ('csv', 'json')
+
+# Taille des lectures du corps de requête et du fichier assemblé
+READ_SIZE = 1024 * 1024
+
+# Tentatives d'enregistrement d'une partie reçue en même temps que d'autres
+RECORD_PART_ATTEMPTS = 20
+RECORD_PART_DELAY = 0.05
+
+
+class UploadError(Exception):
+    """Requête d'import reprenable invalide."""
+
+
+def create_upload_session(user, filename: str, total_size: int,
+                          part_size: Optional[int] = None) -> UploadSession:
+    """Ouvre une session d'import et alloue le fichier partiel à sa taille finale."""
+    file_type, _ = data_file_type(filename)
+    if file_type not in RESUMABLE_FILE_TYPES:
+        raise UploadError("Type de fichier non supporté. Veuillez uploader un fichier CSV ou JSON.")
+    if total_size < 0:
+        raise UploadError("La taille du fichier doit être positive.")
+    if total_size > settings.UPLOAD_MAX_FILE_SIZE:
+        raise UploadError(f"La taille du fichier ne doit pas dépasser {settings.UPLOAD_MAX_FILE_SIZE} octets.")
+    part_size = part_size or settings.UPLOAD_PART_SIZE
+    if not 0 < part_size <= settings.UPLOAD_MAX_PART_SIZE:
+        raise UploadError(f"La taille des parties doit être comprise entre 1 et {settings.UPLOAD_MAX_PART_SIZE} octets.")
+
+    # Les sessions abandonnées sont supprimées au fil des nouvelles sessions
+    cleanup_upload_sessions()
+    session = UploadSession.objects.create(
+        user=user, filename=os.path.basename(filename), file_type=file_type,
+        total_size=total_size, part_size=part_size
+    )
+    os.makedirs(os.path.dirname(session.path), exist_ok=True)
+    with open(session.path, 'wb') as f:
+        # Fichier creux : l'espace n'est occupé qu'au fil des parties reçues
+        f.truncate(total_size)
+    return session
+
+
+def write_upload_part(session: UploadSession, part: int, stream) -> UploadSession:
+    """Écrit une partie à sa position dans le fichier partiel, sans la garder en mémoire.
+
+    Une partie peut être renvoyée (reprise après une coupure) : elle est
+    simplement réécrite au même endroit.
+    """
+    if not 0 <= part < session.part_count:
+        raise UploadError(f"Partie {part} invalide : le fichier compte {session.part_count} partie(s).")
+    expected = session.part_length(part)
+    written = 0
+    with open(session.path, 'r+b') as f:
+        f.seek(part * session.part_size)
+        while written < expected:
+            data = stream.read(min(READ_SIZE, expected - written))
+            if not data:
+                break
+            f.write(data)
+            written += len(data)
+        too_long = bool(stream.read(1))
+    if written != expected or too_long:
+        raise UploadError(f"Partie {part} de taille incorrecte : {expected} octets attendus.")
+
+    return _record_part(session, part)
+
+
+def _record_part(session: UploadSession, part: int) -> UploadSession:
+    """Ajoute ``part`` aux parties reçues de la session.
+
+    Les parties peuvent arriver en parallèle, et ``select_for_update`` est
+    sans effet sous SQLite : comme pour la réservation des tâches, la liste
+    n'est mise à jour que si elle n'a pas changé depuis sa lecture. Une mise
+    à jour concurrente ou une base momentanément verrouillée fait recommencer.
+    """
+    for attempt in range(RECORD_PART_ATTEMPTS):
+        try:
+            received = UploadSession.objects.values_list('received_parts', flat=True).get(pk=session.pk)
+            updated = UploadSession.objects.filter(pk=session.pk, received_parts=received).update(
+                received_parts=sorted(set(received) | {part}), updated_at=timezone.now()
+            )
+        except OperationalError:
+            if attempt == RECORD_PART_ATTEMPTS - 1:
+                raise
+            updated = 0
+        if updated:
+            session.refresh_from_db()
+            return session
+        time.sleep(RECORD_PART_DELAY * (attempt + 1))
+    raise UploadError(f"Partie {part} reçue mais non enregistrée : veuillez la renvoyer.")
+
+
+def complete_upload_session(session: UploadSession) -> DataFile:
+    """Assemble l'import : le fichier partiel devient le blob du DataFile, sans copie.
+
+    Empreinte et métadonnées sont calculées en une seule lecture du fichier ;
+    un contenu déjà importé réutilise le blob existant.
+    """
+    if not session.complete:
+        missing = sorted(set(range(session.part_count)) - set(session.received_parts))
+        raise UploadError(f"Parties manquantes : {', '.join(map(str, missing[:20]))}.")
+
+    compression = split_compression(session.filename)[1]
+    sha256, metadata = _digest_and_profile(session.path, session.file_type, compression)
+    data_file = DataFile(
+        user=session.user, original_filename=session.filename,
+        original_file_type=session.file_type, file_type=session.file_type, sha256=sha256
+    )
+    stored_copy = find_stored_copy(sha256)
+    if stored_copy is not None:
+        reuse_stored_copy(data_file, stored_copy)
+        os.remove(session.path)
+        data_file.save()
+    else:
+        name = content_path(data_file, session.filename)
+        target = os.path.join(settings.MEDIA_ROOT, name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(session.path, target)
+        data_file.file = name
+        try:
+            if metadata is None:
+                metadata = scan_file_metadata(target, session.file_type)
+            for field, value in metadata.items():
+                setattr(data_file, field, value)
+            build_row_index(target, session.file_type)
+            data_file.save()
+        except Exception:
+            # Le blob n'est référencé par aucun DataFile : il ne doit pas rester sur le disque
+            _remove_blob(target)
+            session.delete()
+            raise
+    session.delete()
+    return data_file
+
+
+def delete_upload_session(session: UploadSession):
+    if os.path.exists(session.path):
+        os.remove(session.path)
+    session.delete()
+
+
+def cleanup_upload_sessions(max_age: Optional[timedelta] = None) -> int:
+    """Supprime les sessions sans activité depuis ``max_age`` et leurs fichiers partiels."""
+    if max_age is None:
+        max_age = timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS)
+    stale = UploadSession.objects.filter(updated_at__lt=timezone.now() - max_age)
+    count = 0
+    for session in stale:
+        delete_upload_session(session)
+        count += 1
+    return count
+
+
+def _remove_blob(path: str):
+    for leftover in (path, row_index_path(path)):
+        if os.path.exists(leftover):
+            os.remove(leftover)
+
+
+def _digest_and_profile(path: str, file_type: str, compression: Optional[str]):
+    digest = hashlib.sha256()
+    profiler = StreamingProfiler(file_type, compression=compression)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(READ_SIZE), b''):
+            digest.update(block)
+            profiler.feed(block)
+    return digest.hexdigest(), profiler.close()
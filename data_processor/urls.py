@@ -9,8 +9,14 @@ urlpatterns = [
     path('dashboard/', views.dashboard, name='dashboard'),
     path('', login_required(views.FileListView.as_view()), name='file_list'),
     path('upload/', views.upload_file, name='upload_file'),
+    path('upload/sessions/', views.upload_session_create, name='upload_session_create'),
+    path('upload/sessions/<uuid:session_id>/', views.upload_session_detail, name='upload_session_detail'),
+    path('upload/sessions/<uuid:session_id>/parts/<int:part>/', views.upload_session_part, name='upload_session_part'),
+    path('upload/sessions/<uuid:session_id>/complete/', views.upload_session_complete, name='upload_session_complete'),
     path('process/<int:pk>/', views.process_file, name='process_file'),
+    path('process/<int:pk>/progress/', views.process_progress, name='process_progress'),
     path('preview/<int:pk>/', views.preview_file, name='preview_file'),
+    path('preview/<int:pk>/data/', views.preview_data, name='preview_data'),
     path('export/<int:pk>/', views.export_file, name='export_file'),
     path('delete/<int:pk>/', views.delete_file, name='delete_file'),
     path('clear/', views.clear_all_files, name='clear_all_files'),
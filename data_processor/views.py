@@ -4,15 +4,29 @@ from django.contrib import messages
 from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import JsonResponse, FileResponse, HttpResponse
-from django.core.cache import cache
-from django.core.cache import cache as django_cache
-from .models import DataFile
+from django.http import JsonResponse, FileResponse, HttpResponse, StreamingHttpResponse
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import condition, require_http_methods
+from .models import DataFile, UploadSession
 from .forms import DataFileUploadForm, DataProcessingForm, UserRegistrationForm, LoginForm
-import pandas as pd
-import numpy as np
+from .export_cache import cached_export, store_export, tee_export
+from .exports import BINARY_EXPORT_WRITERS, EXPORT_FORMATS, TEXT_EXPORT_FORMATS, is_stored_as, iter_text_export
+from .http_cache import file_etag, file_last_modified, ranged_file_response
+from .jobs import submit_processing_job
+from .metadata import scan_file_metadata
+from .preview import get_preview, preview_source
+from .row_index import build_row_index, read_rows
+from .storage import delete_data_file, find_stored_copy, reuse_stored_copy, uploaded_file_sha256
+from .uploads import (
+    UploadError, complete_upload_session, create_upload_session, delete_upload_session, write_upload_part
+)
+from .progress import get_progress
 import os
-import json
+
+from app.utils.compression import (
+    OUTPUT_COMPRESSIONS, compress_stream, data_file_type, negotiate_compression, open_compressed, split_compression
+)
 
 def register(request):
     if request.method == 'POST':
@@ -79,87 +93,6 @@ def upload_file(request):
     
     return render(request, 'data_processor/upload.html', {'form': form})
 
-def process_features(df_features, target_data, cleaned_data, processing_summary):
-    # Traitement des valeurs manquantes
-    if cleaned_data['handle_missing']:
-        for column in df_features.columns:
-            # Identifier le type de colonne
-            is_binary = df_features[column].dropna().isin([0, 1]).all()
-            is_numeric = pd.api.types.is_numeric_dtype(df_features[column])
-            
-            strategy = cleaned_data['missing_strategy']
-            
-            if is_binary:
-                # Variables binaires : remplacer par le mode (0 ou 1)
-                fill_value = df_features[column].mode()[0]
-                df_features[column] = df_features[column].fillna(fill_value).astype(int)
-            elif is_numeric:
-                # Variables numériques
-                if strategy == 'mean':
-                    fill_value = df_features[column].mean()
-                elif strategy == 'median':
-                    fill_value = df_features[column].median()
-                else:  # mode
-                    fill_value = df_features[column].mode()[0]
-                
-                # Conserver le type d'origine si possible
-                if pd.api.types.is_integer_dtype(df_features[column]):
-                    df_features[column] = df_features[column].fillna(round(fill_value)).astype(int)
-                else:
-                    df_features[column] = df_features[column].fillna(fill_value)
-            else:
-                # Variables catégorielles
-                fill_value = df_features[column].mode()[0]
-                df_features[column] = df_features[column].fillna(fill_value)
-        
-        processing_summary['missing_values'] = 'Traitées selon le type de variable'
-    
-    # Traitement des outliers (uniquement sur les features numériques)
-    if cleaned_data['handle_outliers']:
-        numeric_cols = df_features.select_dtypes(include=[np.number]).columns
-        for column in numeric_cols:
-            Q1 = df_features[column].quantile(0.25)
-            Q3 = df_features[column].quantile(0.75)
-            IQR = Q3 - Q1
-            lower_bound = Q1 - 1.5*IQR
-            upper_bound = Q3 + 1.5*IQR
-            
-            # Ne pas modifier les valeurs si elles sont dans les bornes
-            mask = (df_features[column] >= lower_bound) & (df_features[column] <= upper_bound)
-            df_features[column] = np.where(mask, df_features[column], 
-                                         df_features[column].clip(lower_bound, upper_bound))
-            
-            # Conserver le type d'origine
-            if pd.api.types.is_integer_dtype(df_features[column]):
-                df_features[column] = df_features[column].round().astype(int)
-        
-        processing_summary['outliers'] = 'Traitées avec la méthode IQR'
-    
-    # Normalisation Min-Max (évite les valeurs négatives)
-    if cleaned_data['normalize_data']:
-        numeric_cols = df_features.select_dtypes(include=[np.number]).columns
-        for column in numeric_cols:
-            min_val = df_features[column].min()
-            max_val = df_features[column].max()
-            if max_val != min_val:  # éviter la division par zéro
-                df_features[column] = (df_features[column] - min_val) / (max_val - min_val)
-                # Conserver le type si possible
-                if pd.api.types.is_integer_dtype(df_features[column]):
-                    df_features[column] = (df_features[column] * 100).round().astype(int)
-        
-        processing_summary['normalization'] = 'Normalisation Min-Max (0-1)'
-    
-    # Suppression des doublons (sur les features seulement)
-    if cleaned_data['remove_duplicates']:
-        initial_rows = len(df_features)
-        df_features = df_features.drop_duplicates()
-        processing_summary['duplicates'] = f'{initial_rows - len(df_features)} doublons supprimés'
-    
-    # Réintégrer la colonne cible si elle existe
-    if target_data is not None:
-        return pd.concat([df_features, target_data], axis=1)
-    return df_features
-
 @login_required
 def process_file(request, pk):
     try:
@@ -169,150 +102,17 @@ def process_file(request, pk):
         return redirect('file_list')
     
     if request.method == 'POST':
-        form = DataProcessingForm(request.POST)
+        form = DataProcessingForm(request.POST, columns=data_file.column_names)
         if form.is_valid():
-            try:
-                # Définir une taille de chunk plus grande pour réduire le nombre d'opérations d'E/S
-                CHUNK_SIZE = 50000  # Augmenté pour un meilleur équilibre mémoire/performance
-                
-                # Initialiser le DataFrame final et le compteur de lignes
-                df_processed = None
-                processing_summary = {}
-                total_rows = 0
-                
-                # Compter le nombre total de lignes pour la barre de progression
-                if data_file.file_type == 'csv':
-                    total_rows = sum(1 for _ in open(data_file.file.path))
-                else:
-                    with open(data_file.file.path, 'r') as f:
-                        total_rows = sum(1 for line in f if line.strip())
-                
-                # Fonction pour traiter un chunk de données
-                def process_chunk(chunk_df, target_column=None, chunk_index=0):
-                    if target_column and target_column in chunk_df.columns:
-                        target_data = chunk_df[target_column]
-                        df_features = chunk_df.drop(columns=[target_column])
-                    else:
-                        target_data = None
-                        df_features = chunk_df.copy()
-                    
-                    # Calculer et mettre à jour la progression
-                    progress = int((chunk_index * CHUNK_SIZE) / total_rows * 100)
-                    django_cache.set(f'process_progress_{data_file.id}', progress, 300)
-                    
-                    return process_features(df_features, target_data, form.cleaned_data, processing_summary)
-                
-                # Chargement et traitement des données par chunks avec progression
-                if data_file.file_type == 'csv':
-                    for chunk_index, chunk in enumerate(pd.read_csv(data_file.file.path, chunksize=CHUNK_SIZE)):
-                        processed_chunk = process_chunk(chunk, form.cleaned_data.get('target_column'), chunk_index)
-                        if df_processed is None:
-                            df_processed = processed_chunk
-                        else:
-                            # Utiliser un fichier temporaire pour stocker les résultats intermédiaires
-                            temp_file = f'/tmp/processed_chunk_{data_file.id}_{chunk_index}.csv'
-                            processed_chunk.to_csv(temp_file, index=False)
-                            df_processed = pd.concat([df_processed, pd.read_csv(temp_file)])
-                            os.remove(temp_file)  # Nettoyer le fichier temporaire
-                else:
-                    # Pour les fichiers JSON, utiliser un itérateur de lignes avec progression
-                    chunk_data = []
-                    processed_rows = 0
-                    with open(data_file.file.path, 'r') as f:
-                        for line in f:
-                            line = line.strip()
-                            if line:
-                                try:
-                                    chunk_data.append(json.loads(line))
-                                    processed_rows += 1
-                                    if len(chunk_data) >= CHUNK_SIZE:
-                                        chunk_df = pd.DataFrame(chunk_data)
-                                        processed_chunk = process_chunk(chunk_df, form.cleaned_data.get('target_column'), processed_rows // CHUNK_SIZE)
-                                        
-                                        # Utiliser un fichier temporaire pour les résultats intermédiaires
-                                        temp_file = f'/tmp/processed_chunk_{data_file.id}_{processed_rows // CHUNK_SIZE}.csv'
-                                        if df_processed is None:
-                                            df_processed = processed_chunk
-                                        else:
-                                            processed_chunk.to_csv(temp_file, index=False)
-                                            df_processed = pd.concat([df_processed, pd.read_csv(temp_file)])
-                                            os.remove(temp_file)
-                                        
-                                        chunk_data = []
-                                        
-                                        # Mettre à jour la progression
-                                        progress = int(processed_rows / total_rows * 100)
-                                        django_cache.set(f'process_progress_{data_file.id}', progress, 300)
-                                        
-                                except json.JSONDecodeError as e:
-                                    raise Exception(f"Erreur de parsing JSON à la ligne: {line}. {str(e)}")
-                    
-                    # Traiter le dernier chunk s'il existe
-                    if chunk_data:
-                        chunk_df = pd.DataFrame(chunk_data)
-                        processed_chunk = process_chunk(chunk_df, form.cleaned_data.get('target_column'), processed_rows // CHUNK_SIZE)
-                        if df_processed is None:
-                            df_processed = processed_chunk
-                        else:
-                            temp_file = f'/tmp/processed_chunk_{data_file.id}_final.csv'
-                            processed_chunk.to_csv(temp_file, index=False)
-                            df_processed = pd.concat([df_processed, pd.read_csv(temp_file)])
-                            os.remove(temp_file)
-                
-                
-                # Sauvegarde du fichier traité avec mise en cache
-                from django.core.cache import cache
-                import tempfile
-                
-                # Utiliser un fichier temporaire pour la sauvegarde progressive
-                with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-                    if data_file.file_type == 'csv':
-                        # Sauvegarder par morceaux pour économiser la mémoire
-                        for i in range(0, len(df_processed), CHUNK_SIZE):
-                            chunk = df_processed.iloc[i:i+CHUNK_SIZE]
-                            # Premier chunk : écrire avec l'en-tête
-                            if i == 0:
-                                chunk.to_csv(temp_file.name, mode='w', index=False)
-                            # Chunks suivants : ajouter sans en-tête
-                            else:
-                                chunk.to_csv(temp_file.name, mode='a', header=False, index=False)
-                            
-                            # Mettre à jour la progression dans le cache
-                            progress = int((i + len(chunk)) / len(df_processed) * 100)
-                            django_cache.set(f'process_progress_{data_file.id}', progress, 300)
-                    else:
-                        # Pour JSON, sauvegarder ligne par ligne
-                        with open(temp_file.name, 'w') as f:
-                            for i, record in enumerate(df_processed.to_dict('records')):
-                                json.dump(record, f)
-                                f.write('\n')
-                                
-                                # Mettre à jour la progression tous les 1000 enregistrements
-                                if i % 1000 == 0:
-                                    progress = int(i / len(df_processed) * 100)
-                                    django_cache.set(f'process_progress_{data_file.id}', progress, 300)
-                    
-                    # Déplacer le fichier temporaire vers l'emplacement final
-                    processed_path = f'{data_file.file.path}_processed'
-                    import shutil
-                    shutil.move(temp_file.name, processed_path)
-                
-                # Mettre à jour les métadonnées
-                data_file.processed = True
-                data_file.processing_summary = processing_summary
-                data_file.save()
-                
-                # Supprimer la progression du cache
-                django_cache.delete(f'process_progress_{data_file.id}')
-                
-                messages.success(request, 'Données traitées avec succès!')
-                return redirect('file_list')
-            
-            except Exception as e:
-                messages.error(request, f'Erreur lors du traitement: {str(e)}')
-                return redirect('process_file', pk=pk)
+            # Le traitement est exécuté par le pool de workers (manage.py process_jobs)
+            job = submit_processing_job(data_file, form.cleaned_data)
+            if request.headers.get('accept', '').startswith('application/json'):
+                return JsonResponse({'job_id': job.id, 'status': job.status}, status=202)
+            messages.info(request, f'Traitement lancé en arrière-plan (tâche n°{job.id}).')
+            return redirect('file_list')
     else:
-        form = DataProcessingForm()
+        # Colonnes connues par le schéma enregistré à l'import
+        form = DataProcessingForm(columns=data_file.column_names)
     
     return render(request, 'data_processor/process.html', {
         'form': form,
@@ -320,6 +120,27 @@ def process_file(request, pk):
     })
 
 
+@login_required
+def process_progress(request, pk):
+    """Progression du traitement d'un fichier (JSON)."""
+    try:
+        data_file = DataFile.objects.get(pk=pk)
+    except DataFile.DoesNotExist:
+        return JsonResponse({'error': 'Fichier non trouvé.'}, status=404)
+    
+    progress = get_progress(data_file.id) or {}
+    if not progress and data_file.processing_status == DataFile.STATUS_DONE:
+        progress = {'percent': 100.0, 'rows_processed': data_file.row_count}
+    elif not progress:
+        progress = {'percent': 0.0, 'rows_processed': 0}
+    
+    return JsonResponse({
+        'status': data_file.processing_status,
+        'error': data_file.processing_error,
+        **progress,
+    })
+
+
 class FileListView(LoginRequiredMixin, ListView):
     model = DataFile
     template_name = 'data_processor/file_list.html'
@@ -336,17 +157,9 @@ def clear_all_files(request):
         # Récupérer tous les fichiers
         data_files = DataFile.objects.all()
         
-        # Supprimer chaque fichier physique et son fichier traité
+        # Supprimer chaque enregistrement ; les blobs partagés partent avec le dernier référent
         for data_file in data_files:
-            if os.path.exists(data_file.file.path):
-                os.remove(data_file.file.path)
-            
-            processed_path = f'{data_file.file.path}_processed'
-            if os.path.exists(processed_path):
-                os.remove(processed_path)
-        
-        # Supprimer tous les enregistrements de la base de données
-        data_files.delete()
+            delete_data_file(data_file)
         
         messages.success(request, 'Tous les fichiers ont été supprimés avec succès!')
     except Exception as e:
@@ -363,7 +176,8 @@ def upload_file(request):
             try:
                 # Récupérer le fichier uploadé
                 uploaded_file = request.FILES['file']
-                file_extension = uploaded_file.name.split('.')[-1].lower()
+                # Fichier éventuellement compressé (data.csv.gz) : type et compression
+                file_extension, compression = data_file_type(uploaded_file.name)
                 
                 # Créer le dossier media/uploads s'il n'existe pas
                 import os
@@ -373,23 +187,24 @@ def upload_file(request):
                 
                 # Vérifier le type de fichier
                 if file_extension not in ['csv', 'json', 'xml']:
-                    messages.error(request, 'Type de fichier non supporté. Veuillez uploader un fichier CSV, JSON ou XML.')
+                    messages.error(request, 'Type de fichier non supporté. Veuillez uploader un fichier CSV, JSON ou XML (éventuellement compressé en gzip, bz2 ou zstd).')
                     return redirect('upload_file')
                 
                 # Créer l'instance de DataFile
                 data_file = form.save(commit=False)
                 data_file.user = request.user  # Associer l'utilisateur connecté
                 data_file.original_filename = uploaded_file.name
+                data_file.original_file_type = file_extension
                 
-                # Créer le chemin complet du fichier
-                import datetime
-                today = datetime.date.today()
-                file_dir = os.path.join('uploads', str(today.year), str(today.month).zfill(2))
-                upload_path = os.path.join(settings.MEDIA_ROOT, file_dir)
-                os.makedirs(upload_path, exist_ok=True)
-                
-                # Définir le chemin du fichier relatif à MEDIA_ROOT
-                data_file.file.field.upload_to = file_dir
+                # Le fichier est stocké sous son SHA-256 (blobs/ab/abcd...) :
+                # un contenu déjà importé réutilise le blob et son analyse
+                data_file.sha256 = uploaded_file_sha256(uploaded_file)
+                stored_copy = find_stored_copy(data_file.sha256)
+                if stored_copy is not None:
+                    reuse_stored_copy(data_file, stored_copy)
+                    data_file.save()
+                    messages.success(request, 'Fichier uploadé avec succès!')
+                    return redirect('file_list')
                 
                 data_file.file_type = file_extension
                 data_file.save()  # Sauvegarder d'abord le fichier
@@ -400,7 +215,7 @@ def upload_file(request):
                     from app.utils.xml_validator import validate_xml_data
                     
                     # Lire le contenu du fichier XML
-                    with open(data_file.file.path, 'r', encoding='utf-8') as xml_file:
+                    with open_compressed(data_file.file.path, 'rt', encoding='utf-8') as xml_file:
                         xml_content = xml_file.read()
                     
                     # Valider la structure XML
@@ -422,7 +237,7 @@ def upload_file(request):
                         raise ValueError("Erreur lors de la conversion des données XML en DataFrame")
                     
                     # Sauvegarder en CSV
-                    csv_path = data_file.file.path.rsplit('.', 1)[0] + '.csv'
+                    csv_path = split_compression(data_file.file.path)[0].rsplit('.', 1)[0] + '.csv'
                     df.to_csv(csv_path, index=False)
                     
                     # Mettre à jour le fichier et le type
@@ -430,28 +245,21 @@ def upload_file(request):
                     data_file.file_type = 'csv'
                     data_file.save()
                 
-                # Analyser le fichier pour obtenir les métadonnées
+                # Métadonnées calculées pendant la réception ; à défaut (XML converti,
+                # JSON sur plusieurs lignes), analyse du fichier par chunks (mémoire bornée)
                 try:
-                    if file_extension == 'csv':
-                        df = pd.read_csv(data_file.file.path)
-                    elif file_extension == 'json':
-                        from app.utils.json_processor import load_json_data
-                        df = load_json_data(data_file.file.path)
-                        if df is None:
-                            raise ValueError("Erreur lors du chargement du fichier JSON")
-                    
-                    # Mettre à jour les métadonnées
-                    data_file.row_count = len(df)
-                    data_file.column_count = len(df.columns)
-                    
-                    # Calculer les statistiques sur les valeurs manquantes
-                    missing_values = {}
-                    for column in df.columns:
-                        missing_count = df[column].isnull().sum()
-                        if missing_count > 0:
-                            missing_values[column] = int(missing_count)
-                    data_file.missing_values = missing_values
+                    metadata = None if file_extension == 'xml' else getattr(uploaded_file, 'profile', None)
+                    if metadata is None:
+                        metadata = scan_file_metadata(data_file.file.path, data_file.file_type)
+                    data_file.row_count = metadata['row_count']
+                    data_file.column_count = metadata['column_count']
+                    data_file.missing_values = metadata['missing_values']
+                    data_file.schema = metadata['schema']
+                    data_file.column_stats = metadata['column_stats']
+                    data_file.file_size = metadata['file_size']
                     data_file.save()
+                    # Index des lignes pour l'aperçu paginé
+                    build_row_index(data_file.file.path, data_file.file_type)
                     
                 except Exception as e:
                     # En cas d'erreur, supprimer le fichier et l'enregistrement
@@ -474,18 +282,124 @@ def upload_file(request):
     })
 
 
+def _upload_session_state(session):
+    return {
+        'id': str(session.id),
+        'filename': session.filename,
+        'total_size': session.total_size,
+        'part_size': session.part_size,
+        'part_count': session.part_count,
+        'received_parts': session.received_parts,
+        'offset': session.offset,
+        'complete': session.complete,
+    }
+
+
+def _get_upload_session(request, session_id):
+    try:
+        return UploadSession.objects.get(pk=session_id, user=request.user)
+    except UploadSession.DoesNotExist:
+        return None
+
+
+@login_required
+@require_http_methods(['POST'])
+def upload_session_create(request):
+    """Ouvre un import reprenable (champs ``filename``, ``total_size`` et ``part_size`` facultatif)."""
+    try:
+        part_size = request.POST.get('part_size')
+        session = create_upload_session(
+            request.user, request.POST['filename'], int(request.POST['total_size']),
+            int(part_size) if part_size else None
+        )
+    except KeyError as e:
+        return JsonResponse({'error': f'Champ manquant : {e.args[0]}'}, status=400)
+    except (ValueError, UploadError) as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse(_upload_session_state(session), status=201)
+
+
+@login_required
+@require_http_methods(['GET', 'DELETE'])
+def upload_session_detail(request, session_id):
+    """État d'un import (position à partir de laquelle reprendre), ou abandon."""
+    session = _get_upload_session(request, session_id)
+    if session is None:
+        return JsonResponse({'error': "Session d'import non trouvée."}, status=404)
+    if request.method == 'DELETE':
+        delete_upload_session(session)
+        return JsonResponse({'deleted': True})
+    return JsonResponse(_upload_session_state(session))
+
+
+@login_required
+@require_http_methods(['PUT'])
+def upload_session_part(request, session_id, part):
+    """Reçoit une partie (corps brut de la requête) et l'écrit à sa position."""
+    session = _get_upload_session(request, session_id)
+    if session is None:
+        return JsonResponse({'error': "Session d'import non trouvée."}, status=404)
+    try:
+        session = write_upload_part(session, part, request)
+    except UploadError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse(_upload_session_state(session))
+
+
 @login_required
+@require_http_methods(['POST'])
+def upload_session_complete(request, session_id):
+    """Assemble un import dont toutes les parties sont reçues et crée le DataFile."""
+    session = _get_upload_session(request, session_id)
+    if session is None:
+        return JsonResponse({'error': "Session d'import non trouvée."}, status=404)
+    try:
+        data_file = complete_upload_session(session)
+    except UploadError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    except Exception as e:
+        return JsonResponse({'error': f"Erreur lors de l'analyse du fichier : {str(e)}"}, status=400)
+    return JsonResponse({
+        'data_file_id': data_file.id,
+        'row_count': data_file.row_count,
+        'column_count': data_file.column_count,
+    }, status=201)
+
+
+def _preview_file_etag(request, pk):
+    path = _data_file_path(pk)
+    if path is None:
+        return None
+    # La page contient le menu de l'utilisateur connecté
+    return file_etag(path, 'html', *_preview_page(request), request.user.pk)
+
+
+def _preview_file_last_modified(request, pk):
+    path = _data_file_path(pk)
+    return file_last_modified(path) if path is not None else None
+
+
+def _data_file_path(pk, processed=False):
+    """Fichier importé (ou son résultat de traitement) s'il existe, pour les validateurs HTTP."""
+    data_file = DataFile.objects.filter(pk=pk).first()
+    if data_file is None or (processed and not data_file.processed):
+        return None
+    path = data_file.processed_path if processed else data_file.file.path
+    return path if os.path.exists(path) else None
+
+
+@login_required
+@condition(etag_func=_preview_file_etag, last_modified_func=_preview_file_last_modified)
 def preview_file(request, pk):
     try:
         data_file = DataFile.objects.get(pk=pk)
-        # Charger les données
-        if data_file.file_type == 'csv':
-            df = pd.read_csv(data_file.file.path)
-        else:
-            df = pd.read_json(data_file.file.path)
+        page, page_size = _preview_page(request)
+        page_count = max(1, -(-data_file.row_count // page_size))
+        page = min(page, page_count)
         
-        # Limiter à 100 premières lignes pour la prévisualisation
-        preview_data = df.head(100)
+        # Seule la page demandée est lue, à partir de l'index des lignes
+        preview_data = read_rows(data_file.file.path, data_file.file_type, data_file.schema,
+                                 (page - 1) * page_size, page_size)
         
         # Convertir en HTML avec des classes Bootstrap
         table_html = preview_data.to_html(
@@ -497,8 +411,13 @@ def preview_file(request, pk):
         return render(request, 'data_processor/preview.html', {
             'data_file': data_file,
             'table_html': table_html,
-            'row_count': len(df),
-            'column_count': len(df.columns)
+            'row_count': data_file.row_count,
+            'column_count': data_file.column_count,
+            'page': page,
+            'page_size': page_size,
+            'page_count': page_count,
+            'first_row': (page - 1) * page_size + 1 if len(preview_data) else 0,
+            'last_row': (page - 1) * page_size + len(preview_data),
         })
         
     except Exception as e:
@@ -506,40 +425,154 @@ def preview_file(request, pk):
         return redirect('file_list')
 
 
+def _preview_data_path(pk):
+    data_file = DataFile.objects.filter(pk=pk).first()
+    if data_file is None:
+        return None
+    path, _, _ = preview_source(data_file)
+    return path if os.path.exists(path) else None
+
+
+def _preview_data_etag(request, pk):
+    path = _preview_data_path(pk)
+    return file_etag(path, 'json', *_preview_page(request)) if path is not None else None
+
+
+def _preview_data_last_modified(request, pk):
+    path = _preview_data_path(pk)
+    return file_last_modified(path) if path is not None else None
+
+
+@login_required
+@condition(etag_func=_preview_data_etag, last_modified_func=_preview_data_last_modified)
+def preview_data(request, pk):
+    """Aperçu en JSON (modale de la liste) : une page de lignes et les statistiques descriptives."""
+    try:
+        data_file = DataFile.objects.get(pk=pk)
+    except DataFile.DoesNotExist:
+        return JsonResponse({'error': 'Fichier non trouvé.'}, status=404)
+    page, page_size = _preview_page(request)
+    try:
+        return JsonResponse(get_preview(data_file, page, page_size))
+    except Exception as e:
+        return JsonResponse({'error': f'Erreur lors de la prévisualisation: {str(e)}'}, status=500)
+
+
+def _preview_page(request):
+    """Numéro de page (à partir de 1) et taille de page demandés, bornés."""
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        page = 1
+    try:
+        page_size = int(request.GET.get('page_size', settings.PREVIEW_PAGE_SIZE))
+    except ValueError:
+        page_size = settings.PREVIEW_PAGE_SIZE
+    return page, min(max(page_size, 1), settings.PREVIEW_MAX_PAGE_SIZE)
+
+
+def _export_format(request):
+    export_format = request.GET.get('format', 'csv')
+    return export_format if export_format in EXPORT_FORMATS else 'csv'
+
+
+def _export_compression(request, export_format):
+    """Compression d'un export texte et mode de transmission.
+
+    Demandée par le paramètre ``compression`` (gzip, zstd), elle donne un
+    fichier .gz/.zst à télécharger ; sinon elle est négociée d'après
+    ``Accept-Encoding`` et transmise en ``Content-Encoding`` (le client
+    décompresse). ``compression=none`` force un export non compressé.
+    """
+    if export_format not in TEXT_EXPORT_FORMATS:
+        return None, False
+    requested = request.GET.get('compression')
+    if requested is not None:
+        return (requested if requested in OUTPUT_COMPRESSIONS else None), False
+    return negotiate_compression(request.META.get('HTTP_ACCEPT_ENCODING')), True
+
+
+def _export_variant(request):
+    """Format et compression de l'export : clé du cache et partie de l'ETag (``csv``, ``csv.gz``)."""
+    export_format = _export_format(request)
+    compression, _ = _export_compression(request, export_format)
+    if compression is None:
+        return export_format
+    return export_format + OUTPUT_COMPRESSIONS[compression][0]
+
+
+def _export_etag(request, pk):
+    path = _data_file_path(pk, processed=True)
+    # Un export est fonction de la version du fichier traité, du format et de la compression
+    return file_etag(path, _export_variant(request)) if path is not None else None
+
+
+def _export_last_modified(request, pk):
+    path = _data_file_path(pk, processed=True)
+    return file_last_modified(path) if path is not None else None
+
+
 @login_required
+@condition(etag_func=_export_etag, last_modified_func=_export_last_modified)
 def export_file(request, pk):
     try:
         data_file = DataFile.objects.get(pk=pk)
-        export_format = request.GET.get('format', 'csv')
+        export_format = _export_format(request)
         
         # Vérifier si le fichier a été traité
         if not data_file.processed:
             messages.error(request, 'Le fichier doit être traité avant l\'exportation.')
             return redirect('file_list')
         
-        # Charger les données traitées
-        processed_path = f'{data_file.file.path}_processed'
-        if data_file.file_type == 'csv':
-            df = pd.read_csv(processed_path)
-        else:
-            df = pd.read_json(processed_path)
+        processed_path = data_file.processed_path
+        file_type = data_file.processed_file_type
+        # Types du schéma relevé à l'écriture ; les dates restent telles qu'écrites
+        schema = data_file.processed_schema
         
-        # Préparer le nom du fichier exporté
-        filename_base = os.path.splitext(data_file.original_filename)[0]
+        # Préparer le nom du fichier exporté (sans extension ni compression)
+        filename_base = os.path.splitext(split_compression(data_file.original_filename)[0])[0]
         
-        # Exporter selon le format demandé
-        if export_format == 'excel':
-            response = HttpResponse(content_type='application/vnd.ms-excel')
-            response['Content-Disposition'] = f'attachment; filename="{filename_base}_processed.xlsx"'
-            df.to_excel(response, index=False)
-        elif export_format == 'json':
-            response = HttpResponse(content_type='application/json')
-            response['Content-Disposition'] = f'attachment; filename="{filename_base}_processed.json"'
-            df.to_json(response, orient='records')
-        else:  # csv par défaut
-            response = HttpResponse(content_type='text/csv')
-            response['Content-Disposition'] = f'attachment; filename="{filename_base}_processed.csv"'
-            df.to_csv(response, index=False)
+        content_type, extension = EXPORT_FORMATS[export_format]
+        compression, content_encoding = _export_compression(request, export_format)
+        variant = _export_variant(request)
+
+        # Exporter selon le format demandé : le fichier traité est recopié tel
+        # quel quand il a déjà le bon format ; sinon l'export déjà matérialisé
+        # (compressé ou non) pour cette version du fichier est servi depuis le
+        # cache, ou produit chunk par chunk et enregistré dans le cache au passage
+        cached = cached_export(data_file, variant)
+        if cached is not None:
+            response = FileResponse(open(cached, 'rb'), content_type=content_type)
+        elif compression is None and is_stored_as(processed_path, file_type, export_format):
+            # Envoyé depuis le disque, avec sa taille (Content-Length)
+            response = FileResponse(open(processed_path, 'rb'), content_type=content_type)
+        elif export_format in TEXT_EXPORT_FORMATS:
+            parts = iter_text_export(processed_path, file_type, schema, export_format)
+            if compression is not None:
+                # Compresseur alimenté morceau par morceau : rien n'est gardé en mémoire
+                parts = compress_stream(parts, compression)
+            response = StreamingHttpResponse(tee_export(data_file, variant, parts), content_type=content_type)
+        else:
+            write_export = BINARY_EXPORT_WRITERS[export_format]
+            response = FileResponse(store_export(
+                data_file, variant,
+                lambda target: write_export(processed_path, file_type, schema, target)
+            ), content_type=content_type)
+
+        if export_format in TEXT_EXPORT_FORMATS:
+            patch_vary_headers(response, ['Accept-Encoding'])
+        if compression is not None and content_encoding:
+            response['Content-Encoding'] = compression
+        elif compression is not None:
+            # Fichier compressé à télécharger (.csv.gz, .csv.zst)
+            suffix, compressed_type = OUTPUT_COMPRESSIONS[compression]
+            response['Content-Type'] = compressed_type
+            extension += suffix
+        response['Content-Disposition'] = f'attachment; filename="{filename_base}_processed.{extension}"'
+        if isinstance(response, FileResponse):
+            # Servi depuis le disque : reprise d'un téléchargement interrompu par plages d'octets
+            response = ranged_file_response(request, response, file_etag(processed_path, variant),
+                                            file_last_modified(processed_path))
         
         return response
         
@@ -552,17 +585,9 @@ def export_file(request, pk):
 def delete_file(request, pk):
     try:
         data_file = DataFile.objects.get(pk=pk)
-        # Supprimer le fichier physique
-        if os.path.exists(data_file.file.path):
-            os.remove(data_file.file.path)
-            
-        # Supprimer le fichier traité s'il existe
-        processed_path = f'{data_file.file.path}_processed'
-        if os.path.exists(processed_path):
-            os.remove(processed_path)
-            
-        # Supprimer l'enregistrement de la base de données
-        data_file.delete()
+        # Supprimer l'enregistrement, le fichier physique et le fichier traité
+        # (sauf s'ils sont partagés avec un autre import du même contenu)
+        delete_data_file(data_file)
         
         messages.success(request, 'Fichier supprimé avec succès!')
     except Exception as e:
@@ -0,0 +1,90 @@
+import contextlib
+import os
+import tempfile
+
+import pandas as pd
+
+from app.utils.columnar import ParquetChunkWriter
+
+from .metadata import MetadataScanner
+
+
+class ProcessedFileWriter:
+    """Écrit les chunks traités directement dans le fichier ``_processed``.
+
+    Les chunks sont ajoutés à un fichier temporaire du même répertoire puis
+    libérés : la mémoire reste de l'ordre d'un chunk. Le fichier final
+    n'apparaît qu'à la validation, par un renommage atomique. Le schéma et
+    les statistiques descriptives du fichier écrit sont relevés au passage
+    (``schema``, ``column_stats``).
+
+    En Parquet (``file_type='parquet'``), chaque chunk devient un groupe de
+    lignes compressé ; les types du premier chunk sont ceux du fichier.
+    """
+
+    def __init__(self, path: str, file_type: str):
+        self.path = path
+        self.file_type = file_type
+        self.rows_written = 0
+        self.scanner = MetadataScanner()
+        fd, self.temp_path = tempfile.mkstemp(
+            dir=os.path.dirname(path), prefix=f'.{os.path.basename(path)}.', suffix='.tmp'
+        )
+        if file_type == 'parquet':
+            os.close(fd)
+            self._file = None
+            self._parquet = ParquetChunkWriter(self.temp_path)
+        else:
+            self._file = os.fdopen(fd, 'w', encoding='utf-8', newline='')
+            self._parquet = None
+
+    def write(self, chunk: pd.DataFrame):
+        if self._parquet is not None:
+            self._parquet.write(chunk)
+        elif self.file_type == 'csv':
+            # En-tête uniquement pour le premier chunk
+            chunk.to_csv(self._file, index=False, header=self.rows_written == 0)
+        elif len(chunk):
+            # JSON : un enregistrement par ligne
+            self._file.write(chunk.to_json(orient='records', lines=True).rstrip('\n') + '\n')
+        self.rows_written += len(chunk)
+        self.scanner.update(chunk)
+
+    @property
+    def schema(self):
+        return self.scanner.schema
+
+    @property
+    def column_stats(self):
+        return self.scanner.column_stats
+
+    def commit(self):
+        if self._parquet is not None:
+            self._parquet.close()
+            with open(self.temp_path, 'rb') as f:
+                os.fsync(f.fileno())
+        else:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+        os.replace(self.temp_path, self.path)
+
+    def abort(self):
+        if self._file is not None:
+            self._file.close()
+        else:
+            # Le fichier incomplet est supprimé : seule compte la libération du descripteur
+            with contextlib.suppress(Exception):
+                self._parquet.close()
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+        return False
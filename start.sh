@@ -12,6 +12,10 @@ python manage.py migrate
 echo "Creating superuser..."
 python create_superuser.py
 
+# Démarrer le pool de workers de traitement
+echo "Starting processing workers..."
+python manage.py process_jobs &
+
 # Démarrer Gunicorn
 echo "Starting Gunicorn..."
 exec gunicorn data_processing_project.wsgi:application --bind 0.0.0.0:$PORT --workers 2 --threads 2 --worker-class gthread --worker-tmp-dir /dev/shm --log-file -
\ No newline at end of file
@@ -1,18 +1,33 @@
 document.addEventListener('DOMContentLoaded', function() {
     const previewButtons = document.querySelectorAll('[data-bs-toggle="modal"]');
 
+    // Texte inséré dans le HTML : noms de colonnes et valeurs viennent du fichier importé
+    const escapeHtml = value => String(value)
+        .replace(/&/g, '&amp;')
+        .replace(/</g, '&lt;')
+        .replace(/>/g, '&gt;')
+        .replace(/"/g, '&quot;')
+        .replace(/'/g, '&#39;');
+
+    // Valeur affichée dans une cellule (null : valeur manquante)
+    const formatCell = value => value === null || value === undefined ? 'N/A' : escapeHtml(value);
+
     previewButtons.forEach(button => {
         const modalId = button.getAttribute('data-bs-target');
         const fileId = modalId.replace('#previewModal', '');
         const previewContent = document.querySelector(`#previewContent${fileId}`);
+        if (!previewContent) return;
 
         button.addEventListener('click', async () => {
             try {
-                const response = await fetch(`/preview/${fileId}/`);
+                // Première page et statistiques enregistrées (servies depuis le cache)
+                const response = await fetch(`/preview/${fileId}/data/`, {
+                    headers: {'Accept': 'application/json'}
+                });
                 const data = await response.json();
 
                 if (data.error) {
-                    previewContent.innerHTML = `<div class="alert alert-danger">${data.error}</div>`;
+                    previewContent.innerHTML = `<div class="alert alert-danger">${escapeHtml(data.error)}</div>`;
                     return;
                 }
 
@@ -29,32 +44,32 @@ document.addEventListener('DOMContentLoaded', function() {
                                         <div class="col-md-6 mb-3">
                                             <div class="card">
                                                 <div class="card-header bg-light">
-                                                    <h6 class="mb-0">${col}</h6>
+                                                    <h6 class="mb-0">${escapeHtml(col)}</h6>
                                                 </div>
                                                 <ul class="list-group list-group-flush">
                                                     <li class="list-group-item d-flex justify-content-between">
                                                         <span>Moyenne:</span>
-                                                        <strong>${stats.moyenne}</strong>
+                                                        <strong>${escapeHtml(stats.moyenne)}</strong>
                                                     </li>
                                                     <li class="list-group-item d-flex justify-content-between">
                                                         <span>Médiane:</span>
-                                                        <strong>${stats.médiane}</strong>
+                                                        <strong>${escapeHtml(stats.médiane)}</strong>
                                                     </li>
                                                     <li class="list-group-item d-flex justify-content-between">
                                                         <span>Écart-type:</span>
-                                                        <strong>${stats.écart_type}</strong>
+                                                        <strong>${escapeHtml(stats.écart_type)}</strong>
                                                     </li>
                                                     <li class="list-group-item d-flex justify-content-between">
                                                         <span>Min:</span>
-                                                        <strong>${stats.min}</strong>
+                                                        <strong>${escapeHtml(stats.min)}</strong>
                                                     </li>
                                                     <li class="list-group-item d-flex justify-content-between">
                                                         <span>Max:</span>
-                                                        <strong>${stats.max}</strong>
+                                                        <strong>${escapeHtml(stats.max)}</strong>
                                                     </li>
                                                     <li class="list-group-item d-flex justify-content-between">
                                                         <span>Valeurs manquantes:</span>
-                                                        <strong>${stats.valeurs_manquantes}</strong>
+                                                        <strong>${escapeHtml(stats.valeurs_manquantes)}</strong>
                                                     </li>
                                                 </ul>
                                             </div>
@@ -68,20 +83,26 @@ document.addEventListener('DOMContentLoaded', function() {
 
                 let tableHtml = `
                     ${statsHtml}
+                    <p class="text-muted">
+                        ${data.data.length} premières lignes sur ${data.row_count}
+                        (<a href="/preview/${fileId}/">aperçu complet</a>)
+                    </p>
+                    <div class="table-responsive">
                     <table class="table table-striped table-hover">
                         <thead class="table-primary">
                             <tr>
-                                ${data.columns.map(col => `<th>${col}</th>`).join('')}
+                                ${data.columns.map(col => `<th>${escapeHtml(col)}</th>`).join('')}
                             </tr>
                         </thead>
                         <tbody>
                             ${data.data.map(row => `
                                 <tr>
-                                    ${data.columns.map(col => `<td>${row[col]}</td>`).join('')}
+                                    ${data.columns.map(col => `<td>${formatCell(row[col])}</td>`).join('')}
                                 </tr>
                             `).join('')}
                         </tbody>
                     </table>
+                    </div>
                 `;
 
                 previewContent.innerHTML = tableHtml;